@@ -0,0 +1,180 @@
+"""
+Measure the tokens per second of the `TagBuilder` of each language on a synthetic source file.
+
+    python3 -m benchmark.tagger_throughput --classes 200 --members 20 --baseline b775168
+
+The source file has `--classes` classes with `--members` member functions and member variables each, and as many
+enums with `--members` values each. With `--baseline`, the tag builders of the git revision are measured on the
+same source files too, e.g., the revision before a change of the matchers.
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from iris_doc.api_tagger import TagBuilder
+from iris_doc.c_sharp.api_tagger_c_sharp import CSharpTagBuilder
+from iris_doc.dart.api_tagger_dart import DartTagBuilder
+from iris_doc.oc.api_tagger_oc import ObjCTagBuilder
+from iris_doc.ts.api_tagger_ts import TSTagBuilder
+
+
+def _dartSource(classes: int, members: int) -> List[str]:
+    lines: List[str] = []
+    for i in range(classes):
+        lines.append(f"abstract class RtcEngine{i} {{")
+        lines.append(f"  const RtcEngine{i}({{this.appId}});")
+        for j in range(members):
+            lines.append(f"  final int? field{j};")
+            lines.append(f"  @protected")
+            lines.append(f"  Future<void> method{j}(int uid, {{required String channelId}});")
+        lines.append("}")
+        lines.append(f"enum ErrorCodeType{i} {{")
+        for j in range(members):
+            lines.append(f"  value{j},")
+        lines.append("}")
+    return lines
+
+
+def _tsSource(classes: int, members: int) -> List[str]:
+    lines: List[str] = []
+    for i in range(classes):
+        lines.append(f"export abstract class IRtcEngine{i} {{")
+        for j in range(members):
+            lines.append(f"  field{j}?: number;")
+            lines.append(f"  abstract method{j}(uid: number, channelId: string): number;")
+        lines.append("}")
+        lines.append(f"export enum ErrorCodeType{i} {{")
+        for j in range(members):
+            lines.append(f"  Value{j} = {j},")
+        lines.append("}")
+    return lines
+
+
+def _cSharpSource(classes: int, members: int) -> List[str]:
+    lines: List[str] = []
+    for i in range(classes):
+        lines.append(f"public abstract class IRtcEngine{i}")
+        lines.append("{")
+        for j in range(members):
+            lines.append(f"    public int field{j};")
+            lines.append(f"    public abstract int Method{j}(int uid, string channelId);")
+        lines.append("}")
+        lines.append(f"public enum ERROR_CODE_TYPE{i}")
+        lines.append("{")
+        for j in range(members):
+            lines.append(f"    VALUE{j} = {j},")
+        lines.append("}")
+    return lines
+
+
+def _objCSource(classes: int, members: int) -> List[str]:
+    lines: List[str] = []
+    for i in range(classes):
+        lines.append(f"@interface AgoraRtcEngineKit{i} : NSObject")
+        for j in range(members):
+            lines.append(f"@property (assign, nonatomic) int field{j};")
+            lines.append(f"- (int)method{j}:(NSUInteger)uid channelId:(NSString * _Nonnull)channelId;")
+        lines.append("@end")
+        lines.append(f"typedef NS_ENUM(NSInteger, AgoraErrorCode{i}) {{")
+        for j in range(members):
+            lines.append(f"    AgoraErrorCode{i}Value{j} = {j},")
+        lines.append("};")
+    return lines
+
+
+_LANGUAGES: Dict[str, Callable[[bool], TagBuilder]] = {
+    'dart': DartTagBuilder,
+    'ts': TSTagBuilder,
+    'c_sharp': CSharpTagBuilder,
+    'oc': ObjCTagBuilder,
+}
+
+_SOURCES: Dict[str, Callable[[int, int], List[str]]] = {
+    'dart': _dartSource,
+    'ts': _tsSource,
+    'c_sharp': _cSharpSource,
+    'oc': _objCSource,
+}
+
+
+def _measure(language: str, classes: int, members: int, repeat: int, lexer: bool) -> Dict[str, float]:
+    lines = _SOURCES[language](classes, members)
+    tokens = 0
+    best = float('inf')
+    for _ in range(repeat):
+        # The lexer option is not taken by the `TagBuilder`s of the revisions before it
+        tagBuilder = _LANGUAGES[language](True) if lexer else _LANGUAGES[language]()
+        start = time.perf_counter()
+        taggedLines = tagBuilder.build(lines)
+        best = min(best, time.perf_counter() - start)
+        tokens = len(taggedLines) - len(lines)
+    return {"lines": len(lines), "tokens": tokens, "seconds": best}
+
+
+def _measureRevision(revision: str, args: argparse.Namespace, languages: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the `iris_doc` of the git `revision` in a separate process, which imports it from an archive of the
+    revision, so the matchers of the revision run on the same source files.
+    """
+    rootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tempDir:
+        archive = subprocess.check_output(['git', 'archive', revision, 'iris_doc'], cwd=rootDir)
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tempDir)
+
+        command = [sys.executable, '-m', 'benchmark.tagger_throughput', '--json',
+                   '--classes', str(args.classes), '--members', str(args.members), '--repeat', str(args.repeat)]
+        for language in languages:
+            command.extend(['--language', language])
+        # The archived `iris_doc` in the working directory is imported before the one of the `rootDir`
+        env = dict(os.environ, PYTHONPATH=rootDir)
+        return json.loads(subprocess.check_output(command, cwd=tempDir, env=env))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tag builder throughput benchmark')
+    parser.add_argument('--classes', type=int, default=200,
+                        help='The number of classes and enums of the synthetic source file')
+    parser.add_argument('--members', type=int, default=20,
+                        help='The number of members of each class and enum')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='The number of runs of each language, the fastest one is reported')
+    parser.add_argument('--lexer', default=False, action='store_true',
+                        help='Match the scopes on the code lines of the lexer of each language')
+    parser.add_argument('--language', choices=list(_LANGUAGES.keys()), action='append',
+                        help='The language to measure, which allow set multiple times, default to all')
+    parser.add_argument('--baseline', type=str,
+                        help='The git revision to compare with, e.g., `HEAD~1`, whose tag builders are measured on '
+                             'the same source files, which does not work with `--lexer`')
+    parser.add_argument('--json', default=False, action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.baseline and args.lexer:
+        parser.error('--baseline does not work with --lexer')
+
+    languages = args.language or list(_LANGUAGES.keys())
+    results = {language: _measure(language, args.classes, args.members, args.repeat, args.lexer)
+               for language in languages}
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    baselineResults = _measureRevision(args.baseline, args, languages) if args.baseline else {}
+    for language, result in results.items():
+        print(f"{language:>8}: {result['lines']:7d} lines, {result['tokens']:7d} tokens, {result['seconds']:7.3f}s, "
+              f"{result['tokens'] / result['seconds']:10.0f} tokens/s")
+        baselineResult = baselineResults.get(language)
+        if baselineResult is not None:
+            print(f"{'':>8}  {args.baseline}: {baselineResult['tokens']:7d} tokens, {baselineResult['seconds']:7.3f}s, "
+                  f"{baselineResult['tokens'] / baselineResult['seconds']:10.0f} tokens/s, "
+                  f"speedup {baselineResult['seconds'] / result['seconds']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
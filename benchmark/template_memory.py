@@ -0,0 +1,155 @@
+"""
+Measure the memory of the template index built from a synthetic template.
+
+    python3 -m benchmark.template_memory --entries 50000
+
+The index is built twice in separate processes, with the `__slots__`-based `CommentSource` and string interning,
+and with a baseline which emulates the previous per-instance `__dict__` layout without interning. The baseline runs
+the current code with the `CommentSource` and the interning swapped, rather than the previous revision, so the
+reduction reported is an estimate of the layout change alone.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import fs.osfs
+
+from iris_doc import language_specification
+from iris_doc.language_specification import LanguageSpecificationConfig, LanguageSpecificationModule
+
+
+class _DictCommentSource:
+    def __init__(self, type_: str = None,
+                 id: str = None,
+                 name: str = None,
+                 description: str = None,
+                 parameters=None,
+                 returns: str = None,
+                 deprecated: str = None,
+                 note: str = None,
+                 warning: str = None,
+                 is_hide: bool = None):
+        self.type_ = type_
+        self.id = id
+        self.name = name
+        self.description = description
+        self.parameters = parameters
+        self.returns = returns
+        self.deprecated = deprecated
+        self.note = note
+        self.warning = warning
+        self.is_hide = is_hide
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def _maxRssBytes() -> int:
+    maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The ru_maxrss is in bytes on macOS, and in kilobytes on Linux
+    return maxRss if sys.platform == 'darwin' else maxRss * 1024
+
+
+def _writeTemplate(path: str, entries: int):
+    elements = []
+    i = 0
+    while len(elements) < entries:
+        elements.append({
+            "id": f"class_irtcengine{i}",
+            "name": f"RtcEngine{i}",
+            "description": f"The RtcEngine{i} interface.",
+            "parameters": [{"appId": "The App ID issued by Agora."}, {"areaCode": "The region for connection."}],
+            "returns": "",
+            "is_hide": False
+        })
+        elements.append({
+            "id": f"api_irtcengine{i}_joinchannel",
+            "name": "joinChannel",
+            "description": "Joins a channel with the user ID, and configures whether to publish or automatically "
+                           "subscribe to the audio or video streams.",
+            "parameters": [{"token": "The token generated on your server for authentication."},
+                           {"channelId": "The channel name."},
+                           {"uid": "The user ID."},
+                           {"options": "The channel media options."}],
+            "returns": "0: Success.< 0: Failure.",
+            "is_hide": False
+        })
+        elements.append({
+            "id": f"enum_errorcodetype{i}",
+            "name": f"ErrorCodeType{i}",
+            "description": "Error codes.",
+            "parameters": [{"errOk": "0: No error."}, {"errFailed": "1: A general error occurs."}],
+            "returns": "",
+            "is_hide": False
+        })
+        i += 1
+
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(elements[:entries], file)
+
+
+def _measure(templatePath: str, mode: str):
+    if mode == 'baseline':
+        language_specification.CommentSource = _DictCommentSource
+        language_specification._internParameters = lambda parameters: parameters
+        sys.intern = lambda s: s
+
+    fileSystem = fs.osfs.OSFS(os.path.dirname(templatePath))
+    module = LanguageSpecificationModule(fileSystem, LanguageSpecificationConfig(
+        isCallback2class=True, isCallback2api=False, idPatternV2=True))
+    module.addTemplateFilePath(os.path.basename(templatePath))
+
+    rssBefore = _maxRssBytes()
+    start = time.perf_counter()
+    module.deserialize()
+    duration = time.perf_counter() - start
+    rssAfter = _maxRssBytes()
+
+    print(json.dumps({
+        "entries": len(module.getAllCommentSources()),
+        "peakRssGrowth": rssAfter - rssBefore,
+        "peakRss": rssAfter,
+        "seconds": duration,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Template index memory benchmark')
+    parser.add_argument('--entries', type=int, default=50000,
+                        help='The number of entries of the synthetic template')
+    parser.add_argument('--measure', type=str, help=argparse.SUPPRESS)
+    parser.add_argument('--mode', choices=['slots', 'baseline'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(args.measure, args.mode)
+        return
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        templatePath = os.path.join(tempDir, 'template.json')
+        _writeTemplate(templatePath, args.entries)
+
+        results = {}
+        for mode in ['baseline', 'slots']:
+            output = subprocess.check_output(
+                [sys.executable, '-m', 'benchmark.template_memory', '--measure', templatePath, '--mode', mode])
+            results[mode] = json.loads(output)
+
+    print(f"template entries: {args.entries}, index entries: {results['slots']['entries']}")
+    for mode, result in results.items():
+        print(f"{'emulated baseline' if mode == 'baseline' else mode:>17}: peak RSS growth {result['peakRssGrowth'] / 1024 / 1024:8.1f} MB, "
+              f"peak RSS {result['peakRss'] / 1024 / 1024:8.1f} MB, {result['seconds']:.2f}s")
+
+    saved = results['baseline']['peakRssGrowth'] - results['slots']['peakRssGrowth']
+    print(f"reduction from the emulated baseline: {saved / 1024 / 1024:.1f} MB "
+          f"({saved / max(results['baseline']['peakRssGrowth'], 1) * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
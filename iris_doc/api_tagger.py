@@ -1,10 +1,14 @@
 
 import re
+import sys
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Callable, Optional
+from typing import Any, Dict, List, Sequence, Tuple, Callable, Optional, Union
 
 from fs.base import FS
 
+from iris_doc.language_specification import TagKey
+from iris_doc.source_lexer import SourceLexer
+
 TYPE_CLASS = "class"
 TYPE_API = "api"
 TYPE_CONSTRUCT = "construct"
@@ -12,6 +16,87 @@ TYPE_ENUM = "enum"
 TYPE_EXTENSION = "extension"
 TYPE_CONSTANT = "constant"
 
+_TAG_PATTERN = re.compile(r'\/\*\s(.*)\s\*\/')
+
+# The types of `LanguageSyntaxMatcher.matchDeclaration` and `LanguageSyntaxMatcher.matchMemberDeclaration` in
+# the cascade order
+_DECLARATION_TYPES = (TYPE_CLASS, TYPE_ENUM, TYPE_EXTENSION, TYPE_API, TYPE_CONSTANT)
+_MEMBER_DECLARATION_TYPES = (TYPE_CONSTRUCT, TYPE_CLASS, TYPE_API)
+
+_INLINE_FLAGS = ((re.I, 'i'), (re.M, 'm'), (re.S, 's'), (re.X, 'x'))
+
+
+class DeclarationPattern:
+    """
+    The patterns of the match methods of a declaration cascade, e.g., `LanguageSyntaxMatcher.matchDeclaration`,
+    compiled to one alternation, which finds the first method in the cascade whose patterns match the stripped line
+    with one regex call. The methods before it can be skipped, as long as each method matches nothing if none of
+    its patterns match. If the method just returns a group of its first matched pattern, the group is taken from
+    the alternation as well, so the method is not called.
+
+    The alternation is only used for the `LanguageSyntaxMatcher`s which do not override the `methodNames` of the
+    `matcherType`, otherwise the patterns may not be the ones of the methods.
+    """
+    __matcherType: type
+    __methodNames: Sequence[str]
+    __pattern: re.Pattern
+    # The group index of each alternative to the (index of its method in the cascade, group index of the result)
+    __alternatives: Dict[int, Tuple[int, Optional[int]]]
+    # The `LanguageSyntaxMatcher` type to whether the alternation can be used
+    __applicableTypes: Dict[type, bool]
+
+    def __init__(self,
+                 matcherType: type,
+                 methodNames: Sequence[str],
+                 alternatives: Sequence[Tuple[int, re.Pattern, Optional[int]]]) -> None:
+        """
+        The `alternatives` are the (method index in the cascade, pattern matched on the stripped line, group of the
+        pattern returned by the method or None if the method should be called) in the cascade order.
+        """
+        self.__matcherType = matcherType
+        self.__methodNames = methodNames
+        self.__alternatives = {}
+        self.__applicableTypes = {}
+
+        groups: List[str] = []
+        groupIndex = 1
+        for methodIndex, pattern, group in alternatives:
+            flags = ''
+            for flag, inlineFlag in _INLINE_FLAGS:
+                if pattern.flags & flag:
+                    flags += inlineFlag
+            if pattern.flags & ~(re.I | re.M | re.S | re.X | re.U):
+                raise ValueError(f'The flags of the pattern are not supported: {pattern.pattern}')
+
+            # Each alternative is wrapped by a group, so the `lastindex` of the match is the index of the group
+            groups.append(f'((?{flags}:{pattern.pattern}))' if flags else f'({pattern.pattern})')
+            self.__alternatives[groupIndex] = (methodIndex, None if group is None else groupIndex + group)
+            groupIndex += pattern.groups + 1
+
+        self.__pattern = re.compile('|'.join(groups))
+
+    def isApplicable(self, syntaxMatcher: 'LanguageSyntaxMatcher') -> bool:
+        matcherType = type(syntaxMatcher)
+        isApplicable = self.__applicableTypes.get(matcherType)
+        if isApplicable is None:
+            isApplicable = isinstance(syntaxMatcher, self.__matcherType) and \
+                all(getattr(matcherType, name) is getattr(self.__matcherType, name) for name in self.__methodNames)
+            self.__applicableTypes[matcherType] = isApplicable
+
+        return isApplicable
+
+    def match(self, strippedLine: str) -> Tuple[int, Any]:
+        """
+        Return the index of the first method in the cascade whose patterns match the `strippedLine` with the group
+        returned by the method, which is None if the method should be called, or (-1, None) if none
+        """
+        m = self.__pattern.match(strippedLine)
+        if m is None:
+            return (-1, None)
+
+        methodIndex, group = self.__alternatives[m.lastindex]
+        return (methodIndex, None if group is None else m.group(group))
+
 
 class LanguageSyntaxMatcher(ABC):
 
@@ -19,7 +104,7 @@ class LanguageSyntaxMatcher(ABC):
         """
         Return a matched tag
         """
-        m = re.match(r'\/\*\s(.*)\s\*\/', line.strip())
+        m = _TAG_PATTERN.match(line.strip())
         if m:
             return m.group(1)
         return None
@@ -199,8 +284,80 @@ class LanguageSyntaxMatcher(ABC):
         """
         return None
 
+    def _getDeclarationPattern(self) -> Optional[DeclarationPattern]:
+        """
+        Return the alternation of the patterns of `matchClass`, `matchEnum`, `matchExtension`, `matchFunction` and
+        `matchConstant` in order, see `matchDeclaration`, or None to call them one by one.
+        """
+        return None
+
+    def _getMemberDeclarationPattern(self, className: str) -> Optional[DeclarationPattern]:
+        """
+        Return the alternation of the patterns of `matchClassConstructor`, `matchMemberVariableScopeStart` and
+        `matchMemberFunction` in order, see `matchMemberDeclaration`, or None to call them one by one.
+        """
+        return None
+
+    def __matchPattern(self, line: str, pattern: Optional[DeclarationPattern]) -> Tuple[int, Any]:
+        """
+        Return the index of the first method in the cascade to call with the result of it if known, see
+        `DeclarationPattern.match`
+        """
+        if pattern is None or not pattern.isApplicable(self):
+            return (0, None)
+
+        return pattern.match(line.strip())
+
+    def matchDeclaration(self, line: str) -> Optional[Tuple[str, Any]]:
+        """
+        Return the (type, name) of the first one matched the line in `matchClass` (`TYPE_CLASS`), `matchEnum`
+        (`TYPE_ENUM`), `matchExtension` (`TYPE_EXTENSION`), `matchFunction` (`TYPE_API`) and `matchConstant`
+        (`TYPE_CONSTANT`), or None.
+        """
+        startIndex, name = self.__matchPattern(line, self._getDeclarationPattern())
+        if startIndex == -1:
+            return None
+        if name:
+            return (_DECLARATION_TYPES[startIndex], name)
+
+        if startIndex <= 0 and (name := self.matchClass(line)):
+            return (TYPE_CLASS, name)
+        if startIndex <= 1 and (name := self.matchEnum(line)):
+            return (TYPE_ENUM, name)
+        if startIndex <= 2 and (name := self.matchExtension(line)):
+            return (TYPE_EXTENSION, name)
+        if startIndex <= 3 and (name := self.matchFunction(line)):
+            return (TYPE_API, name)
+        if name := self.matchConstant(line):
+            return (TYPE_CONSTANT, name)
+
+        return None
+
+    def matchMemberDeclaration(self, line: str, className: str) -> Optional[Tuple[str, Any]]:
+        """
+        Return the (type, result) of the first one matched the line in `matchClassConstructor` (`TYPE_CONSTRUCT`),
+        `matchMemberVariableScopeStart` (`TYPE_CLASS`) and `matchMemberFunction` (`TYPE_API`), or None.
+        """
+        startIndex, result = self.__matchPattern(line, self._getMemberDeclarationPattern(className))
+        if startIndex == -1:
+            return None
+        if result:
+            return (_MEMBER_DECLARATION_TYPES[startIndex], result)
+
+        if startIndex <= 0 and (result := self.matchClassConstructor(line, className)):
+            return (TYPE_CONSTRUCT, result)
+        if startIndex <= 1 and (result := self.matchMemberVariableScopeStart(line)):
+            return (TYPE_CLASS, result)
+        if result := self.matchMemberFunction(line):
+            return (TYPE_API, result)
+
+        return None
+
 
 class Token:
+    # Big generated files produce tens of thousands of `Token`s, use `__slots__` to avoid the per-instance dict.
+    __slots__ = ('_offset', '_type', '_name1', '_name2', '_annotations')
+
     _offset: int
     _type: str
     _name1: str
@@ -215,7 +372,8 @@ class Token:
                  annotations: List[str] = []):
         self._offset = offset
         self._type = type
-        self._name1 = name1
+        # The class name is repeated for every member of the class
+        self._name1 = sys.intern(name1) if isinstance(name1, str) else name1
         self._name2 = name2
         self._annotations = annotations
 
@@ -226,16 +384,26 @@ class Token:
 
         return self._offset
 
-    def _buildTag(self, type: str, name1: str, name2: str):
+    def _buildTagKey(self, type: str, name1: str, name2: str) -> str:
         tag = "{}_{}".format(type, name1)
         if name2 is not None:
             tag = "{}_{}".format(tag, name2)
 
-        return "/* {} */".format(tag).lower()
+        return tag.lower()
+
+    def _buildTag(self, type: str, name1: str, name2: str):
+        return "/* {} */".format(self._buildTagKey(type=type, name1=name1, name2=name2))
 
     def toString(self):
         return self._buildTag(type=self._type, name1=self._name1, name2=self._name2)
 
+    def getTagKey(self) -> Optional[TagKey]:
+        """
+        Return the key of the tag which `toString` builds, which is used to look up the `CommentSource`,
+        or None if `toString` returns something other than a tag
+        """
+        return TagKey.fromParts(type=self._type, owner=self._name1, member=self._name2)
+
 
 class LineScanner(ABC):
 
@@ -255,22 +423,270 @@ class LineScanner(ABC):
         pass
 
 
+# The scope kinds of a line in `_LineRecord.scopes`
+_FUNCTION_SCOPE_START = 1
+_FUNCTION_SCOPE_END = 2
+_CLASS_SCOPE_START = 4
+_CLASS_SCOPE_END = 8
+# The scope kinds of a line in `_LineRecord.memberVariableScopes`
+_MEMBER_VARIABLE_SCOPE_START = 1
+_MEMBER_VARIABLE_SCOPE_END = 2
+
+
+class _LineRecord:
+    """
+    The file line with its stripped line, the stripped line matched by the scope methods of the
+    `LanguageSyntaxMatcher`, and the scope kinds of it, which are classified on the first scope lookup.
+    """
+    __slots__ = ('line', 'strippedLine', 'scopeLine', 'scopes', 'memberVariableScopes')
+
+    line: str
+    strippedLine: str
+    # The stripped code line of the `SourceLexer` if any, otherwise the same as the `strippedLine`
+    scopeLine: str
+    # The bits of `_FUNCTION_SCOPE_START`, `_FUNCTION_SCOPE_END`, `_CLASS_SCOPE_START` and `_CLASS_SCOPE_END`,
+    # or None if not classified yet
+    scopes: Optional[int]
+    # The bits of `_MEMBER_VARIABLE_SCOPE_START` and `_MEMBER_VARIABLE_SCOPE_END` of the stripped line, or None if
+    # not classified yet, which are classified on the first lookup of the line
+    memberVariableScopes: Optional[int]
+
+    def __init__(self, line: str, codeLine: Optional[str] = None) -> None:
+        self.line = line
+        self.strippedLine = line.strip()
+        self.scopeLine = self.strippedLine if codeLine is None else codeLine.strip()
+        self.scopes = None
+        self.memberVariableScopes = None
+
+
 class DefaultLineScanner(LineScanner):
     __syntaxMatcher: LanguageSyntaxMatcher
 
     __fileLines: List[str] = []
+    __lexer: Optional[SourceLexer]
+
+    __lineRecords: List[_LineRecord]
+    __isScopeClassified: bool
+
+    # The scope tables of the `__scopeTableLines`, which are built in one sweep on the first lookup
+    __scopeTableLines: Optional[List[str]]
+    __scopeTables: Dict[str, List[int]]
 
-    def __init__(self, syntaxMatcher: LanguageSyntaxMatcher, fileLines: List[str]) -> None:
+    # The annotation of each file line, and the length of the run of the annotation lines ends at each file line,
+    # which are built in one pass on the first `_getAnnotations`
+    __lineAnnotations: Optional[List[str]]
+    __annotationRuns: List[int]
+
+    def __init__(self,
+                 syntaxMatcher: LanguageSyntaxMatcher,
+                 fileLines: List[str],
+                 lexer: Optional[SourceLexer] = None) -> None:
+        """
+        If the `lexer` is set, the scopes of the file lines are matched on the code lines of it, where the comments
+        and the string literals are blanked out.
+        """
         self.__syntaxMatcher = syntaxMatcher
         self.__fileLines = fileLines
+        self.__lexer = lexer
+        if lexer is None:
+            self.__lineRecords = [_LineRecord(line) for line in fileLines]
+        else:
+            self.__lineRecords = [_LineRecord(line, codeLine)
+                                  for line, codeLine in zip(fileLines, lexer.lex(fileLines))]
+        self.__isScopeClassified = False
+        self.__scopeTableLines = None
+        self.__scopeTables = {}
+        self.__lineAnnotations = None
+        self.__annotationRuns = []
+
+    def __classifyScopes(self) -> List[_LineRecord]:
+        """
+        Classify the scope kinds of all line records in one pass, and return the line records
+        """
+        if self.__isScopeClassified:
+            return self.__lineRecords
+
+        scopeLines = [record.scopeLine for record in self.__lineRecords]
+        scopeKinds = (
+            (_FUNCTION_SCOPE_START, self.__syntaxMatcher.matchFunctionScopeStart),
+            (_FUNCTION_SCOPE_END, self.__syntaxMatcher.matchFunctionScopeEnd),
+            (_CLASS_SCOPE_START, self.__syntaxMatcher.matchClassScopeStart),
+            (_CLASS_SCOPE_END, self.__syntaxMatcher.matchClassScopeEnd),
+        )
+        for record in self.__lineRecords:
+            record.scopes = 0
+        for scopeKind, method in scopeKinds:
+            for record, matched in zip(self.__lineRecords, map(method, scopeLines)):
+                if matched:
+                    record.scopes |= scopeKind
+
+        self.__isScopeClassified = True
+        return self.__lineRecords
+
+    def __getFunctionScopes(self, lines: List[str], index: int) -> int:
+        """
+        Return the `_FUNCTION_SCOPE_START` and `_FUNCTION_SCOPE_END` bits of `lines[index]`, which are read from the
+        line records for the file lines.
+        """
+        if lines is self.__fileLines:
+            return self.__classifyScopes()[index].scopes & (_FUNCTION_SCOPE_START | _FUNCTION_SCOPE_END)
+
+        line = lines[index].strip()
+        scopes = 0
+        if self.__syntaxMatcher.matchFunctionScopeStart(line):
+            scopes |= _FUNCTION_SCOPE_START
+        if self.__syntaxMatcher.matchFunctionScopeEnd(line):
+            scopes |= _FUNCTION_SCOPE_END
+        return scopes
+
+    def __getMemberVariableScopes(self, index: int) -> int:
+        """
+        Return the `_MEMBER_VARIABLE_SCOPE_START` and `_MEMBER_VARIABLE_SCOPE_END` bits of the file line at `index`
+        """
+        record = self.__lineRecords[index]
+        scopes = record.memberVariableScopes
+        if scopes is None:
+            scopes = 0
+            if self.__syntaxMatcher.matchMemberVariableScopeStart(record.strippedLine):
+                scopes |= _MEMBER_VARIABLE_SCOPE_START
+            if self.__syntaxMatcher.matchMemberVariableScopeEnd(record.strippedLine):
+                scopes |= _MEMBER_VARIABLE_SCOPE_END
+            record.memberVariableScopes = scopes
+
+        return scopes
+
+    def __findMemberVariableScopeEndIndex(self, startIndex: int) -> int:
+        """
+        Same as the `_findMatchingIndex` of the `matchMemberVariableScopeEnd` on the file lines
+        """
+        for index in range(startIndex, len(self.__fileLines)):
+            if self.__getMemberVariableScopes(index) & _MEMBER_VARIABLE_SCOPE_END:
+                return index
+        return -1
+
+    def __getScopeLine(self, lines: List[str], index: int) -> str:
+        """
+        Return the line to check the scope start at, which is the scope line of the line record for the file lines
+        if the lexer is set.
+        """
+        if self.__lexer is not None and lines is self.__fileLines:
+            return self.__lineRecords[index].scopeLine
+
+        return lines[index]
+
+    def __getScopeTable(self, lines: List[str], name: str, build: Callable[[List[str]], List[int]]) -> List[int]:
+        if self.__scopeTableLines is not lines:
+            self.__scopeTableLines = lines
+            self.__scopeTables = {}
+
+        table = self.__scopeTables.get(name)
+        if table is None:
+            table = build(lines)
+            self.__scopeTables[name] = table
+
+        return table
+
+    def __buildScopeEndTable(self, lines: List[str], deltas: List[int]) -> List[int]:
+        """
+        Return the table of the scope end index of the scope starts at `index - 1`, where the scope end is the first
+        line after the scope start that the sum of the `deltas` of the lines after the scope start drops to -1, or
+        -1 if not found.
+        """
+        # The scope depth before each line, and after the last line
+        depths: List[int] = [0] * (len(lines) + 1)
+        for i, delta in enumerate(deltas):
+            depths[i + 1] = depths[i] + delta
+
+        # The depth changes by 1 at most per line, so the scope ends where the depth first reaches `depth - 1`
+        table: List[int] = [-1] * (len(lines) + 1)
+        firstIndexOfDepth: Dict[int, int] = {}
+        for index in range(len(lines), -1, -1):
+            endIndex = firstIndexOfDepth.get(depths[index] - 1)
+            if endIndex is not None:
+                table[index] = endIndex - 1
+            firstIndexOfDepth[depths[index]] = index
+
+        return table
+
+    def __buildMatchingIndexTable(self, lines: List[str], matches: List[Any]) -> List[int]:
+        """
+        Return the table of the `_findMatchingIndex` result of each start index, where `matches` are the results of
+        the method on the lines.
+        """
+        table: List[int] = [-1] * (len(lines) + 1)
+        for index in range(len(lines) - 1, -1, -1):
+            table[index] = index if matches[index] else table[index + 1]
+
+        return table
+
+    def __matchLines(self, lines: List[str], method: Callable[[str], Any]) -> List[Any]:
+        """
+        Return the results of the `method` on the stripped lines, which are the scope lines of the line records for
+        the file lines, and the scope methods are read from the line records.
+        """
+        if lines is self.__fileLines:
+            scopeKind = None
+            if method == self.__syntaxMatcher.matchFunctionScopeStart:
+                scopeKind = _FUNCTION_SCOPE_START
+            elif method == self.__syntaxMatcher.matchClassScopeStart:
+                scopeKind = _CLASS_SCOPE_START
+            if scopeKind is not None:
+                return [record.scopes & scopeKind for record in self.__classifyScopes()]
+
+            return list(map(method, [record.scopeLine for record in self.__lineRecords]))
+
+        return [method(line.strip()) for line in lines]
+
+    def __findMatchingIndexByTable(self, lines: List[str], startIndex: int, method: Callable[[str], bool]) -> int:
+        """
+        Same as the `_findMatchingIndex`, but look up the table of the `method` built on the first call.
+        """
+        if startIndex < 0 or startIndex > len(lines):
+            return self._findMatchingIndex(lines, startIndex, method)
+
+        table = self.__getScopeTable(
+            lines, method.__name__, lambda lines: self.__buildMatchingIndexTable(lines, self.__matchLines(lines, method)))
+        return table[startIndex]
+
+    def __buildClassScopeEndTable(self, lines: List[str]) -> List[int]:
+        if lines is self.__fileLines:
+            deltas = [(1 if scopes & (_FUNCTION_SCOPE_START | _CLASS_SCOPE_START) else 0) -
+                      (1 if scopes & (_CLASS_SCOPE_END | _FUNCTION_SCOPE_END) else 0)
+                      for scopes in [record.scopes for record in self.__classifyScopes()]]
+        else:
+            deltas = []
+            for line in lines:
+                line = line.strip()
+                delta = 0
+                if self.__syntaxMatcher.matchFunctionScopeStart(line) or self.__syntaxMatcher.matchClassScopeStart(line):
+                    delta += 1
+                if self.__syntaxMatcher.matchClassScopeEnd(line) or self.__syntaxMatcher.matchFunctionScopeEnd(line):
+                    delta -= 1
+                deltas.append(delta)
+
+        return self.__buildScopeEndTable(lines, deltas)
+
+    def __buildFunctionScopeEndTable(self, lines: List[str]) -> List[int]:
+        deltas: List[int] = []
+        for index in range(len(lines)):
+            scopes = self.__getFunctionScopes(lines, index)
+            if scopes & _FUNCTION_SCOPE_END:
+                deltas.append(-1)
+            elif scopes & _FUNCTION_SCOPE_START:
+                deltas.append(1)
+            else:
+                deltas.append(0)
+
+        return self.__buildScopeEndTable(lines, deltas)
 
     def _findMatchingIndex(self, lines: List[str], startIndex, method: Callable[[str], bool]):
         """
         Iterate through lines until we find a line where method returns true.
         """
         i = startIndex
+        isFileLines = lines is self.__fileLines
         while (i < len(lines)):
-            if method(lines[i].strip()):
+            if method(self.__lineRecords[i].strippedLine if isFileLines else lines[i].strip()):
                 return i
             i += 1
         return -1
@@ -284,74 +700,40 @@ class DefaultLineScanner(LineScanner):
         return -1
 
     def _findClassScopeStartIndex(self, lines: List[str], startIndex: int) -> int:
-        return self._findMatchingIndex(lines, startIndex, self.__syntaxMatcher.matchClassScopeStart)
+        return self.__findMatchingIndexByTable(lines, startIndex, self.__syntaxMatcher.matchClassScopeStart)
 
     def _findExtensionScopeStartIndex(self, lines: List[str], startIndex: int) -> int:
-        return self._findMatchingIndex(lines, startIndex, self.__syntaxMatcher.matchExtensionScopeStart)
+        return self.__findMatchingIndexByTable(lines, startIndex, self.__syntaxMatcher.matchExtensionScopeStart)
 
     def _findClassScopeEndIndex(self, lines: List[str], scopeStartIndex: int) -> int:
-        if not self.__syntaxMatcher.matchClassScopeStart(lines[scopeStartIndex]) and \
-            self.__syntaxMatcher.matchExtensionsScopeStart(lines[scopeStartIndex]):
+        scopeStartLine = self.__getScopeLine(lines, scopeStartIndex)
+        if not self.__syntaxMatcher.matchClassScopeStart(scopeStartLine) and \
+            self.__syntaxMatcher.matchExtensionsScopeStart(scopeStartLine):
             raise IndexError("The ExtensionsScopeStart is not correct.\n{lines[scopeStartIndex]}")
 
-        scopeStack = []
-        scopeStack.append(scopeStartIndex)
-
-        i = scopeStartIndex + 1
-
-        while (i < len(lines)):
-            line = lines[i].strip()
-            if self.__syntaxMatcher.matchFunctionScopeStart(line) or self.__syntaxMatcher.matchClassScopeStart(line):
-                scopeStack.append(i)
-            if self.__syntaxMatcher.matchClassScopeEnd(line) or self.__syntaxMatcher.matchFunctionScopeEnd(line):
-                scopeStack.pop()
-            if len(scopeStack) == 0:
-                return i
-            i += 1
-
-        return -1
+        # The function and class scope starts are pushed to the scope stack, and the ends pop them, so the scope
+        # ends where the stack depth drops below the depth of the scope start
+        classScopeEndTable = self.__getScopeTable(lines, 'classScopeEnd', self.__buildClassScopeEndTable)
+        return classScopeEndTable[scopeStartIndex + 1]
 
     def _findFunctionScopeStartIndex(self, lines: List[str], startIndex: int) -> int:
-        return self._findMatchingIndex(lines, startIndex, self.__syntaxMatcher.matchFunctionScopeStart)
+        return self.__findMatchingIndexByTable(lines, startIndex, self.__syntaxMatcher.matchFunctionScopeStart)
 
     def _findFunctionScopeEndIndex(self, lines: List[str], scopeStartIndex: int) -> int:
-        scopeStack = []
-        line = lines[scopeStartIndex].strip()
+        line = self.__getScopeLine(lines, scopeStartIndex).strip()
+        scopes = self.__getFunctionScopes(lines, scopeStartIndex)
         # For a single line function, return the `scopeStartIndex` directly
-        if self.__syntaxMatcher.matchFunctionScopeEnd(line) or \
-                self.__syntaxMatcher.matchAbstractFunctionScopeEnd(line):
+        if scopes & _FUNCTION_SCOPE_END or self.__syntaxMatcher.matchAbstractFunctionScopeEnd(line):
             return scopeStartIndex
 
         # If the first line not `matchFunctionScopeStart`, it should be a abstract function,
         # find the abstract function scope end directly for this case.
-        if not self.__syntaxMatcher.matchFunctionScopeStart(line):
-            i = scopeStartIndex
-            while (i < len(lines)):
-                line = lines[i].strip()
-                if self.__syntaxMatcher.matchAbstractFunctionScopeEnd(line):
-                    return i
+        if not scopes & _FUNCTION_SCOPE_START:
+            return self.__findMatchingIndexByTable(
+                lines, scopeStartIndex, self.__syntaxMatcher.matchAbstractFunctionScopeEnd)
 
-                i += 1
-
-            return -1
-
-        scopeStack.append(scopeStartIndex)
-
-        i = scopeStartIndex + 1
-
-        while (i < len(lines)):
-            line = lines[i].strip()
-            if self.__syntaxMatcher.matchFunctionScopeEnd(line):
-                scopeStack.pop()
-            elif self.__syntaxMatcher.matchFunctionScopeStart(line):
-                scopeStack.append(i)
-
-            if len(scopeStack) == 0:
-                return i
-
-            i += 1
-
-        return -1
+        functionScopeEndTable = self.__getScopeTable(lines, 'functionScopeEnd', self.__buildFunctionScopeEndTable)
+        return functionScopeEndTable[scopeStartIndex + 1]
 
     def _findFunctionParameterScopeEnd(self, functionName: str, lines: List[str], scopeStartIndex: int) -> int:
         if not self.__syntaxMatcher.matchFunctionParameterScopeStart(functionName, lines[scopeStartIndex]):
@@ -359,24 +741,38 @@ class DefaultLineScanner(LineScanner):
         return self._findMatchingIndex(lines, scopeStartIndex, self.__syntaxMatcher.matchFunctionParameterScopeEnd)
 
     def _findEnumScopeStartIndex(self, lines: List[str], startIndex: int) -> int:
-        return self._findMatchingIndex(lines, startIndex, self.__syntaxMatcher.matchEnumScopeStart)
+        return self.__findMatchingIndexByTable(lines, startIndex, self.__syntaxMatcher.matchEnumScopeStart)
 
     def _findEnumScopeEndIndex(self, lines: List[str], scopeStartIndex: int) -> int:
-        if not self.__syntaxMatcher.matchEnumScopeStart(lines[scopeStartIndex]):
+        if not self.__syntaxMatcher.matchEnumScopeStart(self.__getScopeLine(lines, scopeStartIndex)):
             raise IndexError("The EnumScopeStart is not correct.\n{lines[scopeStartIndex]}")
-        return self._findMatchingIndex(lines, scopeStartIndex + 1, self.__syntaxMatcher.matchEnumScopeEnd)
+        return self.__findMatchingIndexByTable(lines, scopeStartIndex + 1, self.__syntaxMatcher.matchEnumScopeEnd)
+
+    def __buildAnnotationRuns(self) -> None:
+        self.__lineAnnotations = list(map(self.__syntaxMatcher.matchAnnotation, self.__fileLines))
+        self.__annotationRuns = [0] * len(self.__fileLines)
+        run = 0
+        for index, annotation in enumerate(self.__lineAnnotations):
+            run = run + 1 if annotation else 0
+            self.__annotationRuns[index] = run
+
+    def __getLineAnnotation(self, index: int) -> Optional[str]:
+        if self.__lineAnnotations is None:
+            self.__buildAnnotationRuns()
+
+        return self.__lineAnnotations[index]
 
     def _getAnnotations(self, lineIndex: int) -> List[str]:
-        annotations: List[str] = []
-        index = lineIndex - 1
-        if self.__syntaxMatcher.matchAnnotation(self.__fileLines[index]):
-            while (index >= 0):
-                if annotation := self.__syntaxMatcher.matchAnnotation(self.__fileLines[index]):
-                    annotations.append(annotation)
-                else:
-                    break
-                index -= 1
-        return annotations
+        """
+        Return the annotations of the run of the annotation lines right above the `lineIndex`, from the nearest one
+        """
+        if lineIndex <= 0:
+            return []
+        if self.__lineAnnotations is None:
+            self.__buildAnnotationRuns()
+
+        run = self.__annotationRuns[lineIndex - 1]
+        return self.__lineAnnotations[lineIndex - run:lineIndex][::-1]
 
     def _getClassTokens(self, className: str, lineIndex: int, type: str = TYPE_CLASS) -> Tuple[int, List[Token]]:
         tokens: List[Token] = []
@@ -395,21 +791,20 @@ class DefaultLineScanner(LineScanner):
         i = classScopeStartIndex + 1
         while (i < classScopeEndIndex):
             line = self.__fileLines[i]
-            ctName = self.__syntaxMatcher.matchClassConstructor(
-                line, className)
-            if ctName:
+            memberType, memberName = self.__syntaxMatcher.matchMemberDeclaration(line, className) or (None, None)
+            if memberType == TYPE_CONSTRUCT:
                 tokens.append(self._createToken(
                     offset=i,
                     type=TYPE_CONSTRUCT,
                     name1=className,
-                    name2=ctName,
+                    name2=memberName,
                     annotations=self._getAnnotations(i)))
             # Match member variable
-            elif self.__syntaxMatcher.matchMemberVariableScopeStart(line):
+            elif memberType == TYPE_CLASS:
                 # Some Objective C properties are across multiple lines, for example
                 # @property (assign, nonatomic)
                 #    NSInteger elapsedTime NS_SWIFT_NAME(elapsedTime);
-                end_line = self._findMatchingIndex(self.__fileLines, i, self.__syntaxMatcher.matchMemberVariableScopeEnd)
+                end_line = self.__findMemberVariableScopeEndIndex(i)
                 mvName = self.__syntaxMatcher.matchMemberVariable(' '.join(self.__fileLines[i:end_line+1]))
                 # On some languages(e.g., dart) the member variable with Function type can lead to the
                 # declaration to be formatted to multiple lines, such like:
@@ -423,10 +818,9 @@ class DefaultLineScanner(LineScanner):
                 # ```
                 # so we need to find upon current line to get the correct insert index
                 j = i
-                while j - 1 >= classScopeStartIndex + 1 and self.__fileLines[j - 1].strip() != "" and \
-                    not self.__syntaxMatcher.matchMemberVariableScopeStart(self.__fileLines[j - 1].strip()) and \
-                    not self.__syntaxMatcher.matchMemberVariableScopeEnd(self.__fileLines[j - 1].strip()) and \
-                        not self.__syntaxMatcher.matchAnnotation(self.__fileLines[j - 1].strip()):
+                while j - 1 >= classScopeStartIndex + 1 and self.__lineRecords[j - 1].strippedLine != "" and \
+                    not self.__getMemberVariableScopes(j - 1) and \
+                        not self.__getLineAnnotation(j - 1):
                     j -= 1
                 tokens.append(self._createToken(
                     offset=j,
@@ -437,10 +831,10 @@ class DefaultLineScanner(LineScanner):
                 i = end_line
 
             # Match member function
-            elif mfName := self.__syntaxMatcher.matchMemberFunction(line):
+            elif memberType == TYPE_API:
                 functionTokens = self._getFunctionTokens(
                     className=className,
-                    functionName=mfName,
+                    functionName=memberName,
                     lineIndex=i,
                     classScopeStartIndex=classScopeStartIndex,
                     classScopeEndIndex=classScopeEndIndex)
@@ -590,40 +984,40 @@ class DefaultLineScanner(LineScanner):
         lineIndex: int = 0
         while (lineIndex < len(self.__fileLines)):
             fileLine = self.__fileLines[lineIndex]
+            # Decide the declaration type of the line, in the order of class, enum, extension, top-level function
+            # and top-level const
+            declarationType, declarationName = self.__syntaxMatcher.matchDeclaration(fileLine) or (None, None)
+
             # Match class
-            className = self.__syntaxMatcher.matchClass(fileLine)
-            if className:
+            if declarationType == TYPE_CLASS:
                 classTokens = self._getClassTokens(
-                    className=className, lineIndex=lineIndex)
+                    className=declarationName, lineIndex=lineIndex)
                 tokens.extend(classTokens[1])
                 lineIndex = classTokens[0] + 1
                 continue
 
             # Match enum
-            enumName = self.__syntaxMatcher.matchEnum(fileLine)
-            if enumName:
+            if declarationType == TYPE_ENUM:
                 enumTokens = self._getEnumTokens(
-                    enumName=enumName, lineIndex=lineIndex)
+                    enumName=declarationName, lineIndex=lineIndex)
                 tokens.extend(enumTokens[1])
 
                 lineIndex = enumTokens[0] + 1
                 continue
 
             # Match extension
-            extensionName = self.__syntaxMatcher.matchExtension(fileLine)
-            if extensionName:
+            if declarationType == TYPE_EXTENSION:
                 extensionTokens = self._getClassTokens(
-                    className=extensionName, lineIndex=lineIndex, type=TYPE_EXTENSION)
+                    className=declarationName, lineIndex=lineIndex, type=TYPE_EXTENSION)
                 tokens.extend(extensionTokens[1])
                 lineIndex = extensionTokens[0] + 1
                 continue
 
             # Match top-level function
-            tfName = self.__syntaxMatcher.matchFunction(fileLine)
-            if tfName:
+            if declarationType == TYPE_API:
                 functionTokens = self._getFunctionTokens(
-                    className=className,
-                    functionName=tfName,
+                    className=None,
+                    functionName=declarationName,
                     lineIndex=lineIndex,
                     classScopeStartIndex=-1,
                     classScopeEndIndex=len(self.__fileLines))
@@ -632,12 +1026,11 @@ class DefaultLineScanner(LineScanner):
                 continue
 
             # Match top-level const
-            consName = self.__syntaxMatcher.matchConstant(fileLine)
-            if consName:
+            if declarationType == TYPE_CONSTANT:
                 tokens.append(self._createToken(
                     offset=lineIndex,
                     type=TYPE_CONSTANT,
-                    name1=consName,
+                    name1=declarationName,
                     annotations=self._getAnnotations(lineIndex)))
 
             lineIndex += 1
@@ -648,15 +1041,44 @@ class DefaultLineScanner(LineScanner):
 class TagBuilder:
 
     __syntaxMatcher: LanguageSyntaxMatcher
+    __lexer: Optional[SourceLexer]
 
-    def __init__(self, syntaxMatcher: LanguageSyntaxMatcher):
+    def __init__(self, syntaxMatcher: LanguageSyntaxMatcher, lexer: Optional[SourceLexer] = None):
+        """
+        If the `lexer` is set, the `DefaultLineScanner` matches the scopes on the code lines of it, see
+        `SourceLexer`.
+        """
         self.__syntaxMatcher = syntaxMatcher
+        self.__lexer = lexer
+
+    def getSyntaxMatcher(self) -> LanguageSyntaxMatcher:
+        return self.__syntaxMatcher
+
+    def getLexer(self) -> Optional[SourceLexer]:
+        return self.__lexer
 
     def _createLineScanner(self, syntaxMatcher: LanguageSyntaxMatcher, fileLines: List[str]) -> LineScanner:
-        return DefaultLineScanner(syntaxMatcher, fileLines=fileLines)
+        return DefaultLineScanner(syntaxMatcher, fileLines=fileLines, lexer=self.__lexer)
 
     def build(self, sourceFileLines: List[str]) -> List[str]:
         outputFiles: List[str] = []
+        for line in self.buildTaggedLines(sourceFileLines):
+            if isinstance(line, Token):
+                tag = line.toString()
+                if tag:
+                    outputFiles.append(tag)
+                continue
+
+            outputFiles.append(line)
+
+        return outputFiles
+
+    def buildTaggedLines(self, sourceFileLines: List[str]) -> List[Union[str, Token]]:
+        """
+        Return the source lines with the `Token`s placed where `build` places their tags, so the `Token`s can be
+        rendered directly without building and parsing the tags, see `Tag2Doc.processTaggedLines`.
+        """
+        outputFiles: List[Union[str, Token]] = []
         fileLines: List[str] = []
 
         for line in sourceFileLines:
@@ -675,10 +1097,7 @@ class TagBuilder:
 
             offset = token.getOffset()
             outputFiles.extend(fileLines[startIndex:offset])
-            tag = token.toString()
-            if tag:
-                outputFiles.append(tag)
-
+            outputFiles.append(token)
             outputFiles.append(fileLines[offset])
             index += 1
             startIndex = offset + 1
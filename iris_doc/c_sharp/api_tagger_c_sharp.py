@@ -1,9 +1,28 @@
-from iris_doc.api_tagger import LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
-from typing import List, Tuple
+from iris_doc.api_tagger import DeclarationPattern, LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
+from iris_doc.source_lexer import BLOCK_COMMENT, DOUBLE_QUOTED_STRING, LINE_COMMENT, SINGLE_QUOTED_STRING, SourceLexer
+from typing import List, Optional, Tuple
 import re
 
+# The patterns are compiled once on module load, the matchers are called for every line of the source files.
+_CLASS_PATTERN = re.compile(r'(public )?(abstract )?(class|interface) ([A-Za-z\<\>0-9_]+)(.*){?$')
+_MEMBER_FUNCTION_PATTERN = re.compile(
+    r'^(public |protected |private )?(abstract |virtual |override )?([A-Za-z0-9_]+ )([A-Za-z0-9z]+)\(.*\)')
+_MODIFIER_FIRST_MEMBER_FUNCTION_PATTERN = re.compile(
+    r'^(abstract |virtual |override )?(public |protected |private )?([A-Za-z0-9_]+)\s([A-Za-z0-9z]+)\(.*\)')
+_MEMBER_VARIABLE_PATTERN = re.compile(
+    r'^(public |protected |private )?([A-Za-z0-9_<>]+ )([A-Za-z0-9_]+)(;| \{ set; get; \}|\s\=\s.*;)')
+_ENUM_PATTERN = re.compile(r'public enum (.*)$', re.M | re.I)
+_ENUM_VALUE_PATTERN = re.compile(r'([A-Za-z0-9_]+) = (.*),?$')
+_ANNOTATION_PATTERN = re.compile(r'^([.*])')
+
 
 class CSharpSyntaxMatcher(LanguageSyntaxMatcher):
+    def _getDeclarationPattern(self) -> Optional[DeclarationPattern]:
+        return _DECLARATION_PATTERN
+
+    def _getMemberDeclarationPattern(self, className: str) -> Optional[DeclarationPattern]:
+        return _MEMBER_DECLARATION_PATTERN
+
     def matchComment(self, line: str) -> str:
         if line.strip().startswith("///"):
             return line
@@ -11,8 +30,7 @@ class CSharpSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def matchClass(self, line: str) -> str:
-        m = re.match(
-            r'(public )?(abstract )?(class|interface) ([A-Za-z\<\>0-9_]+)(.*){?$', line.strip())
+        m = _CLASS_PATTERN.match(line.strip())
         if m:
             return m.group(4)
 
@@ -22,42 +40,40 @@ class CSharpSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def matchMemberFunction(self, line: str) -> str:
-        m = re.match(
-            r'^(public |protected |private )?(abstract |virtual |override )?([A-Za-z0-9_]+ )([A-Za-z0-9z]+)\(.*\)', line.strip())
+        line = line.strip()
+        m = _MEMBER_FUNCTION_PATTERN.match(line)
         if m:
             return m.group(4)
 
-        m = re.match(
-            r'^(abstract |virtual |override )?(public |protected |private )?([A-Za-z0-9_]+)\s([A-Za-z0-9z]+)\(.*\)', line.strip())
+        m = _MODIFIER_FIRST_MEMBER_FUNCTION_PATTERN.match(line)
         if m:
             return m.group(4)
 
         return None
 
     def matchMemberVariable(self, line: str) -> str:
-        m = re.match(
-            r'^(public |protected |private )?([A-Za-z0-9_<>]+ )([A-Za-z0-9_]+)(;| \{ set; get; \}|\s\=\s.*;)', line.strip())
+        m = _MEMBER_VARIABLE_PATTERN.match(line.strip())
         if m:
             return m.group(3)
 
         return None
 
     def matchEnum(self, line: str) -> str:
-        m = re.match(r'public enum (.*)$', line.strip(), re.M | re.I)
+        m = _ENUM_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchEnumValue(self, line: str) -> str:
-        m = re.match(r'([A-Za-z0-9_]+) = (.*),?$', line.strip())
+        m = _ENUM_VALUE_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchAnnotation(self, line: str) -> str:
-        m = re.match(r'^([.*])', line.strip())
+        m = _ANNOTATION_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
@@ -109,6 +125,30 @@ class CSharpSyntaxMatcher(LanguageSyntaxMatcher):
         return line.strip().startswith("}")
 
 
+_DECLARATION_PATTERN = DeclarationPattern(
+    CSharpSyntaxMatcher,
+    ('matchClass', 'matchEnum', 'matchExtension', 'matchFunction', 'matchConstant'),
+    [(0, _CLASS_PATTERN, 4),
+     (1, _ENUM_PATTERN, 1)])
+
+_MEMBER_DECLARATION_PATTERN = DeclarationPattern(
+    CSharpSyntaxMatcher,
+    ('matchClassConstructor', 'matchMemberVariableScopeStart', 'matchMemberVariable', 'matchMemberFunction'),
+    [(1, _MEMBER_VARIABLE_PATTERN, None),
+     (2, _MEMBER_FUNCTION_PATTERN, 4),
+     (2, _MODIFIER_FIRST_MEMBER_FUNCTION_PATTERN, 4)])
+
+# The comments and the string literals of C#, the raw and the verbatim strings can span multiple lines
+_LEXER = SourceLexer([
+    BLOCK_COMMENT,
+    LINE_COMMENT,
+    r'"""(?s:.*?)(?:"""|\Z)',
+    r'(?:@\$?|\$@)"(?:[^"]|"")*"?',
+    DOUBLE_QUOTED_STRING,
+    SINGLE_QUOTED_STRING,
+])
+
+
 class CSharpTagBuilder(TagBuilder):
-    def __init__(self):
-        super().__init__(CSharpSyntaxMatcher())
+    def __init__(self, useLexer: bool = False):
+        super().__init__(CSharpSyntaxMatcher(), lexer=_LEXER if useLexer else None)
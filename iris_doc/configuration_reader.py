@@ -5,10 +5,12 @@ from fs.base import FS
 import yaml
 
 from iris_doc.language_specification import ErrorType, LanguageFormat
+from iris_doc.render_plan import RenderPlan
 
 
 class ConfigurationReader:
     __fmt = LanguageFormat()
+    __renderPlan: RenderPlan = None
     __fileSystem: FS
 
     def __init__(self, fileSystem: FS) -> None:
@@ -23,6 +25,7 @@ class ConfigurationReader:
             configDict = yaml.safe_load(file)
 
             self.__fmt = LanguageFormat.from_yaml(configDict)
+            self.__renderPlan = None
 
         return ErrorType.Ok
 
@@ -31,3 +34,12 @@ class ConfigurationReader:
             return ErrorType.Ok, self.__fmt
         else:
             return ErrorType.ConfigNotSetError, self.__fmt
+
+    def get_render_plan(self) -> RenderPlan:
+        """
+        Return the `RenderPlan` compiled from the `LanguageFormat`, which is compiled once per config.
+        """
+        if self.__renderPlan is None or self.__renderPlan.getFormat() is not self.__fmt:
+            self.__renderPlan = RenderPlan(self.__fmt)
+
+        return self.__renderPlan
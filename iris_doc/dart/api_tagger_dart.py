@@ -1,9 +1,52 @@
-from iris_doc.api_tagger import TYPE_API, TYPE_CLASS, TYPE_CONSTRUCT, TYPE_EXTENSION, LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
-from typing import List, Tuple
+from iris_doc.api_tagger import TYPE_API, TYPE_CLASS, TYPE_CONSTRUCT, TYPE_EXTENSION, DeclarationPattern, LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
+from typing import List, Optional, Tuple
 import re
 
+from iris_doc.language_specification import TagKey
+from iris_doc.source_lexer import BLOCK_COMMENT, DOUBLE_QUOTED_STRING, LINE_COMMENT, SINGLE_QUOTED_STRING, SourceLexer
+
+# The patterns are compiled once on module load, the matchers are called for every line of the source files.
+_CLASS_PATTERN = re.compile(r'(abstract )?class ([A-Za-z\<\>0-9_]+)(.*){?$', re.M | re.I)
+_MEMBER_FUNCTION_PATTERN = re.compile(
+    r'(static )?([A-Za-z0-9_]+)\<?(.*)?\>? ([A-Za-z0-9_]+)\((.*)(\)?( {)?|;?)$', re.M | re.I)
+_MEMBER_ARROW_FUNCTION_PATTERN = re.compile(
+    r'(static )?([A-Za-z0-9_]+)\<?(.*)?\>? ([A-Za-z0-9_]+)\((.*)\)\=\>(.*)', re.M | re.I)
+_FINAL_MEMBER_VARIABLE_PATTERN = re.compile(r'final (.*) ([A-Za-z0-9_]+);', re.M | re.I)
+_UNTYPED_MEMBER_VARIABLE_PATTERN = re.compile(r'([A-Za-z0-9_]+);$')
+_MEMBER_VARIABLE_PATTERN = re.compile(r'(.*) ([A-Za-z0-9_]+);$')
+_ENUM_PATTERN = re.compile(r'enum (.*) {', re.M | re.I)
+_ENUM_VALUE_PATTERN = re.compile(r'([A-Za-z0-9_]+),?$', re.M | re.I)
+_ANNOTATION_PATTERN = re.compile(r'^@(.*)')
+_EXTENSION_PATTERN = re.compile(r'extension (.*) on (.*) {', re.M | re.I)
+_TYPED_CONSTANT_PATTERN = re.compile(r'const ([A-Za-z\<\>0-9_]*) ([A-Za-z0-9_]+) = (.*);', re.M | re.I)
+_CONSTANT_PATTERN = re.compile(r'const ([A-Za-z0-9_]+) = (.*);', re.M | re.I)
+# The member function patterns skip the lines start with "final" as the `matchMemberFunction` does
+_NON_FINAL_MEMBER_FUNCTION_PATTERN = re.compile(
+    r'(?-i:(?!final))' + _MEMBER_FUNCTION_PATTERN.pattern, _MEMBER_FUNCTION_PATTERN.flags)
+_NON_FINAL_MEMBER_ARROW_FUNCTION_PATTERN = re.compile(
+    r'(?-i:(?!final))' + _MEMBER_ARROW_FUNCTION_PATTERN.pattern, _MEMBER_ARROW_FUNCTION_PATTERN.flags)
+# The class names matched by the `_CLASS_PATTERN`
+_CLASS_NAME_PATTERN = re.compile(r'[A-Za-z\<\>0-9_]+')
+
+
+def _constructorPatterns(className: str) -> Tuple[re.Pattern, ...]:
+    return (
+        # const constructor
+        re.compile(r'(const )?' + className + r'\(\{?', re.M | re.I),
+        # non-const constructor
+        re.compile(r'(const )?' + className + r'\.([A-Za-z\<\>0-9_]+)\((.*)?', re.M | re.I),
+        # factory constructor with .
+        re.compile(r'factory ' + className + r'\.([A-Za-z\<\>0-9_]+)\((.*)?', re.M | re.I),
+        # factory constructor
+        re.compile(r'factory ' + className + r'\((.*)?', re.M | re.I),
+    )
+
 
 class DartSyntaxMatcher(LanguageSyntaxMatcher):
+    # The constructor patterns of the class being scanned, which are built from the class name
+    __constructorClassName: Optional[str] = None
+    __constructorPatterns: Tuple[re.Pattern, ...] = ()
+
     def matchComment(self, line: str) -> str:
         if line.strip().startswith("///"):
             return line
@@ -11,109 +54,121 @@ class DartSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def matchClass(self, line: str) -> str:
-        m = re.match(
-            r'(abstract )?class ([A-Za-z\<\>0-9_]+)(.*){?$', line.strip(), re.M | re.I)
+        m = _CLASS_PATTERN.match(line.strip())
         if m:
             return m.group(2)
 
         return None
 
+    def __getConstructorPatterns(self, className: str) -> Tuple[re.Pattern, ...]:
+        if self.__constructorClassName != className:
+            self.__constructorPatterns = _constructorPatterns(className)
+            self.__constructorClassName = className
+
+        return self.__constructorPatterns
+
+    def _getDeclarationPattern(self) -> Optional[DeclarationPattern]:
+        return _DECLARATION_PATTERN
+
+    def _getMemberDeclarationPattern(self, className: str) -> Optional[DeclarationPattern]:
+        # The constructor patterns of the alternation match any class name of the `_CLASS_PATTERN`
+        if _CLASS_NAME_PATTERN.fullmatch(className):
+            return _MEMBER_DECLARATION_PATTERN
+
+        return None
+
     def matchClassConstructor(self, line: str, className: str) -> str:
+        constPattern, namedPattern, factoryNamedPattern, factoryPattern = self.__getConstructorPatterns(className)
+        line = line.strip()
+
         # const constructor
-        m = re.match(
-            r'(const )?' + className + r'\(\{?', line.strip(), re.M | re.I)
+        m = constPattern.match(line)
         if m:
             return className
 
         # non-const constructor
-        m = re.match(
-            r'(const )?' + className + r'\.([A-Za-z\<\>0-9_]+)\((.*)?', line.strip(), re.M | re.I)
+        m = namedPattern.match(line)
         if m:
             return m.group(2)
 
         # factory constructor with .
-        m = re.match(
-            r'factory ' + className + r'\.([A-Za-z\<\>0-9_]+)\((.*)?', line.strip(), re.M | re.I)
+        m = factoryNamedPattern.match(line)
         if m:
             return m.group(1)
 
         # factory constructor
-        m = re.match(
-            r'factory ' + className + r'\((.*)?', line.strip(), re.M | re.I)
+        m = factoryPattern.match(line)
         if m:
             return className
 
         return None
 
     def matchMemberFunction(self, line: str) -> str:
-        if line.strip().startswith("final"):
+        line = line.strip()
+        if line.startswith("final"):
             return None
 
-        m = re.match(
-            r'(static )?([A-Za-z0-9_]+)\<?(.*)?\>? ([A-Za-z0-9_]+)\((.*)(\)?( {)?|;?)$', line.strip(), re.M | re.I)
+        m = _MEMBER_FUNCTION_PATTERN.match(line)
         if m:
             return m.group(4)
 
-        m = re.match(
-            r'(static )?([A-Za-z0-9_]+)\<?(.*)?\>? ([A-Za-z0-9_]+)\((.*)\)\=\>(.*)', line.strip(), re.M | re.I)
+        m = _MEMBER_ARROW_FUNCTION_PATTERN.match(line)
         if m:
             return m.group(4)
 
         return None
 
     def matchMemberVariable(self, line: str) -> str:
+        line = line.strip()
         # final int? ipListSize;
-        m = re.match(
-            r'final (.*) ([A-Za-z0-9_]+);', line.strip(), re.M | re.I)
+        m = _FINAL_MEMBER_VARIABLE_PATTERN.match(line)
         if m:
             return m.group(2)
 
-        m = re.match(r'([A-Za-z0-9_]+);$', line.strip())
+        m = _UNTYPED_MEMBER_VARIABLE_PATTERN.match(line)
         if m:
             return m.group(1)
 
-        m = re.match(r'(.*) ([A-Za-z0-9_]+);$', line.strip())
+        m = _MEMBER_VARIABLE_PATTERN.match(line)
         if m:
             return m.group(2)
 
         return None
 
     def matchEnum(self, line: str) -> str:
-        m = re.match(r'enum (.*) {', line.strip(), re.M | re.I)
+        m = _ENUM_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchEnumValue(self, line: str) -> str:
-        m = re.match(r'([A-Za-z0-9_]+),?$', line.strip(), re.M | re.I)
+        m = _ENUM_VALUE_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchAnnotation(self, line: str) -> str:
-        m = re.match(r'^@(.*)', line.strip())
+        m = _ANNOTATION_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchExtension(self, line: str) -> str:
-        m = re.match(
-            r'extension (.*) on (.*) {', line.strip(), re.M | re.I)
+        m = _EXTENSION_PATTERN.match(line.strip())
         if m:
             return m.group(1)
         return None
 
     def matchConstant(self, line: str) -> str:
-        m = re.match(
-            r'const ([A-Za-z\<\>0-9_]*) ([A-Za-z0-9_]+) = (.*);', line.strip(), re.M | re.I)
+        line = line.strip()
+        m = _TYPED_CONSTANT_PATTERN.match(line)
         if m:
             return m.group(2)
 
-        m = re.match(
-            r'const ([A-Za-z0-9_]+) = (.*);', line.strip(), re.M | re.I)
+        m = _CONSTANT_PATTERN.match(line)
         if m:
             return m.group(1)
 
@@ -152,31 +207,84 @@ class DartSyntaxMatcher(LanguageSyntaxMatcher):
 
         return parameterList
 
+
+_DECLARATION_PATTERN = DeclarationPattern(
+    DartSyntaxMatcher,
+    ('matchClass', 'matchEnum', 'matchExtension', 'matchFunction', 'matchMemberFunction', 'matchConstant'),
+    [(0, _CLASS_PATTERN, 2),
+     (1, _ENUM_PATTERN, 1),
+     (2, _EXTENSION_PATTERN, 1),
+     (3, _NON_FINAL_MEMBER_FUNCTION_PATTERN, 4),
+     (3, _NON_FINAL_MEMBER_ARROW_FUNCTION_PATTERN, 4),
+     (4, _TYPED_CONSTANT_PATTERN, 2),
+     (4, _CONSTANT_PATTERN, 1)])
+
+_MEMBER_DECLARATION_PATTERN = DeclarationPattern(
+    DartSyntaxMatcher,
+    ('matchClassConstructor', 'matchMemberVariableScopeStart', 'matchMemberVariable', 'matchMemberFunction'),
+    [(0, pattern, None) for pattern in _constructorPatterns(_CLASS_NAME_PATTERN.pattern)] +
+    [(1, _FINAL_MEMBER_VARIABLE_PATTERN, None),
+     (1, _UNTYPED_MEMBER_VARIABLE_PATTERN, None),
+     (1, _MEMBER_VARIABLE_PATTERN, None),
+     (2, _NON_FINAL_MEMBER_FUNCTION_PATTERN, 4),
+     (2, _NON_FINAL_MEMBER_ARROW_FUNCTION_PATTERN, 4)])
+
+# The comments and the string literals of Dart, the raw strings start with an `r` which is not part of an identifier
+_LEXER = SourceLexer([
+    BLOCK_COMMENT,
+    LINE_COMMENT,
+    r"r(?<![\w$]r)'''(?s:.*?)(?:'''|\Z)",
+    r'r(?<![\w$]r)"""(?s:.*?)(?:"""|\Z)',
+    r"'''(?s:\\.|.)*?(?:'''|\Z)",
+    r'"""(?s:\\.|.)*?(?:"""|\Z)',
+    r"r(?<![\w$]r)'[^'\n]*'?",
+    r'r(?<![\w$]r)"[^"\n]*"?',
+    DOUBLE_QUOTED_STRING,
+    SINGLE_QUOTED_STRING,
+])
+
+
 class DartToken(Token):
+    __slots__ = ()
 
     __buildInAnnotations: List[str] = [
         "private", "protected", "override", "internal"]
 
-    def toString(self):
-        type = self._type
+    def __isBuildIn(self) -> bool:
+        return next((x for x in self._annotations if x in self.__buildInAnnotations), None) is not None
 
-        if next((x for x in self._annotations if x in self.__buildInAnnotations), None):
-            return None
+    def __isNoDoc(self) -> bool:
+        type = self._type
 
         if type == TYPE_EXTENSION:
-            return "/// @nodoc"
+            return True
 
         # Force mark the function/member generated by json_serializable/terra to @nodoc
         # TODO(littlegnal): Decouple this from the tag, maybe it's better to move to tag2doc.py
         if type == TYPE_CONSTRUCT:
             if self._name2.lower() == "fromjson":
-                return "/// @nodoc"
+                return True
         if type == TYPE_API:
             if (self._name2 and self._name2.lower() == "tojson") or \
                     self._name1.lower().endswith("ext") and (self._name2.lower() == "value" or self._name2.lower() == "fromvalue"):
-                return "/// @nodoc"
+                return True
+
+        return False
+
+    def toString(self):
+        if self.__isBuildIn():
+            return None
+
+        if self.__isNoDoc():
+            return "/// @nodoc"
+
+        return super()._buildTag(type=self._type, name1=self._name1, name2=self._name2)
+
+    def getTagKey(self) -> Optional[TagKey]:
+        if self.__isBuildIn() or self.__isNoDoc():
+            return None
 
-        return super()._buildTag(type=type, name1=self._name1, name2=self._name2)
+        return super().getTagKey()
 
 
 class DartLineScanner(DefaultLineScanner):
@@ -190,8 +298,8 @@ class DartLineScanner(DefaultLineScanner):
 
 
 class DartTagBuilder(TagBuilder):
-    def __init__(self):
-        super().__init__(DartSyntaxMatcher())
+    def __init__(self, useLexer: bool = False):
+        super().__init__(DartSyntaxMatcher(), lexer=_LEXER if useLexer else None)
 
     def _createLineScanner(self, syntaxMatcher: LanguageSyntaxMatcher, fileLines: List[str]) -> LineScanner:
-        return DartLineScanner(syntaxMatcher, fileLines)
+        return DartLineScanner(syntaxMatcher, fileLines, lexer=self.getLexer())
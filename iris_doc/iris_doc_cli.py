@@ -19,8 +19,10 @@ from iris_doc.oc.api_tagger_oc import ObjCTagBuilder
 from iris_doc.oc.post_phase_oc import PostPhaseObjC
 from iris_doc.export_file_parser import DefaultExportFileParser, ExportFileParser
 from iris_doc.language_specification import CommentSource, LanguageFormat, LanguageSpecificationModule, LanguageSpecificationConfig
+from iris_doc.miss_reporter import MissReporter
 
 from iris_doc.post_phase import DefaultPostPhase, PostPhase
+from iris_doc.sqlite_comment_source_store import SqliteCommentSourceStore
 from iris_doc.tag2doc import Tag2Doc
 
 import fs.osfs
@@ -37,31 +39,6 @@ import requests
 from iris_doc.ts.post_phase_ts import PostPhaseTS
 
 
-class TagToNoDocPostPhase(PostPhase):
-
-    __format: LanguageFormat
-    __code: str
-    __tag2Doc: Tag2Doc
-
-    def __init__(self, tag2Doc: Tag2Doc, format: LanguageFormat, code: str) -> None:
-        self.__tag2Doc = tag2Doc
-        self.__format = format
-        self.__code = code
-
-    def run(self) -> Any:
-        codeLines: List[str] = self.__code.splitlines()
-        newCodeLines: List[str] = []
-        for line in codeLines:
-            if line.strip().startswith("/*") and line.strip().endswith("*/"):
-                newCodeLines.append(
-                    self.__tag2Doc._generateComment(self.__format, None))
-                continue
-
-            newCodeLines.append(line)
-
-        return '\n'.join(newCodeLines)
-
-
 def _processExportFile(
         languageSpecificationConfig: LanguageSpecificationConfig,
         configPath: str,
@@ -71,43 +48,68 @@ def _processExportFile(
         exportFilePath: str,
         templateFilePathList: List[str],
         fileSystem: FS,
-        isForceMarkNoDoc: bool):
+        isForceMarkNoDoc: bool,
+        templateCacheDir: str = None,
+        templateStorePath: str = None,
+        maxWorkers: int = None,
+        missReporter: MissReporter = None,
+        isRenderTokens: bool = False):
     config = ConfigurationReader(fileSystem)
     config.set_config(configPath)
     format = config.get_fmt()[1]
+    renderPlan = config.get_render_plan()
 
     module = LanguageSpecificationModule(
         fileSystem=fileSystem, config=languageSpecificationConfig)
     module.setLanguageSpecificationConfig(languageSpecificationConfig)
     for p in templateFilePathList:
         module.addTemplateFilePath(p)
-    module.deserialize()
-
-    exportFiles = exportFileParser.parseExportFiles(exportFilePath)
-    for path in exportFiles:
-        backupFilePath = path + ".backup"
-        copy_file(fileSystem, path, fileSystem, backupFilePath)
-
-        ApiTagger(fileSystem, tagBuilder).process(backupFilePath)
-
-        code = fileSystem.readtext(backupFilePath)
+    module.setCacheDir(templateCacheDir)
+    module.setMaxWorkers(maxWorkers)
+    store: SqliteCommentSourceStore = None
+    if templateStorePath:
+        store = SqliteCommentSourceStore(templateStorePath)
+        module.setCommentSourceStore(store, isOwned=True)
+    try:
+        module.deserialize()
+
+        # Share one `Tag2Doc` by the export files, so the comments rendered for a file are reused by the others
         tag2Doc = Tag2Doc(
-            format=format, commentSources=module.getAllCommentSources())
-        processedCode = tag2Doc.process(code)
-
-        if isForceMarkNoDoc:
-            noDocPostPhase = TagToNoDocPostPhase(
-                tag2Doc=tag2Doc, format=format, code=processedCode)
-            processedCode = noDocPostPhase.run()
-
-        backupFile = fileSystem.open(backupFilePath, mode="w")
-        backupFile.write(processedCode)
-        backupFile.flush()
-        backupFile.close()
-
-        copy_file(fileSystem, backupFilePath, fileSystem, path)
-
-        fileSystem.remove(backupFilePath)
+            format=format, commentSources=module.getAllCommentSources(), renderPlan=renderPlan,
+            isForceMarkNoDoc=isForceMarkNoDoc, missReporter=missReporter)
+
+        exportFiles = exportFileParser.parseExportFiles(exportFilePath)
+        for path in exportFiles:
+            backupFilePath = path + ".backup"
+            tag2Doc.setFilePath(path)
+
+            if isRenderTokens:
+                # Render the tokens found by the `tagBuilder` directly, instead of writing the tags to the file and
+                # parsing them back
+                with fileSystem.open(path) as file:
+                    taggedLines = tagBuilder.buildTaggedLines(str(file.read()).splitlines())
+
+                with fileSystem.open(backupFilePath, mode="w") as backupFile:
+                    tag2Doc.writeTaggedLines(taggedLines, backupFile)
+            else:
+                copy_file(fileSystem, path, fileSystem, backupFilePath)
+
+                ApiTagger(fileSystem, tagBuilder).process(backupFilePath)
+
+                # Process the tagged file line by line into another file, so the whole output is not kept in memory
+                processedFilePath = backupFilePath + ".processed"
+                with fileSystem.open(backupFilePath) as taggedFile, \
+                        fileSystem.open(processedFilePath, mode="w") as processedFile:
+                    tag2Doc.processLines(taggedFile, processedFile)
+                fileSystem.move(processedFilePath, backupFilePath, overwrite=True)
+
+            copy_file(fileSystem, backupFilePath, fileSystem, path)
+
+            fileSystem.remove(backupFilePath)
+    finally:
+        # Close the store even if an export file failed to process, so its connection is not left open
+        if store is not None:
+            store.close()
 
     postPhase.run()
 
@@ -129,6 +131,28 @@ def run():
                         help='Whether change the dita id type from callback to api')
     parser.add_argument('--export-file-path', type=str,
                         help='The path of the export file')
+    parser.add_argument('--cache-dir', type=str,
+                        help='The directory to cache the parsed template files, which can be reused by later runs')
+    parser.add_argument('--template-store', type=str,
+                        help='The path of the SQLite file to keep the parsed template files in instead of the memory, '
+                        'which can be shared by later runs')
+    parser.add_argument('--jobs', '-j', type=int,
+                        help='The max number of processes to parse the template files, default to 1, which parses them '
+                        'one by one in a bounded memory. Each process reads a whole template file in memory, so it '
+                        'only pays off with multiple large template files and CPUs')
+    parser.add_argument('--verbose', '-v', default=False, action='store_true',
+                        help='Print each tag not found and each parse error as it happens, beside the summary')
+    parser.add_argument('--lexer', default=False, action='store_true',
+                        help='Match the scopes on the source lines with the comments and the string literals blanked out, '
+                        'so the braces inside them are ignored. The raw and triple quoted strings of Dart, the template '
+                        'literals of TypeScript, the verbatim, interpolated and raw strings of C# and the NSString '
+                        'literals of Objective-C are lexed. The string literals nested in the interpolations, e.g., '
+                        '\'${a ? \'{\' : b}\', and the regular expression literals of TypeScript are not lexed')
+    parser.add_argument('--render-tokens', default=False, action='store_true',
+                        help='Render the tokens found in the export files directly, instead of writing the tags to '
+                        'the files and parsing them back')
+    parser.add_argument('--miss-report', type=str,
+                        help='The path to write the JSON summary of the tags not found and the parse errors')
     args = parser.parse_args()
 
     isCallback2class: Boolean
@@ -140,6 +164,9 @@ def run():
     templateFile = args.template
     templateUrls = args.template_url
     configPath = args.config
+    templateCacheDir = os.path.realpath(args.cache_dir) if args.cache_dir else None
+    templateStorePath = os.path.realpath(args.template_store) if args.template_store else None
+    missReporter = MissReporter(verbose=args.verbose)
 
     tagBuilder: TagBuilder
     exportFileParser: ExportFileParser
@@ -158,28 +185,28 @@ def run():
         isCallback2class = True
         isCallback2api = False
         exportFileParser = ExportFileParserDart(fileSystem=fileSystem)
-        tagBuilder = DartTagBuilder()
+        tagBuilder = DartTagBuilder(useLexer=args.lexer)
         exportFileDir = os.path.dirname(exportFilePath)
         postPhase = PostPhaseDart(exportFileDir)
     elif lang == "oc":
         isCallback2class = False
         isCallback2api = True
         exportFileParser = ExportFileParserObjC(fileSystem=fileSystem)
-        tagBuilder = ObjCTagBuilder()
+        tagBuilder = ObjCTagBuilder(useLexer=args.lexer)
         exportFileDir = os.path.dirname(exportFilePath)
         postPhase = PostPhaseObjC(exportFileDir)
     elif lang == "ts":
         isCallback2class = False
         isCallback2api = True
         exportFileParser = ExportFileParserTS(fileSystem=fileSystem)
-        tagBuilder = TSTagBuilder()
+        tagBuilder = TSTagBuilder(useLexer=args.lexer)
         exportFileDir = os.path.dirname(exportFilePath)
         postPhase = PostPhaseTS(exportFileDir)
     elif lang == "c_sharp":
         isCallback2class = False
         isCallback2api = True
         exportFileParser = ExportFileParserCSharp(fileSystem=fileSystem)
-        tagBuilder = CSharpTagBuilder()
+        tagBuilder = CSharpTagBuilder(useLexer=args.lexer)
         exportFileDir = os.path.dirname(exportFilePath)
         postPhase = PostPhaseCSharp(exportFileDir)
     else:
@@ -218,6 +245,16 @@ def run():
                        exportFilePath=exportFilePath,
                        templateFilePathList=templateFilePathList,
                        fileSystem=fileSystem,
-                       isForceMarkNoDoc=isForceMarkNoDoc)
+                       isForceMarkNoDoc=isForceMarkNoDoc,
+                       templateCacheDir=templateCacheDir,
+                       templateStorePath=templateStorePath,
+                       maxWorkers=args.jobs,
+                       missReporter=missReporter,
+                       isRenderTokens=args.render_tokens)
+
+    missReporter.writeSummary()
+    if args.miss_report:
+        with open(args.miss_report, 'w', encoding='utf-8') as file:
+            file.write(missReporter.toJson())
 
     fileSystem.close()
@@ -1,14 +1,35 @@
+from abc import abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from enum import IntEnum
+import hashlib
+import io
 import json
+import os
+import pickle
 import re
+import sys
+import threading
 from fs.base import FS
-from typing import Dict, List
+from typing import Deque, Dict, Iterable, Iterator, List, MutableMapping, Optional, Sequence, Set, TextIO, Tuple
+
+import iris_doc
+
+# The version of the pickled layout of the template index cache, which is bumped on every change of the
+# `MemoryCommentSourceStore` or `CommentSource` attributes, so the caches of the older layouts are not loaded.
+_CACHE_FORMAT_VERSION = 1
 
 
 class Structure:
+    __slots__ = ()
+
     @classmethod
     def from_json(cls, data):
-        return cls(**(json.loads(data)))
+        return cls.from_dict(json.loads(data))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
 
     @classmethod
     def from_yaml(cls, data):
@@ -26,6 +47,10 @@ class ErrorType(IntEnum):
 
 
 class CommentSource(Structure):
+    # Large templates produce tens of thousands of `CommentSource`s, use `__slots__` to avoid the per-instance dict.
+    __slots__ = ('type_', 'id', 'name', 'description', 'parameters', 'returns', 'deprecated', 'note', 'warning',
+                 'is_hide')
+
     def __init__(self, type_: str = None,
                  id: str = None,
                  name: str = None,
@@ -94,122 +119,768 @@ class LanguageSpecificationConfig:
         self.idPatternV2 = idPatternV2
 
 
-class LanguageSpecificationModule:
-    __fileSystem: FS
-    __config: LanguageSpecificationConfig
-    __commentSources: Dict[str, CommentSource] = {}
-    __templateFilePaths: List[str] = []
+_JSON_WHITESPACE = " \t\r\n"
+_JSON_NUMBER_CHARS = "0123456789+-.eE"
+
+
+def iterJsonArray(file: TextIO, chunkSize: int = 64 * 1024) -> Iterator:
+    """
+    Decode the top-level JSON array of the `file` incrementally, and yield the elements one by one, so the
+    whole file is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    isEof = False
+
+    def readMore():
+        nonlocal buffer, position, isEof
+        chunk = file.read(chunkSize)
+        isEof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def skip(chars: str):
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in chars:
+                position += 1
+            if position < len(buffer) or isEof:
+                return
+            readMore()
+
+    skip(_JSON_WHITESPACE)
+    if position == len(buffer) or buffer[position] != "[":
+        raise ValueError("The template should be a JSON array")
+    position += 1
+
+    skip(_JSON_WHITESPACE)
+    if position < len(buffer) and buffer[position] == "]":
+        position += 1
+    else:
+        while True:
+            while True:
+                try:
+                    element, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # The element is not read completely yet
+                    if isEof:
+                        raise
+                    readMore()
+                    continue
+
+                # A value at the end of the buffer may be truncated, and so may a number followed by a character of
+                # a number, e.g., `1.5e10` read as `1.` and `5e10`, read more to make sure it's completed.
+                if not isEof and (end == len(buffer) or (isinstance(element, (int, float)) and
+                                                         buffer[end] in _JSON_NUMBER_CHARS)):
+                    readMore()
+                    continue
+                break
+
+            position = end
+            yield element
+
+            skip(_JSON_WHITESPACE)
+            if position == len(buffer):
+                raise ValueError("The JSON array is not closed")
+            separator = buffer[position]
+            position += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Expect `,` or `]` after the element of the JSON array rather than `{separator}`")
+            skip(_JSON_WHITESPACE)
+
+    skip(_JSON_WHITESPACE)
+    if position < len(buffer):
+        raise ValueError("Unexpected text after the JSON array")
+
+
+def splitCommentSourceId(id: str) -> Tuple[str, Optional[List[str]]]:
+    """
+    Split the id to the base id and the parameter list, e.g., `api_rtcengine_joinchannel##token#channelid`
+    to `("api_rtcengine_joinchannel", ["token", "channelid"])`. The parameter list is None if the id has no `##`.
+    """
+    if "##" not in id:
+        return id, None
+
+    idSplit = id.split("##")
+    return idSplit[0], idSplit[1].split("#")
+
+
+class TagKey:
+    """
+    The lowercase id of a tag or a `CommentSource`, e.g., `api_rtcengine_joinchannel##token#channelid`, with its
+    parts split once on creation. The keys are equal if the ids are equal.
+    """
+    __slots__ = ('id', 'type', 'owner', 'member', 'baseId', 'parameters', 'sortedParameters')
+
+    id: str
+    type: str
+    owner: Optional[str]
+    member: Optional[str]
+    # The id without the parameter list
+    baseId: str
+    # The parameter list in the id, or None if the id has no `##`
+    parameters: Optional[Tuple[str, ...]]
+    sortedParameters: Optional[Tuple[str, ...]]
+
+    def __init__(self, id: str) -> None:
+        self.id = id
+        self.baseId, parameters = splitCommentSourceId(id)
+        if parameters is not None:
+            self.parameters = tuple(parameters)
+            self.sortedParameters = tuple(sorted(parameters))
+        else:
+            self.parameters = None
+            self.sortedParameters = None
+
+        # The owner or member may contain `_` as well, so they are only informative, the `id` is the identity.
+        parts = self.baseId.split('_', 2)
+        self.type = parts[0]
+        self.owner = parts[1] if len(parts) > 1 else None
+        self.member = parts[2] if len(parts) > 2 else None
 
-    def __init__(self, fileSystem: FS, config: LanguageSpecificationConfig) -> None:
-        self.__fileSystem = fileSystem
-        self.__config = config
-        self.__commentSources.clear()
-        self.__templateFilePaths.clear()
+    @classmethod
+    def fromParts(cls, type: str, owner: str, member: str = None) -> 'TagKey':
+        """
+        Build the key as `{type}_{owner}_{member}` lowercase, the `member` may contain the parameter list,
+        e.g., `joinChannel##token#channelId`
+        """
+        id = "{}_{}".format(type, owner)
+        if member is not None:
+            id = "{}_{}".format(id, member)
+
+        return cls(id.lower())
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TagKey) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f'TagKey({self.id!r})'
+
+
+def _createMemberCommentSource(parentId: str, name: str, description: str, isHide: bool) -> CommentSource:
+    memberId = f'{parentId}_{name.lower()}'
+    return CommentSource(
+        id=memberId,
+        name=name,
+        description=description,
+        is_hide=isHide)
+
+
+class CommentSourceStore(MutableMapping[str, CommentSource]):
+    """
+    The storage of the `CommentSource`s keyed by the normalized id, e.g., `api_rtcengine_joinchannel##token#channelid`.
+    Beside the lookup by id, the store allow to find the overloaded API by its base id and sorted parameter list.
+    """
+
+    @abstractmethod
+    def findBySortedParameters(self, baseId: str, sortedParameters: Sequence[str]) -> Optional[CommentSource]:
+        """
+        Return the first `CommentSource` in insertion order, which id has the `baseId` and the same parameters
+        after sorted, or None
+        """
+        pass
 
-    def addTemplateFilePath(self, path: str):
-        self.__templateFilePaths.append(path)
+    @abstractmethod
+    def findByBaseId(self, baseId: str) -> Optional[CommentSource]:
+        """
+        Return the first `CommentSource` in insertion order, which id without parameter list is the `baseId`, or None
+        """
+        pass
 
-    def setLanguageSpecificationConfig(self, config: LanguageSpecificationConfig):
-        self.__config = config
+    @abstractmethod
+    def getMetadata(self, key: str) -> Optional[str]:
+        pass
 
-    def specialize(self) -> bool:
+    @abstractmethod
+    def setMetadata(self, key: str, value: str):
+        pass
+
+    def setMembers(self, parentId: str, parameters: List[Dict[str, str]], isHide: bool):
+        """
+        Add the parameters of the class or enum `parentId` as standalone `CommentSource`s with the id
+        `{parentId}_{parameter name}`, which overwrite the existing ones with the same id.
+        """
+        for parameter in parameters:
+            if parameter:
+                for name in parameter:
+                    commentSource = _createMemberCommentSource(parentId, name, parameter[name], isHide)
+                    self[commentSource.id] = commentSource
+
+    def commit(self):
+        """
+        Persist the changes to the store if needed
+        """
         pass
 
-    def __parseJson(self, jsonContent: str):
-        elementsCopy = json.loads(jsonContent)
-        for element in json.loads(jsonContent):
-            id_: str = element['id']
 
-            name_: str = element['name'].lower()
+class _MemberParameters:
+    __slots__ = ('sequence', 'parameters', 'isHide', 'names')
+
+    sequence: int
+    parameters: List[Dict[str, str]]
+    isHide: bool
+    # The lower case parameter name to the (name, description), which is built on first lookup
+    names: Optional[Dict[str, Tuple[str, str]]]
+
+    def __init__(self, sequence: int, parameters: List[Dict[str, str]], isHide: bool) -> None:
+        self.sequence = sequence
+        self.parameters = parameters
+        self.isHide = isHide
+        self.names = None
+
+    def getNames(self) -> Dict[str, Tuple[str, str]]:
+        names = self.names
+        if names is None:
+            names = {}
+            for parameter in self.parameters:
+                if parameter:
+                    for name in parameter:
+                        names[name.lower()] = (name, parameter[name])
+            self.names = names
+
+        return names
+
+
+class MemoryCommentSourceStore(CommentSourceStore):
+    """
+    The in-memory `CommentSourceStore` backed by the given dict, which is not copied, and should only be changed
+    through the store afterward.
+
+    The members added by `setMembers` are not created up front, they are resolved on first lookup, and the lookup
+    result is the same as they are written one by one at the time `setMembers` is called.
+
+    `findBySortedParameters` and `findByBaseId` are answered by the indexes of the first id in insertion order,
+    which are kept up to date on insertion, and rebuilt on the next lookup after a deletion.
+    """
+    __commentSources: Dict[str, CommentSource]
+    # (base id, sorted parameters) of the `TagKey` to the first id
+    __signatureIndex: Dict[Tuple[str, Tuple[str, ...]], str]
+    __baseIndex: Dict[str, str]
+    __isIndexDirty: bool
+    __metadata: Dict[str, str]
+    __members: Dict[str, List[_MemberParameters]]
+    __deletedMembers: Set[str]
+    __sequence: int
+    __lock: threading.Lock
+
+    def __init__(self, commentSources: Dict[str, CommentSource] = None) -> None:
+        self.__commentSources = commentSources if commentSources is not None else {}
+        self.__metadata = {}
+        self.__members = {}
+        self.__deletedMembers = set()
+        self.__sequence = 0
+        self.__lock = threading.Lock()
+        self.__signatureIndex = {}
+        self.__baseIndex = {}
+        self.__isIndexDirty = len(self.__commentSources) > 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_MemoryCommentSourceStore__lock']
+        # The indexes are cheap to rebuild, keep them out of the pickle.
+        state['_MemoryCommentSourceStore__signatureIndex'] = {}
+        state['_MemoryCommentSourceStore__baseIndex'] = {}
+        state['_MemoryCommentSourceStore__isIndexDirty'] = True
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def isValidState(self) -> bool:
+        """
+        Return whether the unpickled store has the attributes of the current layout
+        """
+        return all(f'_MemoryCommentSourceStore__{name}' in self.__dict__ for name in
+                   ('commentSources', 'metadata', 'members', 'deletedMembers', 'sequence')) \
+            and all(isinstance(commentSource, CommentSource) for commentSource in self.__commentSources.values())
+
+    def __indexId(self, id: str):
+        key = TagKey(id)
+        self.__baseIndex.setdefault(key.baseId, id)
+        if key.sortedParameters is not None:
+            self.__signatureIndex.setdefault((key.baseId, key.sortedParameters), id)
+
+    def __ensureIndex(self):
+        if not self.__isIndexDirty:
+            return
+
+        with self.__lock:
+            if self.__isIndexDirty:
+                self.__signatureIndex = {}
+                self.__baseIndex = {}
+                for id in list(self.__commentSources.keys()):
+                    self.__indexId(id)
+                self.__isIndexDirty = False
+
+    def __resolveMember(self, id: str) -> Optional[CommentSource]:
+        if not self.__members or id in self.__deletedMembers:
+            return None
+
+        # The parent id may contain `_` as well, try every split, the latest added member wins.
+        found: Optional[Tuple[_MemberParameters, Tuple[str, str]]] = None
+        index = id.find('_')
+        while index != -1:
+            memberParametersList = self.__members.get(id[:index])
+            if memberParametersList:
+                memberName = id[index + 1:]
+                for memberParameters in reversed(memberParametersList):
+                    if found and memberParameters.sequence < found[0].sequence:
+                        break
+                    member = memberParameters.getNames().get(memberName)
+                    if member:
+                        found = (memberParameters, member)
+                        break
+            index = id.find('_', index + 1)
+
+        if found is None:
+            return None
+
+        memberParameters, (name, description) = found
+        return _createMemberCommentSource(id[:len(id) - len(name) - 1], name, description, memberParameters.isHide)
+
+    def __materializeMember(self, id: str) -> Optional[CommentSource]:
+        with self.__lock:
+            commentSource = self.__commentSources.get(id)
+            if commentSource is None:
+                commentSource = self.__resolveMember(id)
+                if commentSource is not None:
+                    self.__commentSources[id] = commentSource
+                    if not self.__isIndexDirty:
+                        self.__indexId(id)
+
+            return commentSource
+
+    def __getitem__(self, id: str) -> CommentSource:
+        commentSource = self.__commentSources.get(id)
+        if commentSource is None:
+            commentSource = self.__materializeMember(id)
+            if commentSource is None:
+                raise KeyError(id)
+
+        return commentSource
+
+    def __setitem__(self, id: str, commentSource: CommentSource):
+        if not self.__isIndexDirty and id not in self.__commentSources:
+            self.__indexId(id)
+        self.__commentSources[id] = commentSource
+        if self.__deletedMembers:
+            self.__deletedMembers.discard(id)
+
+    def __delitem__(self, id: str):
+        if id not in self:
+            raise KeyError(id)
+
+        if self.__commentSources.pop(id, None) is not None:
+            self.__isIndexDirty = True
+        if self.__resolveMember(id) is not None:
+            self.__deletedMembers.add(id)
+
+    def __iter__(self) -> Iterator[str]:
+        ids = list(self.__commentSources)
+        yield from ids
+
+        seen = set(ids)
+        for parentId, memberParametersList in list(self.__members.items()):
+            for memberParameters in memberParametersList:
+                for memberName in memberParameters.getNames():
+                    memberId = f'{parentId}_{memberName}'
+                    if memberId not in seen and memberId not in self.__deletedMembers:
+                        seen.add(memberId)
+                        yield memberId
+
+    def __len__(self) -> int:
+        if not self.__members:
+            return len(self.__commentSources)
+        return sum(1 for _ in self)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self.__commentSources or self.__resolveMember(id) is not None
+
+    def clear(self):
+        self.__commentSources.clear()
+        self.__members.clear()
+        self.__deletedMembers.clear()
+        self.__signatureIndex = {}
+        self.__baseIndex = {}
+        self.__isIndexDirty = False
+
+    def setMembers(self, parentId: str, parameters: List[Dict[str, str]], isHide: bool):
+        self.__sequence += 1
+        self.__members.setdefault(parentId, []).append(
+            _MemberParameters(self.__sequence, parameters, isHide))
+
+        # The members overwrite the existing `CommentSource`s with the same id
+        for parameter in parameters:
+            if parameter:
+                for name in parameter:
+                    memberId = f'{parentId}_{name.lower()}'
+                    if self.__commentSources.pop(memberId, None) is not None:
+                        self.__isIndexDirty = True
+                    self.__deletedMembers.discard(memberId)
+
+    def findBySortedParameters(self, baseId: str, sortedParameters: Sequence[str]) -> Optional[CommentSource]:
+        self.__ensureIndex()
+        id = self.__signatureIndex.get((baseId, tuple(sortedParameters)))
+        return self.__commentSources[id] if id is not None else None
+
+    def findByBaseId(self, baseId: str) -> Optional[CommentSource]:
+        self.__ensureIndex()
+        id = self.__baseIndex.get(baseId)
+        if id is not None:
+            return self.__commentSources[id]
+
+        return self.__materializeMember(baseId)
+
+    def getMetadata(self, key: str) -> Optional[str]:
+        return self.__metadata.get(key)
+
+    def setMetadata(self, key: str, value: str):
+        self.__metadata[key] = value
+
+    def snapshot(self) -> 'FrozenCommentSourceStore':
+        """
+        Return an immutable copy of this store
+        """
+        snapshot = FrozenCommentSourceStore(dict(self.__commentSources))
+        snapshot.__metadata = dict(self.__metadata)
+        snapshot.__members = {parentId: list(memberParametersList)
+                              for parentId, memberParametersList in self.__members.items()}
+        snapshot.__deletedMembers = set(self.__deletedMembers)
+        snapshot.__sequence = self.__sequence
+        if not self.__isIndexDirty:
+            snapshot.__signatureIndex = dict(self.__signatureIndex)
+            snapshot.__baseIndex = dict(self.__baseIndex)
+            snapshot.__isIndexDirty = False
+        return snapshot
+
+
+class FrozenCommentSourceStore(MemoryCommentSourceStore):
+    """
+    The immutable `MemoryCommentSourceStore`, which is safe to be read from multiple threads.
+    """
+
+    def __setitem__(self, id: str, commentSource: CommentSource):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    def __delitem__(self, id: str):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    def clear(self):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    def setMembers(self, parentId: str, parameters: List[Dict[str, str]], isHide: bool):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    def setMetadata(self, key: str, value: str):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+
+def _internParameters(parameters: Optional[List[Dict[str, str]]]) -> Optional[List[Dict[str, str]]]:
+    # The parameter names and descriptions are repeated a lot among the overloaded APIs and class members.
+    if not parameters:
+        return parameters
+
+    return [{sys.intern(k): sys.intern(v) if isinstance(v, str) else v for k, v in p.items()} if p else p
+            for p in parameters]
+
+
+def _indexTemplateNames(file: TextIO) -> Dict[str, str]:
+    # Index the template names by id once, so the parent lookup in `_parseJson` doesn't need to scan the
+    # whole template for every element. Keep the first element of a duplicated id, which is what a linear
+    # scan returns.
+    namesById: Dict[str, str] = {}
+    for e in iterJsonArray(file):
+        namesById.setdefault(e['id'], e['name'])
+
+    return namesById
+
+
+def _parseJson(elements: Iterable[Dict],
+               namesById: Dict[str, str],
+               config: LanguageSpecificationConfig) -> Iterator[Tuple[CommentSource, Optional[List[Dict[str, str]]]]]:
+    """
+    Normalize the template elements to `CommentSource`s, and yield each of them with the parameters of
+    its class/enum members, or None.
+    """
+    for element in elements:
+        id_: str = element['id']
+
+        name_: str = element['name'].lower()
 
-            tmpSource = CommentSource.from_json(json.dumps(element))
+        if element.get('is_hide') is not True and name_.endswith(']') and name_.find("[") != -1:
+            name_ = name_[:name_.index("[")].rstrip()
 
-            if tmpSource.is_hide is not True and name_.endswith(']') and name_.find("[") != -1:
-                name_ = name_[:name_.index("[")].rstrip()
+        if id_.endswith('_ng'):
+            id_ = re.sub(r'_ng$', '', id_)
 
-            if id_.endswith('_ng'):
-                id_ = re.sub(r'_ng$', '', id_)
+        id_split = id_.split('_')
 
-            id_split = id_.split('_')
+        new_id = '_'.join(id_split)
+        if config.idPatternV2:
+            new_id_split = new_id.split('_')
 
-            new_id = '_'.join(id_split)
-            if self.__config.idPatternV2:
-                new_id_split = new_id.split('_')
+            newType = new_id_split[0]
+            newName1 = new_id_split[1]
 
-                newType = new_id_split[0]
-                newName1 = new_id_split[1]
+            tmpType = "class" if newType == "api" or newType == "callback" else newType
 
-                tmpType = "class" if newType == "api" or newType == "callback" else newType
+            parentName = namesById.get(f"{tmpType}_{newName1}")
+            if parentName:
+                newName1 = parentName.lower()
+            else:
+                newName1 = element['name'].lower()
+            if config.isCallback2api and newType == "callback":
+                newType = "api"
 
-                parentElement = next(
-                    (e for e in elementsCopy if e['id'] == f"{tmpType}_{newName1}"), None)
-                if parentElement:
-                    newName1 = parentElement['name'].lower()
-                else:
-                    newName1 = element['name'].lower()
-                if self.__config.isCallback2api and newType == "callback":
-                    newType = "api"
+            if config.isCallback2class and newType == "callback":
+                newType = "class"
 
-                if self.__config.isCallback2class and newType == "callback":
-                    newType = "class"
+            if len(new_id_split) == 3:
+                newName2 = name_
+                new_id = f"{newType}_{newName1}_{newName2}"
+            else:
+                new_id = f"{newType}_{newName1}"
 
-                if len(new_id_split) == 3:
-                    newName2 = name_
-                    new_id = f"{newType}_{newName1}_{newName2}"
-                else:
-                    new_id = f"{newType}_{newName1}"
+        element['type_'] = new_id[: new_id.find('_')]
 
-            element['type_'] = new_id[: new_id.find('_')]
+        if element['type_'] == "api":
+            elementParameters: List[Dict[str, str]] = element.get('parameters')
+            if len(elementParameters) > 0:
+                parameterNames: List[str] = []
+                for parameters in elementParameters:
+                    for pk in parameters.keys():
+                        parameterNames.append(pk)
+                new_id = f'{new_id}##{"#".join(parameterNames).lower()}'
 
-            if element['type_'] == "api":
-                tmpCS: CommentSource = CommentSource.from_json(json.dumps(element))
-                if len(tmpCS.parameters) > 0:
-                    parameterNames: List[str] = []
-                    for parameters in tmpCS.parameters:
-                        for pk in parameters.keys():
-                            parameterNames.append(pk)
-                    new_id = f'{new_id}##{"#".join(parameterNames).lower()}'
+        element['id'] = sys.intern(new_id)
+        element['type_'] = sys.intern(element['type_'])
+        element['name'] = sys.intern(element['name'])
+        element['parameters'] = _internParameters(element.get('parameters'))
 
-            element['id'] = new_id
+        finalCommentSource: CommentSource = CommentSource.from_dict(element)
+        parent_parameters = finalCommentSource.parameters
 
+        # The split of parent id should be 2, e.g., class_rtcengine, enum_type
+        is_parent_id = len(new_id.split('_')) == 2
+
+        # Extract the parameters of class or enum as standalone CommentSource, make it more easily to find the
+        # member variables of class or enum on tag2doc phase, see `CommentSourceStore.setMembers`.
+        memberParameters: Optional[List[Dict[str, str]]] = None
+        if ((element['type_'] == "class" and is_parent_id) or element['type_'] == "enum") \
+                and len(parent_parameters) > 0:
+            finalCommentSource.parameters = []
+            memberParameters = parent_parameters
+
+        yield finalCommentSource, memberParameters
+
+
+def _parseTemplateText(text: str,
+                       config: LanguageSpecificationConfig
+                       ) -> List[Tuple[CommentSource, Optional[List[Dict[str, str]]]]]:
+    """
+    Parse the text of the template file, which is read by the parent process, in a worker process.
+    """
+    namesById = _indexTemplateNames(io.StringIO(text))
+    return list(_parseJson(iterJsonArray(io.StringIO(text)), namesById, config))
+
+
+class LanguageSpecificationModule:
+    __fileSystem: FS
+    __config: LanguageSpecificationConfig
+    __commentSources: CommentSourceStore
+    __externalStore: Optional[CommentSourceStore]
+    # Whether the rows of the `__externalStore` can be cleared by this module
+    __isStoreOwned: bool
+    __templateFilePaths: List[str]
+    __cacheDir: Optional[str]
+    __maxWorkers: Optional[int]
+
+    def __init__(self, fileSystem: FS, config: LanguageSpecificationConfig) -> None:
+        self.__fileSystem = fileSystem
+        self.__config = config
+        self.__commentSources = MemoryCommentSourceStore()
+        self.__externalStore = None
+        self.__isStoreOwned = False
+        self.__templateFilePaths = []
+        self.__cacheDir = None
+        self.__maxWorkers = None
+
+    def addTemplateFilePath(self, path: str):
+        self.__templateFilePaths.append(path)
+
+    def setLanguageSpecificationConfig(self, config: LanguageSpecificationConfig):
+        self.__config = config
+
+    def setCacheDir(self, cacheDir: Optional[str]):
+        """
+        Set the directory to keep the compiled template index in, the index is reused by later runs
+        with the same template files, `LanguageSpecificationConfig` and tool version.
+        """
+        self.__cacheDir = cacheDir
+
+    def setMaxWorkers(self, maxWorkers: Optional[int]):
+        """
+        Set the max number of processes to parse the template files, default to 1, which parses them one by one
+        element by element in this process. Each process reads a whole template file in memory.
+        """
+        self.__maxWorkers = maxWorkers
+
+    def setCommentSourceStore(self, store: CommentSourceStore, isOwned: bool = False):
+        """
+        Keep the parsed `CommentSource`s in the `store` instead of the in-memory dict. A store which was built
+        from the same template files, `LanguageSpecificationConfig` and tool version is reused without parsing.
+
+        A store which is built from others is only cleared and rebuilt if it's `isOwned` by this module,
+        otherwise it's left unchanged, and the templates are parsed in memory.
+        """
+        self.__commentSources = store
+        self.__externalStore = store
+        self.__isStoreOwned = isOwned
+
+    def specialize(self) -> bool:
+        pass
+
+    def __parseTemplateFile(self, path: str):
+        # The template is read twice element by element, the first pass only keeps the names for the parent
+        # lookup, so at most one element is decoded in memory at a time.
+        with self.__fileSystem.open(path, 'r') as file:
+            namesById = _indexTemplateNames(file)
+        with self.__fileSystem.open(path, 'r') as file:
+            self.__mergeCommentSources(_parseJson(iterJsonArray(file), namesById, self.__config))
+
+    def __parseTemplateFiles(self):
+        paths = self.__templateFilePaths
+        maxWorkers = min(len(paths), self.__maxWorkers or 1, os.cpu_count() or 1)
+        if maxWorkers <= 1:
+            for path in paths:
+                self.__parseTemplateFile(path)
+            return
+
+        # Parse the template files in parallel, and merge the results in file order to keep the precedence
+        # of the sequential parsing. The files are read through the `__fileSystem` the same as the sequential
+        # parsing, and their text is sent to the workers. At most `maxWorkers` files are submitted at a time,
+        # so the texts and the results in memory are bounded.
+        with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+            def submit(path: str) -> Future:
+                with self.__fileSystem.open(path, 'r') as file:
+                    return executor.submit(_parseTemplateText, file.read(), self.__config)
+
+            futures: Deque[Future] = deque(submit(path) for path in paths[:maxWorkers])
+            for path in paths[maxWorkers:]:
+                self.__mergeCommentSources(futures.popleft().result())
+                futures.append(submit(path))
+            while futures:
+                self.__mergeCommentSources(futures.popleft().result())
+
+    def __mergeCommentSources(self,
+                              commentSources: Iterable[Tuple[CommentSource, Optional[List[Dict[str, str]]]]]):
+        for commentSource, memberParameters in commentSources:
             # Check if next id already exists
             # If it does exist, check if the saved value is set to is_hide, if it's not, then ignore the new value.
-            if element['id'] in self.__commentSources and not self.__commentSources[element['id']].is_hide:
+            if commentSource.id in self.__commentSources and not self.__commentSources[commentSource.id].is_hide:
                 continue
 
-            finalCommentSource: CommentSource = CommentSource.from_json(
-                json.dumps(element))
-            parent_parameters = finalCommentSource.parameters
-
-            # The split of parent id should be 2, e.g., class_rtcengine, enum_type
-            is_parent_id = len(new_id.split('_')) == 2
-
-            # Extract the parameters of class or enum as standalone CommentSource, make it more easily to find the
-            # member variables of class or enum on tag2doc phase.
-            if ((element['type_'] == "class" and is_parent_id) or element['type_'] == "enum") \
-                    and len(parent_parameters) > 0:
-                finalCommentSource.parameters = []
-                self.__commentSources[element['id']] = finalCommentSource
-
-                for parameters in parent_parameters:
-                    if parameters:
-                        for parameterk in parameters:
-                            parameterId = f'{finalCommentSource.id}_{parameterk.lower()}'
-                            self.__commentSources[parameterId] = CommentSource(
-                                id=parameterId,
-                                name=parameterk,
-                                description=parameters[parameterk],
-                                is_hide=finalCommentSource.is_hide)
-            else:
-                self.__commentSources[element['id']] = finalCommentSource
+            self.__commentSources[commentSource.id] = commentSource
+            if memberParameters:
+                self.__commentSources.setMembers(commentSource.id, memberParameters, commentSource.is_hide)
 
-    def deserialize(self) -> ErrorType:
+    def __getCacheKey(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(iris_doc.__version__.encode())
+        digest.update(f'{_CACHE_FORMAT_VERSION}'.encode())
+        digest.update(
+            f'{self.__config.isCallback2class}:{self.__config.isCallback2api}:{self.__config.idPatternV2}'.encode())
         for path in self.__templateFilePaths:
-            with self.__fileSystem.open(path, 'r') as file:
-                jsonContent = file.read()
-                self.__parseJson(jsonContent)
+            digest.update(b'\0')
+            with self.__fileSystem.openbin(path) as file:
+                while chunk := file.read(1024 * 1024):
+                    digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def __loadCache(self, cachePath: str) -> bool:
+        if not self.__fileSystem.exists(cachePath):
+            return False
+
+        try:
+            cache = pickle.loads(self.__fileSystem.readbytes(cachePath))
+        except Exception:
+            # A broken cache file is not fatal, it will be rewritten after the templates are parsed.
+            return False
+
+        # The cache is written as (format version, store), anything else is written by an older layout.
+        if not isinstance(cache, tuple) or len(cache) != 2 or cache[0] != _CACHE_FORMAT_VERSION:
+            return False
+
+        commentSources = cache[1]
+        if not isinstance(commentSources, MemoryCommentSourceStore) or not commentSources.isValidState():
+            return False
+
+        self.__commentSources = commentSources
+        return True
+
+    def __saveCache(self, cachePath: str):
+        self.__fileSystem.makedirs(self.__cacheDir, recreate=True)
+
+        # Write to a temporary file first, so a concurrent run never reads a partially written cache.
+        tmpCachePath = f'{cachePath}.{os.getpid()}.tmp'
+        self.__fileSystem.writebytes(tmpCachePath, pickle.dumps(
+            (_CACHE_FORMAT_VERSION, self.__commentSources), protocol=pickle.HIGHEST_PROTOCOL))
+        self.__fileSystem.move(tmpCachePath, cachePath, overwrite=True)
+
+    def __deserializeToStore(self, store: CommentSourceStore):
+        self.__commentSources = store
+        cacheKey = self.__getCacheKey()
+        if store.getMetadata('cacheKey') == cacheKey:
+            return
+
+        if self.__isStoreOwned:
+            store.clear()
+        elif store.getMetadata('cacheKey') is not None or len(store) > 0:
+            # Do not touch the rows of the store which is not owned
+            self.__commentSources = MemoryCommentSourceStore()
+            self.__parseTemplateFiles()
+            return
+
+        self.__parseTemplateFiles()
+
+        store.setMetadata('cacheKey', cacheKey)
+        store.commit()
+
+    def deserialize(self) -> ErrorType:
+        if self.__externalStore is not None:
+            self.__deserializeToStore(self.__externalStore)
+            return ErrorType.Ok
+
+        cachePath: Optional[str] = None
+        if self.__cacheDir:
+            cachePath = os.path.join(
+                self.__cacheDir, f'template_index_{self.__getCacheKey()}.pickle')
+            if self.__loadCache(cachePath):
+                return ErrorType.Ok
+
+        self.__parseTemplateFiles()
+
+        if cachePath:
+            self.__saveCache(cachePath)
 
         return ErrorType.Ok
 
-    def getAllCommentSources(self) -> Dict[str, CommentSource]:
+    def getAllCommentSources(self) -> MutableMapping[str, CommentSource]:
         return self.__commentSources
+
+    def getIndexSnapshot(self) -> CommentSourceStore:
+        """
+        Return an immutable copy of the current index, which can be shared between threads, and is not affected
+        by the later `deserialize` calls of this module.
+        """
+        if isinstance(self.__commentSources, MemoryCommentSourceStore):
+            return self.__commentSources.snapshot()
+        return FrozenCommentSourceStore(dict(self.__commentSources.items()))
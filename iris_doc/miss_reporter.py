@@ -0,0 +1,91 @@
+import json
+import sys
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from iris_doc.language_specification import CommentSource
+
+
+class MissReporter:
+    """
+    Collect the tags not found in the template and the `CommentSource`s failed to render, counted per tag and
+    per file, and report them in one summary at the end of the run. In the verbose mode, each of them is printed
+    as well as it happens.
+    """
+    __verbose: bool
+    __output: Optional[TextIO]
+    # tag to {file path to count}, the file path is None if not known
+    __notFound: Dict[str, Dict[Optional[str], int]]
+    # `CommentSource` id to ({file path to count}, the parameters in the first report)
+    __parseErrors: Dict[str, Tuple[Dict[Optional[str], int], Any]]
+
+    def __init__(self, verbose: bool = False, output: TextIO = None) -> None:
+        self.__verbose = verbose
+        self.__output = output
+        self.__notFound = {}
+        self.__parseErrors = {}
+
+    def setVerbose(self, verbose: bool):
+        self.__verbose = verbose
+
+    def __write(self, text: str):
+        (self.__output or sys.stdout).write(text)
+
+    def reportNotFound(self, tag: str, filePath: str = None):
+        files = self.__notFound.setdefault(tag, {})
+        files[filePath] = files.get(filePath, 0) + 1
+
+        if self.__verbose:
+            self.__write('[{}] not found\n\n'.format(tag))
+
+    def reportParseError(self, commentSource: CommentSource, filePath: str = None):
+        files, _ = self.__parseErrors.setdefault(commentSource.id, ({}, commentSource.parameters))
+        files[filePath] = files.get(filePath, 0) + 1
+
+        if self.__verbose:
+            self.__write('[{}] parse error\n'.format(commentSource.id))
+            self.__write('—— parameters contains empty object: {}\n\n'.format(commentSource.parameters))
+
+    def hasMisses(self) -> bool:
+        return len(self.__notFound) > 0 or len(self.__parseErrors) > 0
+
+    def __summarize(self, files: Dict[Optional[str], int]) -> Dict[str, Any]:
+        return {
+            'count': sum(files.values()),
+            'files': {filePath: count for filePath, count in files.items() if filePath is not None},
+        }
+
+    def toDict(self) -> Dict[str, List[Dict[str, Any]]]:
+        notFound: List[Dict[str, Any]] = []
+        for tag, files in self.__notFound.items():
+            notFound.append({'tag': tag, **self.__summarize(files)})
+
+        parseErrors: List[Dict[str, Any]] = []
+        for id, (files, parameters) in self.__parseErrors.items():
+            parseErrors.append({'id': id, 'parameters': repr(parameters), **self.__summarize(files)})
+
+        return {'notFound': notFound, 'parseErrors': parseErrors}
+
+    def toJson(self) -> str:
+        return json.dumps(self.toDict(), ensure_ascii=False, indent=2)
+
+    def toText(self) -> str:
+        summary = self.toDict()
+        lines: List[str] = []
+
+        def appendSection(title: str, entries: List[Dict[str, Any]], key: str):
+            lines.append(f'{title}: {len(entries)} unique, {sum(e["count"] for e in entries)} total')
+            for entry in entries:
+                files = ', '.join(f'{filePath}: {count}' for filePath, count in entry['files'].items())
+                lines.append(f'  [{entry[key]}] x{entry["count"]}' + (f' ({files})' if files else ''))
+
+        appendSection('Tags not found', summary['notFound'], 'tag')
+        appendSection('Parse errors', summary['parseErrors'], 'id')
+
+        return '\n'.join(lines) + '\n'
+
+    def writeSummary(self):
+        """
+        Write the text summary to the output, if there is anything missed
+        """
+        if self.hasMisses():
+            self.__write(self.toText())
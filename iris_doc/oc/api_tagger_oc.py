@@ -1,9 +1,58 @@
-from iris_doc.api_tagger import TYPE_API, TYPE_CLASS, TYPE_CONSTRUCT, TYPE_EXTENSION, LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
+from iris_doc.api_tagger import TYPE_API, TYPE_CLASS, TYPE_CONSTRUCT, TYPE_EXTENSION, DeclarationPattern, LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
 from typing import List, Optional
 import re
 
+from iris_doc.language_specification import TagKey
+from iris_doc.source_lexer import BLOCK_COMMENT, DOUBLE_QUOTED_STRING, LINE_COMMENT, SINGLE_QUOTED_STRING, SourceLexer
+
+# The patterns are compiled once on module load, the matchers are called for every line of the source files.
+_CLASS_PATTERN = re.compile(r".*@(interface|protocol)\s+(\w+)\s*(:|\<|$)")
+_MEMBER_FUNCTION_PATTERN = re.compile(r"[-+]\s*\((.*?)\)\s*(\w+.*?)\s*:?")
+_MEMBER_VARIABLE_PATTERN = re.compile(r'@property.*?\b(\w+)\b(?=\s*(?:NS_SWIFT_NAME|\;))')
+_ENUM_PATTERN = re.compile(r".*typedef\s*NS_ENUM\s*\(.*\, (\w*)\)\ {?")
+_ENUM_VALUE_PATTERN = re.compile(r"\s*(\w+)\s*=\s*[^,]+,?")
+_SIMPLE_ANNOTATION_PATTERN = re.compile(r'^@\w+$')
+_ATTRIBUTE_ANNOTATION_PATTERN = re.compile(
+    r'^\s*(?!.*(NS_ASSUME_NONNULL_BEGIN|NS_ASSUME_NONNULL_END|IBInspectable|IBOutlet|IBAction|\b(?:class|enum|interface|protocol|struct)\b))__(attribute|deprecated|availability)(__)?\b.*')
+_EXTENSION_PATTERN = re.compile(r"@interface\s+(\w+)\s*\(\s*(\w+)\s*\)")
+_TYPED_CONSTANT_PATTERN = re.compile(r'static const ([A-Za-z\<\>0-9_]*) ([A-Za-z0-9_]+) = (.*);', re.M | re.I)
+_CONSTANT_PATTERN = re.compile(r'static const ([A-Za-z0-9_]+) = (.*);', re.M | re.I)
+_CLASS_SCOPE_START_PATTERN = re.compile(r'^.*@(interface|protocol)\s+(\w+)\s*(:|\<)')
+_CLASS_SCOPE_END_PATTERN = re.compile(r'\s*@end\s*')
+_ENUM_SCOPE_END_PATTERN = re.compile(r'\s*};\s*')
+_MEMBER_VARIABLE_SCOPE_START_PATTERN = re.compile(r'@property.*\b(\w+)\b')
+_SELECTOR_PART_PATTERN = re.compile(r'([^:\n-+]*):')
+# The class names matched by the `_CLASS_PATTERN`
+_CLASS_NAME_PATTERN = re.compile(r'\w+')
+_PARAMETER_NAME_PATTERN = re.compile(r':\s*\([\w+\s*\*?\s*_?\(\)^<>,\w+\s*]*\)(\w+)')
+
+
+def _constructorPattern(className: str) -> re.Pattern:
+    return re.compile(r"[-+]{1}\s*\(\s*instancetype\s*\)\s*" + className + r"\s*\w*\s*{?")
+
 
 class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
+    # The constructor pattern of the class being scanned, which is built from the class name
+    __constructorClassName: Optional[str] = None
+    __constructorPattern: Optional[re.Pattern] = None
+
+    def _getDeclarationPattern(self) -> Optional[DeclarationPattern]:
+        return _DECLARATION_PATTERN
+
+    def __getConstructorPattern(self, className: str) -> re.Pattern:
+        if self.__constructorClassName != className:
+            self.__constructorPattern = _constructorPattern(className)
+            self.__constructorClassName = className
+
+        return self.__constructorPattern
+
+    def _getMemberDeclarationPattern(self, className: str) -> Optional[DeclarationPattern]:
+        # The constructor pattern of the alternation matches any class name of the `_CLASS_PATTERN`
+        if _CLASS_NAME_PATTERN.fullmatch(className):
+            return _MEMBER_DECLARATION_PATTERN
+
+        return None
+
     def matchComment(self, line: str) -> str:
         """
         Return a matched comments or None. Objective-C Comments start with /* or ///
@@ -13,7 +62,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def matchClass(self, line: str) -> str:
-        m = re.match(r".*@(interface|protocol)\s+(\w+)\s*(:|\<|$)", line.strip())
+        m = _CLASS_PATTERN.match(line.strip())
         if m:
             return m.group(2)
         return None
@@ -22,7 +71,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         """
         Return a matched constructor of class or None
         """
-        m = re.match(r"[-+]{1}\s*\(\s*instancetype\s*\)\s*" + className + r"\s*\w*\s*{?", line.strip())
+        m = self.__getConstructorPattern(className).match(line.strip())
         if m:
             return m.group(0)
         return None
@@ -31,7 +80,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         """
         Return a matched member function of class or None
         """
-        m = re.match(r"[-+]\s*\((.*?)\)\s*(\w+.*?)\s*:?", line.strip())
+        m = _MEMBER_FUNCTION_PATTERN.match(line.strip())
         if m:
             return m.group(2)
         return None
@@ -40,7 +89,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         """
         Return a matched member variable of class or None
         """
-        m = re.match(r'@property.*?\b(\w+)\b(?=\s*(?:NS_SWIFT_NAME|\;))', line.strip())
+        m = _MEMBER_VARIABLE_PATTERN.match(line.strip())
         if m:
             return m.group(1)
         return None
@@ -49,7 +98,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         """
         Return a matched enum name or None
         """
-        m = re.match(r".*typedef\s*NS_ENUM\s*\(.*\, (\w*)\)\ {?", line.strip())
+        m = _ENUM_PATTERN.match(line.strip())
         if m:
             return m.group(1)
         return None
@@ -58,7 +107,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         """
         Return a matched enum value name or None
         """
-        m = re.match(r"\s*(\w+)\s*=\s*[^,]+,?", line.strip())
+        m = _ENUM_VALUE_PATTERN.match(line.strip())
         if m:
             return m.group(1)
         return None
@@ -69,13 +118,10 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         """
         if 'NS_ASSUME_NONNULL' in line:
             return line
-        m = re.match(r'^@\w+$', line.strip())
+        m = _SIMPLE_ANNOTATION_PATTERN.match(line.strip())
         if m:
             return line.strip()
-        m = re.match(
-            r'^\s*(?!.*(NS_ASSUME_NONNULL_BEGIN|NS_ASSUME_NONNULL_END|IBInspectable|IBOutlet|IBAction|\b(?:class|enum|interface|protocol|struct)\b))__(attribute|deprecated|availability)(__)?\b.*',
-            line.strip()
-        )
+        m = _ATTRIBUTE_ANNOTATION_PATTERN.match(line.strip())
         if m:
             return m.group(1)
         return None
@@ -84,17 +130,17 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         """
         Return a matched extension name or None
         """
-        m = re.match(r"@interface\s+(\w+)\s*\(\s*(\w+)\s*\)", line.strip())
+        m = _EXTENSION_PATTERN.match(line.strip())
         if m:
             return m.group(1) + "(" + m.group(2) + ")"
         return None
 
     def matchConstant(self, line: str) -> str:
-        m = re.match(r'static const ([A-Za-z\<\>0-9_]*) ([A-Za-z0-9_]+) = (.*);', line.strip(), re.M | re.I)
+        m = _TYPED_CONSTANT_PATTERN.match(line.strip())
         if m:
             return m.group(2)
 
-        m = re.match(r'static const ([A-Za-z0-9_]+) = (.*);', line.strip(), re.M | re.I)
+        m = _CONSTANT_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
@@ -104,18 +150,14 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         return self.matchMemberFunction(line)
 
     def matchClassScopeStart(self, line: str) -> bool:
-        # Define the regex to match the start of a Objective-C class definition
-        # pattern = r'.*@interface\s+(\w+)\s*:'
-        pattern = r'^.*@(interface|protocol)\s+(\w+)\s*(:|\<)'
-
-        # Use the regex to search for a match in the line
-        match = re.search(pattern, line)
+        # Search the regex to match the start of a Objective-C class definition
+        match = _CLASS_SCOPE_START_PATTERN.search(line)
 
         # Return True if a match was found, else return False
         return match is not None
 
     def matchClassScopeEnd(self, line: str) -> bool:
-        return re.match(r'\s*@end\s*', line) is not None
+        return _CLASS_SCOPE_END_PATTERN.match(line) is not None
 
     def matchExtensionsScopeStart(self, line: str) -> bool:
         return self.matchExtension(line) is not None
@@ -125,13 +167,13 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         return self.matchEnum(line)
 
     def matchEnumScopeEnd(self, line: str) -> bool:
-        return re.match(r'\s*};\s*', line) is not None
+        return _ENUM_SCOPE_END_PATTERN.match(line) is not None
 
     def matchFunctionParameterScopeEnd(self, line: str) -> bool:
         return ';' in line
 
     def matchMemberVariableScopeStart(self, line: str) -> bool:
-        return re.match(r'@property.*\b(\w+)\b', line.strip()) is not None
+        return _MEMBER_VARIABLE_SCOPE_START_PATTERN.match(line.strip()) is not None
 
     def matchMemberVariableScopeEnd(self, line: str) -> bool:
         return ';' in line
@@ -144,9 +186,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def findCallbackName(self, function_name: str, line: str) -> str:
-        pattern = r'([^:\n-+]*):'
-
-        matches: List[str] = re.findall(pattern, line.split('NS_SWIFT_NAME')[0].strip())
+        matches: List[str] = _SELECTOR_PART_PATTERN.findall(line.split('NS_SWIFT_NAME')[0].strip())
 
         if len(matches) > 1:
             return matches[1]
@@ -156,7 +196,7 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         single_line = " ".join(map(
             lambda x: x.strip(), lines
         ))
-        return re.findall(r':\s*\([\w+\s*\*?\s*_?\(\)^<>,\w+\s*]*\)(\w+)', single_line)
+        return _PARAMETER_NAME_PATTERN.findall(single_line)
 
     def matchFunctionScopeStart(self, line: str) -> bool:
         return '{' in line
@@ -165,22 +205,50 @@ class ObjCSyntaxMatcher(LanguageSyntaxMatcher):
         return '}' in line
 
     def findFunctionLink(self, class_name: str, line: str) -> str:
-        pattern = r'([^:\n-+]*):'
-
-        matches: List[str] = re.findall(pattern, line.split('NS_SWIFT_NAME')[0].strip())
+        matches: List[str] = _SELECTOR_PART_PATTERN.findall(line.split('NS_SWIFT_NAME')[0].strip())
 
         matches_joined = ':'.join(matches)
         return f'{class_name}/{matches_joined}'
 
+
+_DECLARATION_PATTERN = DeclarationPattern(
+    ObjCSyntaxMatcher,
+    ('matchClass', 'matchEnum', 'matchExtension', 'matchFunction', 'matchMemberFunction', 'matchConstant'),
+    [(0, _CLASS_PATTERN, 2),
+     (1, _ENUM_PATTERN, 1),
+     # The `matchExtension` joins the groups
+     (2, _EXTENSION_PATTERN, None),
+     (3, _MEMBER_FUNCTION_PATTERN, 2),
+     (4, _TYPED_CONSTANT_PATTERN, 2),
+     (4, _CONSTANT_PATTERN, 1)])
+
+_MEMBER_DECLARATION_PATTERN = DeclarationPattern(
+    ObjCSyntaxMatcher,
+    ('matchClassConstructor', 'matchMemberVariableScopeStart', 'matchMemberFunction'),
+    [(0, _constructorPattern(_CLASS_NAME_PATTERN.pattern), None),
+     (1, _MEMBER_VARIABLE_SCOPE_START_PATTERN, None),
+     (2, _MEMBER_FUNCTION_PATTERN, 2)])
+
+# The comments and the string literals of Objective-C, the `@` of the `NSString` literals is left in the code lines
+_LEXER = SourceLexer([
+    BLOCK_COMMENT,
+    LINE_COMMENT,
+    DOUBLE_QUOTED_STRING,
+    SINGLE_QUOTED_STRING,
+])
+
+
 class ObjCToken(Token):
+    __slots__ = ()
 
     __buildInAnnotations: List[str] = [
         "private", "protected", "override", "internal"]
 
-    def toString(self):
+    def __isBuildIn(self) -> bool:
+        return next((x for x in self._annotations if x in self.__buildInAnnotations), None) is not None
+
+    def __isNoDoc(self) -> bool:
         type = self._type
-        if next((x for x in self._annotations if x in self.__buildInAnnotations), None):
-            return None
 
         # if type == TYPE_EXTENSION:
         #     self._name1 = self._name1.replace('(','').replace(')','')
@@ -189,13 +257,28 @@ class ObjCToken(Token):
         # TODO(littlegnal): Decouple this from the tag, maybe it's better to move to tag2doc.py
         if type == TYPE_CONSTRUCT:
             if self._name2.lower() == "fromjson":
-                return "/// @nodoc"
+                return True
         if type == TYPE_API:
             if (self._name2 and self._name2.lower() == "tojson") or \
                     self._name1.lower().endswith("ext") and (self._name2.lower() == "value" or self._name2.lower() == "fromvalue"):
-                return "/// @nodoc"
+                return True
+
+        return False
+
+    def toString(self):
+        if self.__isBuildIn():
+            return None
+
+        if self.__isNoDoc():
+            return "/// @nodoc"
+
+        return super()._buildTag(type=self._type, name1=self._name1, name2=self._name2)
+
+    def getTagKey(self) -> Optional[TagKey]:
+        if self.__isBuildIn() or self.__isNoDoc():
+            return None
 
-        return super()._buildTag(type=type, name1=self._name1, name2=self._name2)
+        return super().getTagKey()
 
 
 class ObjCLineScanner(DefaultLineScanner):
@@ -208,7 +291,7 @@ class ObjCLineScanner(DefaultLineScanner):
         return ObjCToken(offset, type, name1, name2, annotations)
 
 class ObjCTagBuilder(TagBuilder):
-    def __init__(self):
-        super().__init__(ObjCSyntaxMatcher())
+    def __init__(self, useLexer: bool = False):
+        super().__init__(ObjCSyntaxMatcher(), lexer=_LEXER if useLexer else None)
     def _createLineScanner(self, syntaxMatcher: LanguageSyntaxMatcher, fileLines: List[str]) -> LineScanner:
-        return ObjCLineScanner(syntaxMatcher, fileLines)
+        return ObjCLineScanner(syntaxMatcher, fileLines, lexer=self.getLexer())
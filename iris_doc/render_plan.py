@@ -0,0 +1,139 @@
+from typing import Callable, Dict, List, Optional
+
+from iris_doc.language_specification import CommentSource, LanguageFormat
+
+
+class _IndentPlan:
+    __slots__ = ('linePrefix', 'textLinePrefix', 'head', 'tail')
+
+    linePrefix: str
+    textLinePrefix: str
+    head: str
+    tail: str
+
+    def __init__(self, format: LanguageFormat, indent: int) -> None:
+        strIndent = ' ' * indent
+        self.linePrefix = f"{strIndent}{format.comment2}"
+        self.textLinePrefix = f"{self.linePrefix} "
+        self.head = f"{strIndent}{format.comment1}\n" if format.comment1 else ""
+        self.tail = f"\n{strIndent}{format.comment3}" if format.comment3 else ""
+
+
+class RenderPlan:
+    """
+    The `LanguageFormat` compiled to the prebuilt prefixes and suffixes, which renders the same comment as
+    `Tag2Doc` does with the `LanguageFormat` field by field. The `LanguageFormat` should not be changed after
+    compiled.
+    """
+    __format: LanguageFormat
+    __summaryHead: str
+    __summaryTail: str
+    __paramHead: str
+    __paramTail: str
+    __returnHead: str
+    __returnTail: str
+    __indentPlans: Dict[int, _IndentPlan]
+    __noDocComments: Dict[int, str]
+
+    def __init__(self, format: LanguageFormat) -> None:
+        self.__format = format
+        self.__summaryHead = f"{format.summary1}\n" if format.summary1 else ""
+        self.__summaryTail = f"\n{format.summary2}" if format.summary2 else ""
+        self.__paramHead = format.param1 if format.param1 else ""
+        self.__paramTail = format.param2 if format.param2 else ""
+        self.__returnHead = f"{format.return1}\n" if format.return1 else ""
+        self.__returnTail = f"\n{format.return3}" if format.return3 else ""
+        self.__indentPlans = {}
+        self.__noDocComments = {}
+
+    def getFormat(self) -> LanguageFormat:
+        return self.__format
+
+    def __getIndentPlan(self, indent: int) -> _IndentPlan:
+        indentPlan = self.__indentPlans.get(indent)
+        if indentPlan is None:
+            indentPlan = _IndentPlan(self.__format, indent)
+            self.__indentPlans[indent] = indentPlan
+
+        return indentPlan
+
+    def __renderDescription(self, indentPlan: _IndentPlan, description: str) -> str:
+        linePrefix = indentPlan.linePrefix
+        textLinePrefix = indentPlan.textLinePrefix
+        return '\n'.join([f"{textLinePrefix}{line}" if line.strip() != '' else f"{linePrefix}{line}"
+                          for line in description.split('\n')])
+
+    def __renderComment(self, indentPlan: _IndentPlan, content: str) -> str:
+        description = self.__renderDescription(indentPlan, content)
+        if not description:
+            return ""
+
+        return f"{indentPlan.head}{description}{indentPlan.tail}"
+
+    def __renderParameters(self, parameters: List[Dict[str, str]]) -> str:
+        param3 = self.__format.param3
+        outList: List[str] = []
+        for parameter in parameters:
+            if parameter:
+                for key in parameter:
+                    name = key.rstrip("\n")
+                    description = parameter[key]
+                    if not description:
+                        outList.append("")
+                        continue
+
+                    # Concatenate instead of formatting, a description which is not a string is rejected
+                    out = self.__paramHead + name + self.__paramTail if name else ""
+                    out = out + description
+                    if param3:
+                        out += param3
+                    outList.append(out)
+
+        return '\n'.join(outList)
+
+    def renderNoDoc(self, indent: int) -> str:
+        """
+        Render the comment of the hidden or not found API
+        """
+        comment = self.__noDocComments.get(indent)
+        if comment is None:
+            comment = self.__renderComment(self.__getIndentPlan(indent), self.__format.ignore)
+            self.__noDocComments[indent] = comment
+
+        return comment
+
+    def render(self, commentSource: Optional[CommentSource], indent: int,
+               onBadCommentSource: Callable[[CommentSource], None] = None) -> str:
+        """
+        Render the comment of the `commentSource`, the `onBadCommentSource` is called if the parameters of the
+        `commentSource` can not be rendered.
+        """
+        if commentSource is None or commentSource.is_hide:
+            return self.renderNoDoc(indent)
+
+        out: str = ""
+        if commentSource.description:
+            out = self.__summaryHead + commentSource.description + self.__summaryTail
+
+        # Only the type with "api", or not the parent object
+        parameters = commentSource.parameters
+        if parameters is not None and (commentSource.type_ == 'api' or 0 < len(parameters)):
+            try:
+                paramStr = self.__renderParameters(parameters)
+            except:
+                if onBadCommentSource:
+                    onBadCommentSource(commentSource)
+                paramStr = ""
+
+            if paramStr:
+                out += "\n\n"
+                out += paramStr
+
+        if commentSource.returns:
+            out += "\n\n"
+            out += self.__returnHead + self.__format.return2 + commentSource.returns + self.__returnTail
+
+        if out == "":
+            return self.renderNoDoc(indent)
+
+        return self.__renderComment(self.__getIndentPlan(indent), out)
@@ -0,0 +1,40 @@
+import re
+from typing import List, Sequence
+
+# The comments of the C family languages
+BLOCK_COMMENT = r'/\*(?s:.*?)(?:\*/|\Z)'
+LINE_COMMENT = r'//[^\n]*'
+# The string literals end at the line end if not closed
+DOUBLE_QUOTED_STRING = r'"(?:[^"\\\n]|\\.)*"?'
+SINGLE_QUOTED_STRING = r"'(?:[^'\\\n]|\\.)*'?"
+
+
+class SourceLexer:
+    """
+    Lex the comments and the string literals of a source file in one pass, and blank them out of the lines, so the
+    scope methods of the `LanguageSyntaxMatcher` are not confused by the braces and the semicolons inside them, e.g.,
+    `final String open = '{';` or `void foo() {} // }`.
+    """
+    __pattern: re.Pattern
+
+    def __init__(self, literalPatterns: Sequence[str]) -> None:
+        """
+        The `literalPatterns` match the comments and the string literals of the language, the first one matched at
+        a position is taken, so the longer prefixes should go first, e.g., the triple quoted strings.
+        """
+        self.__pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in literalPatterns))
+
+    def __blank(self, m: re.Match) -> str:
+        # Keep the line breaks of the multi-line literals, so the code lines are aligned to the file lines
+        return ' ' + '\n' * m.group().count('\n')
+
+    def lex(self, fileLines: List[str]) -> List[str]:
+        """
+        Return the code lines of the `fileLines`, where each comment and string literal is replaced with a space.
+        The `fileLines` should not contain the line breaks, e.g., the lines of the `str.splitlines`.
+        """
+        codeLines = self.__pattern.sub(self.__blank, '\n'.join(fileLines)).split('\n')
+        if len(codeLines) != len(fileLines):
+            raise ValueError('The file lines should not contain the line breaks')
+
+        return codeLines
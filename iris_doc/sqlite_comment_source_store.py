@@ -0,0 +1,136 @@
+import pickle
+import sqlite3
+from typing import Iterator, Optional, Sequence, Tuple
+
+from iris_doc.language_specification import CommentSource, CommentSourceStore, TagKey
+
+# The version of the tables layout, which is kept in the `user_version` of the file, and is bumped on every
+# change of the tables.
+_STORE_FORMAT_VERSION = 1
+
+
+class SqliteCommentSourceStore(CommentSourceStore):
+    """
+    The `CommentSourceStore` backed by a local SQLite file. The `CommentSource`s are only loaded when they
+    are looked up, and the file can be shared by several runs.
+
+    The first id in insertion order of each base id is kept in the `fallbacks` table as it's inserted, so
+    `findByBaseId` is a primary key lookup.
+    """
+    __connection: sqlite3.Connection
+
+    def __init__(self, path: str) -> None:
+        self.__connection = sqlite3.connect(path)
+        formatVersion = self.__connection.execute("PRAGMA user_version").fetchone()[0]
+        if formatVersion == 0:
+            self.__connection.executescript(f"""
+                CREATE TABLE comment_sources (
+                    seq INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    base_id TEXT NOT NULL,
+                    sorted_parameters TEXT,
+                    data BLOB NOT NULL
+                );
+                CREATE INDEX comment_sources_signature
+                    ON comment_sources (base_id, sorted_parameters, seq);
+                CREATE TABLE fallbacks (
+                    base_id TEXT PRIMARY KEY,
+                    id TEXT NOT NULL
+                );
+                CREATE TABLE metadata (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                PRAGMA user_version = {_STORE_FORMAT_VERSION};
+            """)
+        elif formatVersion != _STORE_FORMAT_VERSION:
+            self.__connection.close()
+            raise ValueError(
+                f"The store {path} is of format {formatVersion} rather than {_STORE_FORMAT_VERSION}, "
+                "remove it to rebuild")
+
+    def __loadRow(self, row: Optional[Tuple[bytes]]) -> Optional[CommentSource]:
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def __getitem__(self, id: str) -> CommentSource:
+        commentSource = self.__loadRow(self.__connection.execute(
+            "SELECT data FROM comment_sources WHERE id = ?", (id,)).fetchone())
+        if commentSource is None:
+            raise KeyError(id)
+        return commentSource
+
+    def __setitem__(self, id: str, commentSource: CommentSource):
+        key = TagKey(id)
+        baseId = key.baseId
+        sortedParameters = "#".join(key.sortedParameters) if key.sortedParameters is not None else None
+        # Update in place for an existing id to keep its insertion order, which is the same as a dict.
+        self.__connection.execute(
+            """
+            INSERT INTO comment_sources (id, base_id, sorted_parameters, data) VALUES (?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET data = excluded.data
+            """,
+            (id, baseId, sortedParameters, pickle.dumps(commentSource, protocol=pickle.HIGHEST_PROTOCOL)))
+        self.__connection.execute(
+            "INSERT OR IGNORE INTO fallbacks (base_id, id) VALUES (?, ?)", (baseId, id))
+
+    def __delitem__(self, id: str):
+        if self.__connection.execute("DELETE FROM comment_sources WHERE id = ?", (id,)).rowcount == 0:
+            raise KeyError(id)
+
+        # Fall back to the next id in insertion order if the deleted one is the fallback
+        baseId = TagKey(id).baseId
+        if self.__connection.execute("DELETE FROM fallbacks WHERE id = ?", (id,)).rowcount > 0:
+            self.__connection.execute(
+                """
+                INSERT INTO fallbacks (base_id, id)
+                SELECT base_id, id FROM comment_sources WHERE base_id = ? ORDER BY seq LIMIT 1
+                """,
+                (baseId,))
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self.__connection.execute("SELECT id FROM comment_sources ORDER BY seq"):
+            yield row[0]
+
+    def __len__(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM comment_sources").fetchone()[0]
+
+    def __contains__(self, id: object) -> bool:
+        return self.__connection.execute(
+            "SELECT 1 FROM comment_sources WHERE id = ?", (id,)).fetchone() is not None
+
+    def clear(self):
+        self.__connection.execute("DELETE FROM comment_sources")
+        self.__connection.execute("DELETE FROM fallbacks")
+
+    def findBySortedParameters(self, baseId: str, sortedParameters: Sequence[str]) -> Optional[CommentSource]:
+        return self.__loadRow(self.__connection.execute(
+            """
+            SELECT data FROM comment_sources WHERE base_id = ? AND sorted_parameters = ?
+            ORDER BY seq LIMIT 1
+            """,
+            (baseId, "#".join(sortedParameters))).fetchone())
+
+    def findByBaseId(self, baseId: str) -> Optional[CommentSource]:
+        return self.__loadRow(self.__connection.execute(
+            """
+            SELECT comment_sources.data FROM fallbacks JOIN comment_sources ON comment_sources.id = fallbacks.id
+            WHERE fallbacks.base_id = ?
+            """,
+            (baseId,)).fetchone())
+
+    def getMetadata(self, key: str) -> Optional[str]:
+        row = self.__connection.execute(
+            "SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def setMetadata(self, key: str, value: str):
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+    def commit(self):
+        self.__connection.commit()
+
+    def close(self):
+        self.__connection.close()
@@ -1,207 +1,307 @@
+import copy
 import re
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
 
-from iris_doc.language_specification import CommentSource, ErrorType, LanguageFormat
+from iris_doc.api_tagger import Token
+from iris_doc.language_specification import CommentSource, CommentSourceStore, LanguageFormat, \
+    MemoryCommentSourceStore, TagKey
+from iris_doc.miss_reporter import MissReporter
+from iris_doc.render_plan import RenderPlan
+
+_TAG_PATTERN = re.compile(r'\/\*\s(.*)\s\*\/')
+
+
+class RenderCacheInfo:
+    __slots__ = ('hits', 'misses', 'maxSize', 'currentSize')
+
+    def __init__(self, hits: int, misses: int, maxSize: int, currentSize: int) -> None:
+        self.hits = hits
+        self.misses = misses
+        self.maxSize = maxSize
+        self.currentSize = currentSize
+
+    def __repr__(self) -> str:
+        return f'RenderCacheInfo(hits={self.hits}, misses={self.misses}, maxSize={self.maxSize}, ' \
+               f'currentSize={self.currentSize})'
 
 
 class Tag2Doc:
     __format: LanguageFormat
-    __commentSources: Dict[str, CommentSource]
-
-    def __init__(self, format: LanguageFormat, commentSources: Dict[str, CommentSource]) -> None:
+    __commentSources: CommentSourceStore
+    __renderPlan: RenderPlan
+    __otherRenderPlans: Dict[int, RenderPlan]
+    # (render id, indent, id(format)) to (format, comment), the format is kept in the value so its id is not reused.
+    # The `CommentSource`s are keyed by the ids they are looked up by, since the stores may return a new object per
+    # lookup, see `__generateComment`.
+    __renderCache: 'OrderedDict[Tuple[Optional[str], int, int], Tuple[LanguageFormat, str]]'
+    __renderCacheSize: int
+    __renderCacheHits: int
+    __renderCacheMisses: int
+    __isForceMarkNoDoc: bool
+    __missReporter: MissReporter
+    __filePath: Optional[str]
+    # The tags with parameter list which are not matched exactly, to the resolved `CommentSource`s
+    __resolvedTags: Dict[str, Optional[CommentSource]]
+    # The tags to the `TagKey`s parsed from them, so a tag used by many lines is parsed once
+    __tagKeys: Dict[str, TagKey]
+
+    def __init__(self, format: LanguageFormat, commentSources: Mapping[str, CommentSource],
+                 renderCacheSize: int = 1024, renderPlan: RenderPlan = None, isForceMarkNoDoc: bool = False,
+                 missReporter: MissReporter = None, filePath: str = None) -> None:
         self.__format = format
-        self.__commentSources = commentSources
-
-    def __printf(self, error_type: ErrorType, key, comment_source: CommentSource = None):
-        if error_type == ErrorType.FileNotFoundError:
-            print('[{}] not found\n'.format(key))
-        elif error_type == ErrorType.NotDeserializedError:
-            print('[{}] parse error'.format(key))
-            print('—— parameters contains empty object: {}\n'.format(
-                comment_source.parameters))
-
-    def __generateIndent(self, indent: int):
-        return ' ' * indent
-
-    def __generateDescription(self, format: LanguageFormat, description: str, indent: str) -> str:
-        outputLines: List[str] = []
-        for line in description.split('\n'):
-            ws = ' ' if line.strip() != '' else ''
-            # TODO: Find and replace links in ws
-            outputLines.append(f"{indent}{format.comment2}{ws}{line}")
-
-        return '\n'.join(outputLines)
-
-    def __generatePairContent(self, pair1: str, pair2: str, indent: str, seperator: str, content: str) -> str:
-        if not content:
-            return ""
-
-        output: str = ""
-        if pair1:
-            output += f"{indent}{pair1}{seperator}"
-
-        output += content
-
-        if pair2:
-            output += f"{seperator}{indent}{pair2}"
-
-        return output
-
-    def __generateSummary(self, format: LanguageFormat, comment_source: CommentSource, indent: str) -> str:
-        return self.__generatePairContent(
-            format.summary1,
-            format.summary2,
-            "",
-            "\n",
-            comment_source.description)
-
-    def __generateParam(self, format: LanguageFormat, comment_source: CommentSource, indent: str) -> str:
-        if comment_source.parameters == None:
-            return ""
-
-        def generate(param: Tuple[str, str]) -> str:
-            out: str = self.__generatePairContent(
-                format.param1,
-                format.param2,
-                "",
-                "",
-                param[0])
-
-            out = self.__generatePairContent(
-                out,
-                format.param3,
-                "",
-                "",
-                param[1])
-
-            return out
-
-        try:
-            outList: List[str] = []
-            for parameter in comment_source.parameters:
-                if parameter:
-                    for key in parameter:
-                        outList.append(
-                            generate((key.rstrip("\n"), parameter[key])))
-
-            return '\n'.join(outList)
-
-        except:
-            self.__printf(ErrorType.NotDeserializedError,
-                          comment_source.id, comment_source)
-            return ''
-
-    def __generateReturn(self, format: LanguageFormat, comment_source: CommentSource, indent: str) -> str:
-        if not comment_source.returns:
-            return ''
-
-        return self.__generatePairContent(
-            format.return1,
-            format.return3,
-            "",
-            "\n",
-            format.return2 + comment_source.returns)
+        # Reuse the `RenderPlan` compiled by the `ConfigurationReader` if it's for the same `LanguageFormat`
+        if renderPlan is not None and renderPlan.getFormat() is format:
+            self.__renderPlan = renderPlan
+        else:
+            self.__renderPlan = RenderPlan(format)
+        self.__otherRenderPlans = {}
+        if isinstance(commentSources, CommentSourceStore):
+            self.__commentSources = commentSources
+        else:
+            self.__commentSources = MemoryCommentSourceStore(commentSources)
+        self.__renderCache = OrderedDict()
+        self.__renderCacheSize = renderCacheSize
+        self.__renderCacheHits = 0
+        self.__renderCacheMisses = 0
+        self.__isForceMarkNoDoc = isForceMarkNoDoc
+        # Print the misses as they happen if no `MissReporter` is shared, the `filePath` is reported with the misses
+        self.__missReporter = missReporter if missReporter is not None else MissReporter(verbose=True)
+        self.__filePath = filePath
+        self.__resolvedTags = {}
+        self.__tagKeys = {}
+
+    def setRenderCacheSize(self, renderCacheSize: int):
+        """
+        Set the max number of the rendered comments to keep, 0 to disable the render cache.
+        """
+        self.__renderCacheSize = renderCacheSize
+        while len(self.__renderCache) > max(renderCacheSize, 0):
+            self.__renderCache.popitem(last=False)
+
+    def setFilePath(self, filePath: Optional[str]):
+        """
+        Set the path of the file to process next, which is reported with the misses. The rendered comments are
+        kept, so one `Tag2Doc` can be shared by the files of a run.
+        """
+        self.__filePath = filePath
+
+    def getRenderCacheInfo(self) -> RenderCacheInfo:
+        return RenderCacheInfo(
+            hits=self.__renderCacheHits,
+            misses=self.__renderCacheMisses,
+            maxSize=self.__renderCacheSize,
+            currentSize=len(self.__renderCache))
+
+    def getMissReporter(self) -> MissReporter:
+        return self.__missReporter
 
     def _generateComment(self, format: LanguageFormat, comment_source: CommentSource = None, indent: int = 2) -> str:
-        str_indent = self.__generateIndent(indent)
-
-        if comment_source == None or comment_source.is_hide:
-            return self.__generatePairContent(
-                format.comment1,
-                format.comment3,
-                str_indent,
-                "\n",
-                self.__generateDescription(format, format.ignore, str_indent))
-
-        out: str = ""
-        out += self.__generateSummary(format, comment_source, str_indent)
-
-        # Only the type with "api", or not the parent object
-        if comment_source.type_ == 'api' or (
-                comment_source.parameters is not None and 0 < len(comment_source.parameters)):
-            if paramStr := self.__generateParam(format, comment_source, str_indent):
-                out += "\n\n"
-                out += paramStr
-
-        if returnStr := self.__generateReturn(format, comment_source, str_indent):
-            out += "\n\n"
-            out += returnStr
-
-        if out == "":
-            return self.__generatePairContent(
-                format.comment1,
-                format.comment3,
-                str_indent,
-                "\n",
-                self.__generateDescription(format, format.ignore, str_indent))
-
-        return self.__generatePairContent(
-            format.comment1,
-            format.comment3,
-            str_indent,
-            "\n",
-            self.__generateDescription(format, out, str_indent))
-
-    def __getCommentSource(self, tag: str) -> Optional[CommentSource]:
-        if tag in self.__commentSources.keys():
-            return self.__commentSources[tag]
-
-        if "##" in tag:
-            tag_no_parameters = tag.split("##")[0]
-            tag_parameters = tag.split("##")[1]
-            tag_parameters_list = tag_parameters.split("#")
-            sort_tag_parameters_list = tag_parameters_list.copy()
-            sort_tag_parameters_list.sort()
-            for csk in self.__commentSources.keys():
-                if "##" in csk:
-                    id_no_parameters = csk.split("##")[0]
-                    if tag_no_parameters == id_no_parameters:
-                        parameters = csk.split("##")[1]
-                        parameters_list = parameters.split("#")
-                        sort_parameters_list = parameters_list.copy()
-                        sort_parameters_list.sort()
-                        if sort_tag_parameters_list == sort_parameters_list:
-                            parameters = []
-                            for it in tag_parameters_list:
-                                if self.__commentSources[csk].parameters:
-                                    for param in self.__commentSources[csk].parameters:
-                                        if param and len(list(param.keys())) > 0 and list(param.keys())[
-                                            0].lower() == it:
-                                            parameters.append(param)
-                            self.__commentSources[csk].parameters = parameters
-                            return self.__commentSources[csk]
+        return self.__generateComment(
+            format, comment_source, indent, comment_source.id if comment_source is not None else None)
+
+    def __generateComment(self, format: LanguageFormat, comment_source: Optional[CommentSource], indent: int,
+                          renderId: Optional[str]) -> str:
+        """
+        Render the `comment_source`, which is the same for the same `renderId`, e.g., the id of the tag it's
+        resolved from, the render is not cached if the `renderId` is None.
+        """
+        if self.__renderCacheSize <= 0 or (comment_source is not None and renderId is None):
+            return self.__renderComment(format, comment_source, indent)[0]
+
+        # The `CommentSource`s are not changed after deserialized
+        key = (renderId, indent, id(format))
+        entry = self.__renderCache.get(key)
+        if entry is not None and entry[0] is format:
+            self.__renderCacheHits += 1
+            self.__renderCache.move_to_end(key)
+            return entry[1]
+
+        self.__renderCacheMisses += 1
+        comment, isRendered = self.__renderComment(format, comment_source, indent)
+        if not isRendered:
+            # Not cached, so the parse error is reported for every occurrence
+            return comment
+
+        self.__renderCache[key] = (format, comment)
+        self.__renderCache.move_to_end(key)
+        if len(self.__renderCache) > self.__renderCacheSize:
+            self.__renderCache.popitem(last=False)
+
+        return comment
+
+    def __getRenderPlan(self, format: LanguageFormat) -> RenderPlan:
+        if self.__renderPlan.getFormat() is format:
+            return self.__renderPlan
+
+        renderPlan = self.__otherRenderPlans.get(id(format))
+        if renderPlan is None or renderPlan.getFormat() is not format:
+            renderPlan = RenderPlan(format)
+            self.__otherRenderPlans[id(format)] = renderPlan
+
+        return renderPlan
+
+    def __renderComment(self, format: LanguageFormat, comment_source: Optional[CommentSource],
+                        indent: int) -> Tuple[str, bool]:
+        """
+        Return the comment, and whether it's rendered without the parse error
+        """
+        badCommentSources: List[CommentSource] = []
+
+        def onBadCommentSource(badCommentSource: CommentSource):
+            badCommentSources.append(badCommentSource)
+            self.__missReporter.reportParseError(badCommentSource, self.__filePath)
+
+        comment = self.__getRenderPlan(format).render(comment_source, indent, onBadCommentSource)
+        return comment, not badCommentSources
+
+    def __getCommentSource(self, tagKey: TagKey) -> Optional[CommentSource]:
+        comment_source = self.__commentSources.get(tagKey.id)
+        if comment_source is not None:
+            return comment_source
+
+        if tagKey.parameters is not None:
+            if tagKey.id in self.__resolvedTags:
+                return self.__resolvedTags[tagKey.id]
+
+            comment_source = self.__resolveOverloadedTag(tagKey)
+            self.__resolvedTags[tagKey.id] = comment_source
+            return comment_source
+
+        return None
+
+    def __resolveOverloadedTag(self, tagKey: TagKey) -> Optional[CommentSource]:
+        comment_source = self.__commentSources.findBySortedParameters(
+            tagKey.baseId, tagKey.sortedParameters)
+        if comment_source:
+            parameters = []
+            for it in tagKey.parameters:
+                if comment_source.parameters:
+                    for param in comment_source.parameters:
+                        if param and len(list(param.keys())) > 0 and list(param.keys())[
+                                0].lower() == it:
+                            parameters.append(param)
+
+            # Return a copy with the parameters in the tag order, the `CommentSource` in the store is shared
+            # by the other tags and files, which should not be changed.
+            reordered_comment_source = copy.copy(comment_source)
+            reordered_comment_source.parameters = parameters
+            return reordered_comment_source
 
         # Allow fallback to the match id without parameter list if the parameter list not matched
-        if "##" in tag:
-            tag_no_parameters = tag.split("##")[0]
-            for csk in self.__commentSources.keys():
-                if "##" in csk:
-                    id_no_parameters = csk.split("##")[0]
-                    if tag_no_parameters == id_no_parameters:
-                        return self.__commentSources[csk]
-                elif tag_no_parameters == csk:
-                    return self.__commentSources[csk]
+        return self.__commentSources.findByBaseId(tagKey.baseId)
 
-        return None
+    def __processTag(self, tagKey: TagKey, line: str, indent: int) -> str:
+        comment_source: CommentSource = self.__getCommentSource(tagKey)
+        if comment_source:
+            # The overloaded tags are resolved to the copies with the parameters in the tag order, which have the
+            # same id as the `CommentSource` in the store, the tag id is unique to the resolved `CommentSource`.
+            return self.__generateComment(self.__format, comment_source, indent, tagKey.id)
+
+        self.__missReporter.reportNotFound(tagKey.id, self.__filePath)
+        # Mark the not found tags as nodoc
+        if self.__isForceMarkNoDoc and line.strip().endswith("*/"):
+            return self._generateComment(self.__format, None)
+
+        return line
+
+    def __getTagKey(self, tag: str) -> TagKey:
+        tagKey = self.__tagKeys.get(tag)
+        if tagKey is None:
+            tagKey = TagKey(tag)
+            self.__tagKeys[tag] = tagKey
+        return tagKey
+
+    def __processLine(self, line: str) -> str:
+        strippedLine = line.strip()
+        if not strippedLine.startswith('/*'):
+            return line
+
+        m = _TAG_PATTERN.match(strippedLine)
+        if m:
+            return self.__processTag(self.__getTagKey(m.group(1)), line, line.find('/'))
+
+        # Mark the other single line block comments as nodoc
+        if self.__isForceMarkNoDoc and strippedLine.startswith("/*") and strippedLine.endswith("*/"):
+            return self._generateComment(self.__format, None)
+
+        return line
+
+    def __splitCodeLines(self, code: str) -> List[str]:
+        # In the force nodoc mode, the lines are split the same as the `str.splitlines`, which is used by the
+        # nodoc post phase before, so the line endings of the output are not changed.
+        return code.splitlines() if self.__isForceMarkNoDoc else code.split('\n')
 
     def process(self, code: str) -> str:
-        codeInLines = code.split('\n')
-        outputLines: List[str] = []
-        for line in codeInLines:
-            m = re.match(r'\/\*\s(.*)\s\*\/', line.strip())
-            if m:
-                tag = m.group(1)
-                comment_source: CommentSource = self.__getCommentSource(tag)
-
-                if comment_source:
-                    indent = line.find('/')
-                    comment = self._generateComment(
-                        self.__format, comment_source, indent)
-                    outputLines.append(comment)
-                    continue
-                else:
-                    self.__printf(ErrorType.FileNotFoundError, tag)
-
-            outputLines.append(line)
-
-        return '\n'.join(outputLines)
+        return '\n'.join([self.__processLine(line) for line in self.__splitCodeLines(code)])
+
+    def __iterCodeLines(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Split the `lines` the same as `process` splits the text which joins them, the line endings are kept in
+        the `lines`, or a line ending is assumed between two lines without one.
+        """
+        iterator = iter(lines)
+        line = next(iterator, None)
+        while line is not None:
+            nextLine = next(iterator, None)
+            isLastLine = nextLine is None
+            isEndWithNewline = line.endswith('\n')
+            if self.__isForceMarkNoDoc:
+                yield from (line if isEndWithNewline or isLastLine else line + '\n').splitlines()
+            else:
+                yield from (line[:-1] if isEndWithNewline else line).split('\n')
+                if isEndWithNewline and isLastLine:
+                    yield ''
+
+            line = nextLine
+
+    def __writeLines(self, outputLines: Iterable[str], sink: TextIO):
+        isFirstLine = True
+        for line in outputLines:
+            if not isFirstLine:
+                sink.write('\n')
+            sink.write(line)
+            isFirstLine = False
+
+    def processLines(self, lines: Iterable[str], sink: TextIO):
+        """
+        Stream version of `process`, which processes the `lines`, e.g., a file opened for reading, line by line,
+        and writes the output to the `sink` as it goes.
+        """
+        self.__writeLines((self.__processLine(line) for line in self.__iterCodeLines(lines)), sink)
+
+    def __iterProcessedTaggedLines(self, taggedLines: List[Union[str, Token]]) -> Iterator[str]:
+        if self.__isForceMarkNoDoc and taggedLines and taggedLines[-1] == '':
+            # The trailing empty line is dropped by the `str.splitlines` in `process`
+            taggedLines = taggedLines[:-1]
+
+        for line in taggedLines:
+            if not isinstance(line, Token):
+                yield self.__processLine(line)
+                continue
+
+            tagKey = line.getTagKey()
+            text = line.toString()
+            textLines = self.__splitCodeLines(text) if text else []
+            if tagKey is None or len(textLines) != 1:
+                # Not a tag, or a tag which is split to multiple lines when the text is parsed back, which are
+                # processed line by line as `process` does
+                for textLine in textLines:
+                    yield self.__processLine(textLine)
+                continue
+
+            # The tag built by the `Token` is not indented
+            yield self.__processTag(tagKey, text, 0)
+
+    def processTaggedLines(self, taggedLines: List[Union[str, Token]]) -> str:
+        """
+        Process the output of `TagBuilder.buildTaggedLines`, which is the same as processing the joined output
+        of `TagBuilder.build`, but the `Token`s are looked up by their keys directly.
+        """
+        return '\n'.join(self.__iterProcessedTaggedLines(taggedLines))
+
+    def writeTaggedLines(self, taggedLines: List[Union[str, Token]], sink: TextIO):
+        """
+        Stream version of `processTaggedLines`, which writes the output to the `sink` as it goes.
+        """
+        self.__writeLines(self.__iterProcessedTaggedLines(taggedLines), sink)
@@ -8,12 +8,14 @@ class TestApiTaggerCSharp(unittest.TestCase):
 
     __fileSystem: fs.memoryfs.MemoryFS
     __apiTagger: ApiTagger
+    # Whether to match the scopes on the code lines of the `SourceLexer`
+    _useLexer: bool = False
 
     @classmethod
     def setUpClass(self):
         self.__fileSystem = fs.memoryfs.MemoryFS()
         self.__apiTagger = ApiTagger(
-            self.__fileSystem, CSharpTagBuilder())
+            self.__fileSystem, CSharpTagBuilder(useLexer=self._useLexer))
 
     @classmethod
     def tearDownClass(self):
@@ -209,5 +211,9 @@ namespace Agora.Rtc
         self.assertEqual(processedContent, expectedContent)
 
 
+class TestApiTaggerCSharpWithLexer(TestApiTaggerCSharp):
+    _useLexer = True
+
+
 if __name__ == '__main__':
     unittest.main()
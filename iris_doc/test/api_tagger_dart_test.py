@@ -1,19 +1,65 @@
 import fs.memoryfs
 import unittest
-from iris_doc.api_tagger import ApiTagger, TagBuilder
-from iris_doc.dart.api_tagger_dart import DartTagBuilder
+from collections import defaultdict
+from typing import Callable, Dict
+
+from iris_doc.api_tagger import ApiTagger, DefaultLineScanner, TagBuilder
+from iris_doc.dart.api_tagger_dart import DartSyntaxMatcher, DartTagBuilder
+
+
+class CountingDartSyntaxMatcher(DartSyntaxMatcher):
+    """
+    Count the calls of the scope matchers by name, the calls made by the other matchers, e.g., the default
+    `matchFunctionScopeStart` calls the `matchClassScopeStart`, are not counted
+    """
+    calls: Dict[str, int]
+    __depth: int
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = defaultdict(int)
+        self.__depth = 0
+
+    def __count(self, name: str, method: Callable[[str], bool], line: str) -> bool:
+        if self.__depth == 0:
+            self.calls[name] += 1
+        self.__depth += 1
+        try:
+            return method(line)
+        finally:
+            self.__depth -= 1
+
+    def matchFunctionScopeStart(self, line: str) -> bool:
+        return self.__count("matchFunctionScopeStart", super().matchFunctionScopeStart, line)
+
+    def matchFunctionScopeEnd(self, line: str) -> bool:
+        return self.__count("matchFunctionScopeEnd", super().matchFunctionScopeEnd, line)
+
+    def matchClassScopeStart(self, line: str) -> bool:
+        return self.__count("matchClassScopeStart", super().matchClassScopeStart, line)
+
+    def matchClassScopeEnd(self, line: str) -> bool:
+        return self.__count("matchClassScopeEnd", super().matchClassScopeEnd, line)
+
+    def matchMemberVariableScopeStart(self, line: str) -> bool:
+        return self.__count("matchMemberVariableScopeStart", super().matchMemberVariableScopeStart, line)
+
+    def matchMemberVariableScopeEnd(self, line: str) -> bool:
+        return self.__count("matchMemberVariableScopeEnd", super().matchMemberVariableScopeEnd, line)
 
 
 class TestApiTaggerDart(unittest.TestCase):
 
     __fileSystem: fs.memoryfs.MemoryFS
     __apiTagger: ApiTagger
+    # Whether to match the scopes on the code lines of the `SourceLexer`
+    _useLexer: bool = False
 
     @classmethod
     def setUpClass(self):
         self.__fileSystem = fs.memoryfs.MemoryFS()
         self.__apiTagger = ApiTagger(
-            self.__fileSystem, DartTagBuilder())
+            self.__fileSystem, DartTagBuilder(useLexer=self._useLexer))
 
     @classmethod
     def tearDownClass(self):
@@ -852,6 +898,86 @@ class Size {
         processedContent = self.__fileSystem.readtext(path)
         self.assertEqual(processedContent, expectedContent)
 
+    def test_findScopeEndIndex(self):
+        lines = """
+class Outer {
+  void method() {
+    if (true) {
+    }
+  }
+  void abstractMethod(
+      int a);
+}
+enum Enum {
+  value,
+}
+""".split('\n')
+        scanner = DefaultLineScanner(DartSyntaxMatcher(), lines)
+
+        self.assertEqual(scanner._findClassScopeEndIndex(lines, 1), 8)
+        self.assertEqual(scanner._findFunctionScopeEndIndex(lines, 2), 5)
+        self.assertEqual(scanner._findFunctionScopeEndIndex(lines, 3), 4)
+        self.assertEqual(scanner._findFunctionScopeEndIndex(lines, 6), 7)
+        self.assertEqual(scanner._findEnumScopeEndIndex(lines, 9), 11)
+        self.assertEqual(scanner._findFunctionScopeStartIndex(lines, 6), 9)
+        # The unclosed scope
+        self.assertEqual(scanner._findClassScopeEndIndex(lines[:8], 1), -1)
+
+    def test_scopeMatcherCalls(self):
+        lines = """
+class Outer {
+  final int value;
+  final void Function(
+      int value)? onChanged;
+
+  void method() {
+    if (true) {
+    }
+  }
+}
+""".split('\n')
+        syntaxMatcher = CountingDartSyntaxMatcher()
+        scanner = DefaultLineScanner(syntaxMatcher, lines)
+        tokens = scanner.tokenize()
+        self.assertEqual([token.toString() for token in tokens], [
+            "/* class_outer */",
+            "/* class_outer_value */",
+            "/* class_outer_onchanged */",
+            "/* api_outer_method */",
+        ])
+
+        # The scope matchers are called once per line to classify the line records, beside the checks of the scope
+        # starts found
+        self.assertEqual(syntaxMatcher.calls["matchFunctionScopeStart"], len(lines))
+        self.assertEqual(syntaxMatcher.calls["matchFunctionScopeEnd"], len(lines))
+        self.assertEqual(syntaxMatcher.calls["matchClassScopeStart"], len(lines) + 1)
+        self.assertEqual(syntaxMatcher.calls["matchClassScopeEnd"], len(lines))
+        # The member variable scopes are classified at most once per line
+        self.assertLessEqual(syntaxMatcher.calls["matchMemberVariableScopeStart"], len(lines))
+        self.assertLessEqual(syntaxMatcher.calls["matchMemberVariableScopeEnd"], len(lines))
+
+    def test_getAnnotations(self):
+        lines = """@immutable
+class Outer {
+  @protected
+  @override
+  void method();
+
+  void other();
+}""".split('\n')
+        scanner = DefaultLineScanner(DartSyntaxMatcher(), lines)
+
+        # The annotations are returned from the nearest one
+        self.assertEqual(scanner._getAnnotations(4), ['override', 'protected'])
+        self.assertEqual(scanner._getAnnotations(3), ['protected'])
+        self.assertEqual(scanner._getAnnotations(1), ['immutable'])
+        self.assertEqual(scanner._getAnnotations(6), [])
+        self.assertEqual(scanner._getAnnotations(0), [])
+
+
+class TestApiTaggerDartWithLexer(TestApiTaggerDart):
+    _useLexer = True
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -268,12 +268,14 @@ class TestApiTaggerOc(unittest.TestCase):
 
     __fileSystem: fs.memoryfs.MemoryFS
     __apiTagger: ApiTagger
+    # Whether to match the scopes on the code lines of the `SourceLexer`
+    _useLexer: bool = False
 
     @classmethod
     def setUpClass(self):
         self.__fileSystem = fs.memoryfs.MemoryFS()
         self.__apiTagger = ApiTagger(
-            self.__fileSystem, ObjCTagBuilder())
+            self.__fileSystem, ObjCTagBuilder(useLexer=self._useLexer))
 
     @classmethod
     def tearDownClass(self):
@@ -295,5 +297,10 @@ class TestApiTaggerOc(unittest.TestCase):
             processedContent = self.__fileSystem.readtext(path)
             self.assertEqual(processedContent, expectedContent)
 
+
+class TestApiTaggerOcWithLexer(TestApiTaggerOc):
+    _useLexer = True
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -8,12 +8,14 @@ class TestApiTaggerTS(unittest.TestCase):
 
     __fileSystem: fs.memoryfs.MemoryFS
     __apiTagger: ApiTagger
+    # Whether to match the scopes on the code lines of the `SourceLexer`
+    _useLexer: bool = False
 
     @classmethod
     def setUpClass(self):
         self.__fileSystem = fs.memoryfs.MemoryFS()
         self.__apiTagger = ApiTagger(
-            self.__fileSystem, TSTagBuilder())
+            self.__fileSystem, TSTagBuilder(useLexer=self._useLexer))
 
     @classmethod
     def tearDownClass(self):
@@ -380,5 +382,9 @@ export const AgoraRtcSurfaceView = requireNativeComponent<{ callApi: object }>(
         self.assertEqual(processedContent, expectedContent)
 
 
+class TestApiTaggerTSWithLexer(TestApiTaggerTS):
+    _useLexer = True
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,50 @@
+import fs.base
+import fs.copy
 import fs.memoryfs
+import fs.osfs
+import io
+import json
+import pickle
+import tempfile
+import threading
+import tracemalloc
 import unittest
+from typing import Dict, Iterable, Iterator
 
-from iris_doc.language_specification import CommentSource, LanguageSpecificationModule, LanguageSpecificationConfig
+from iris_doc.language_specification import CommentSource, LanguageSpecificationModule, LanguageSpecificationConfig, \
+    MemoryCommentSourceStore, TagKey, _indexTemplateNames, _parseJson, iterJsonArray
+
+
+class _CountingNames(Dict[str, str]):
+    """
+    The names by id, which counts the lookups and the scans of the names
+    """
+    lookupCount: int = 0
+    scanCount: int = 0
+
+    def get(self, key, default=None):
+        self.lookupCount += 1
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        self.lookupCount += 1
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        self.scanCount += 1
+        return super().__iter__()
+
+    def keys(self):
+        self.scanCount += 1
+        return super().keys()
+
+    def values(self):
+        self.scanCount += 1
+        return super().values()
+
+    def items(self):
+        self.scanCount += 1
+        return super().items()
 
 
 class TestLanguageSpecificationModule(unittest.TestCase):
@@ -353,6 +396,361 @@ class TestLanguageSpecificationModule(unittest.TestCase):
         self.assertEqual(
             commentSources["class_rtcengineeventhandler_param2"].description, "value2")
 
+    def __writeSyntheticTemplate(self, path: str, classCount: int):
+        elements = []
+        for i in range(classCount):
+            elements.append({
+                "id": f"class_irtcengine{i}",
+                "name": f"RtcEngine{i}",
+                "description": f"The RtcEngine{i} interface",
+                "parameters": [],
+                "returns": "",
+                "is_hide": False
+            })
+            elements.append({
+                "id": f"api_irtcengine{i}_joinchannel",
+                "name": "joinChannel",
+                "description": "Joins a channel.",
+                "parameters": [{"token": "The token"}, {"channelId": "The channel name"}],
+                "returns": "",
+                "is_hide": False
+            })
+
+        self.__fileSystem.writetext(path, json.dumps(elements))
+
+    def testDeserializeScalesLinearly(self):
+        languageSpecificationConfig: LanguageSpecificationConfig = LanguageSpecificationConfig(
+            isCallback2class=True,
+            isCallback2api=False,
+            idPatternV2=True)
+        path = "testDeserializeScalesLinearly.json"
+
+        # Count the elements visited and the names looked up, a quadratic parent lookup would scan the
+        # template, or the names of it, for every element.
+        for classCount in [1000, 4000]:
+            self.__writeSyntheticTemplate(path, classCount)
+            visitCount = 0
+
+            def visit(elements: Iterable[Dict]) -> Iterator[Dict]:
+                nonlocal visitCount
+                for element in elements:
+                    visitCount += 1
+                    yield element
+
+            with self.__fileSystem.open(path) as file:
+                namesById = _CountingNames(_indexTemplateNames(file))
+            with self.__fileSystem.open(path) as file:
+                commentSources = list(_parseJson(visit(iterJsonArray(file)), namesById, languageSpecificationConfig))
+
+            self.assertEqual(len(commentSources), classCount * 2)
+            self.assertEqual(visitCount, classCount * 2)
+            self.assertLessEqual(namesById.lookupCount, classCount * 2)
+            self.assertEqual(namesById.scanCount, 0)
+
+        module = LanguageSpecificationModule(
+            self.__fileSystem, languageSpecificationConfig)
+        module.addTemplateFilePath(path)
+        module.deserialize()
+
+        commentSources = module.getAllCommentSources()
+        self.assertEqual(len(commentSources.keys()), 8000)
+        self.assertIn(
+            "api_rtcengine3999_joinchannel##token#channelid", commentSources.keys())
+
+    def testDeserializeFromCache(self):
+        path = "testDeserializeFromCache.json"
+        self.__writeSyntheticTemplate(path, 2)
+        cacheDir = "cache"
+
+        def deserialize(isCallback2class: bool) -> LanguageSpecificationModule:
+            languageSpecificationConfig: LanguageSpecificationConfig = LanguageSpecificationConfig(
+                isCallback2class=isCallback2class,
+                isCallback2api=not isCallback2class,
+                idPatternV2=True)
+            module = LanguageSpecificationModule(
+                self.__fileSystem, languageSpecificationConfig)
+            module.addTemplateFilePath(path)
+            module.setCacheDir(cacheDir)
+            module.deserialize()
+            return module
+
+        commentSources = deserialize(True).getAllCommentSources()
+        self.assertEqual(len(commentSources.keys()), 4)
+
+        cacheFiles = self.__fileSystem.listdir(cacheDir)
+        self.assertEqual(len(cacheFiles), 1)
+
+        # Tamper the cache file to make sure the later run is loaded from it rather than the template file.
+        cachePath = f"{cacheDir}/{cacheFiles[0]}"
+        formatVersion, cachedCommentSources = pickle.loads(self.__fileSystem.readbytes(cachePath))
+        cachedCommentSources["class_rtcengine0"].description = "Loaded from cache"
+        self.__fileSystem.writebytes(cachePath, pickle.dumps((formatVersion, cachedCommentSources)))
+
+        commentSources = deserialize(True).getAllCommentSources()
+        self.assertEqual(len(commentSources.keys()), 4)
+        self.assertEqual(commentSources["class_rtcengine0"].description, "Loaded from cache")
+        self.assertIn(
+            "api_rtcengine1_joinchannel##token#channelid", commentSources.keys())
+
+        # The cache of another layout falls back to parsing the template file, and is rewritten.
+        for cache in [cachedCommentSources, (formatVersion + 1, cachedCommentSources), (formatVersion, {})]:
+            self.__fileSystem.writebytes(cachePath, pickle.dumps(cache))
+            commentSources = deserialize(True).getAllCommentSources()
+            self.assertEqual(commentSources["class_rtcengine0"].description, "The RtcEngine0 interface")
+            self.assertEqual(pickle.loads(self.__fileSystem.readbytes(cachePath))[0], formatVersion)
+
+        # A different config should not hit the cache of the previous config.
+        commentSources = deserialize(False).getAllCommentSources()
+        self.assertEqual(commentSources["class_rtcengine0"].description, "The RtcEngine0 interface")
+        self.assertEqual(len(self.__fileSystem.listdir(cacheDir)), 2)
+
+        # The template content is part of the cache key.
+        self.__writeSyntheticTemplate(path, 3)
+        commentSources = deserialize(True).getAllCommentSources()
+        self.assertEqual(len(commentSources.keys()), 6)
+        self.assertEqual(commentSources["class_rtcengine0"].description, "The RtcEngine0 interface")
+
+    def testIterJsonArray(self):
+        elements = [
+            {"id": "class_a", "name": "A", "description": "Contains ] and [ and , and \\\" in string"},
+            {"id": "api_a_b", "name": "b", "parameters": [{"x": "1"}, None, {}], "number": 12345678},
+            12345678,
+            "string",
+            [],
+        ]
+        content = "  \n" + json.dumps(elements, indent=4) + "\n"
+
+        chunkSizes = list(range(1, 9)) + [64 * 1024]
+        for chunkSize in chunkSizes:
+            self.assertEqual(list(iterJsonArray(io.StringIO(content), chunkSize)), elements)
+            # The numbers split by the chunks
+            self.assertEqual(list(iterJsonArray(io.StringIO("[1.5e10 , -3]"), chunkSize)), [1.5e10, -3])
+            self.assertEqual(list(iterJsonArray(io.StringIO("[12345,-0.25E-3,6]"), chunkSize)), [12345, -0.25E-3, 6])
+            self.assertEqual(list(iterJsonArray(io.StringIO(" [ ] \n"), chunkSize)), [])
+
+            for invalid in ['{"id": "class_a"}', '[{"id": "class_a"}', '[1,,2]', '[1 2]', '[1]xyz', '[1,]', '[,1]',
+                            '[1.5e10 -3]', '[1', '']:
+                with self.assertRaises(ValueError, msg=f"{invalid} in chunk size {chunkSize}"):
+                    list(iterJsonArray(io.StringIO(invalid), chunkSize))
+
+    def testIterJsonArrayBoundedMemory(self):
+        elements = [{"id": f"class_a{i}", "name": f"A{i}", "description": "x" * 100} for i in range(20000)]
+        content = json.dumps(elements)
+        del elements
+
+        file = io.StringIO(content)
+        tracemalloc.start()
+        count = 0
+        for _ in iterJsonArray(file):
+            count += 1
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.assertEqual(count, 20000)
+        self.assertLess(peak, len(content) / 10)
+
+    def testParallelDeserializeKeepsFileOrder(self):
+        templates = [
+            [
+                {"id": "class_irtcengine", "name": "RtcEngine", "description": "Hidden RtcEngine",
+                 "parameters": [{"appId": "Hidden App ID"}], "returns": "", "is_hide": True},
+                {"id": "class_rtmconfig", "name": "RtmConfig", "description": "RtmConfig from file 1",
+                 "parameters": [], "returns": "", "is_hide": False},
+            ],
+            [
+                {"id": "class_irtcengine", "name": "RtcEngine", "description": "RtcEngine from file 2",
+                 "parameters": [{"appId": "App ID from file 2"}, {"areaCode": "Area code"}],
+                 "returns": "", "is_hide": False},
+                {"id": "class_rtmconfig", "name": "RtmConfig", "description": "RtmConfig from file 2",
+                 "parameters": [], "returns": "", "is_hide": False},
+            ],
+            [
+                {"id": "class_irtcengine", "name": "RtcEngine", "description": "RtcEngine from file 3",
+                 "parameters": [], "returns": "", "is_hide": False},
+                {"id": "api_irtcengine_joinchannel", "name": "joinChannel", "description": "Joins a channel.",
+                 "parameters": [{"token": "The token"}], "returns": "", "is_hide": False},
+            ],
+        ]
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            osFileSystem = fs.osfs.OSFS(tempDir)
+            paths = []
+            for i, template in enumerate(templates):
+                path = f"template{i}.json"
+                osFileSystem.writetext(path, json.dumps(template))
+                paths.append(path)
+
+            def deserialize(maxWorkers: int, fileSystem: fs.base.FS = osFileSystem) -> Dict[str, str]:
+                languageSpecificationConfig: LanguageSpecificationConfig = LanguageSpecificationConfig(
+                    isCallback2class=True,
+                    isCallback2api=False,
+                    idPatternV2=True)
+                module = LanguageSpecificationModule(
+                    fileSystem, languageSpecificationConfig)
+                for path in paths:
+                    module.addTemplateFilePath(path)
+                module.setMaxWorkers(maxWorkers)
+                module.deserialize()
+                return {k: v.description for k, v in module.getAllCommentSources().items()}
+
+            # Fewer workers than the files, the next file is submitted as a result is merged
+            parallelResult = deserialize(2)
+            sequentialResult = deserialize(1)
+            # The templates which are not in the OS file system are read through the file system as well
+            memoryFileSystem = fs.memoryfs.MemoryFS()
+            fs.copy.copy_fs(osFileSystem, memoryFileSystem)
+            memoryResult = deserialize(3, memoryFileSystem)
+            memoryFileSystem.close()
+            osFileSystem.close()
+
+        self.assertEqual(list(parallelResult.items()), list(sequentialResult.items()))
+        self.assertEqual(list(memoryResult.items()), list(sequentialResult.items()))
+        self.assertEqual(parallelResult, {
+            "class_rtcengine": "RtcEngine from file 2",
+            "class_rtcengine_appid": "App ID from file 2",
+            "class_rtcengine_areacode": "Area code",
+            "class_rtmconfig": "RtmConfig from file 1",
+            "api_rtcengine_joinchannel##token": "Joins a channel.",
+        })
+
+    def __writeCallbackTemplate(self, path: str):
+        self.__fileSystem.writetext(path, json.dumps([
+            {"id": "class_irtcengineeventhandler", "name": "RtcEngineEventHandler",
+             "description": "The RtcEngineEventHandler interface", "parameters": [], "returns": "", "is_hide": False},
+            {"id": "callback_irtcengineeventhandler_onerror", "name": "onError", "description": "Reports an error.",
+             "parameters": [], "returns": "", "is_hide": False},
+        ]))
+
+    def testModulesKeepOwnState(self):
+        path = "testModulesKeepOwnState.json"
+        self.__writeCallbackTemplate(path)
+
+        dartModule = LanguageSpecificationModule(
+            self.__fileSystem, LanguageSpecificationConfig(isCallback2class=True, isCallback2api=False, idPatternV2=True))
+        dartModule.addTemplateFilePath(path)
+        dartModule.deserialize()
+
+        tsModule = LanguageSpecificationModule(
+            self.__fileSystem, LanguageSpecificationConfig(isCallback2class=False, isCallback2api=True, idPatternV2=True))
+        tsModule.addTemplateFilePath(path)
+        tsModule.deserialize()
+
+        self.assertEqual(list(dartModule.getAllCommentSources().keys()), [
+            "class_rtcengineeventhandler", "class_rtcengineeventhandler_onerror"])
+        self.assertEqual(list(tsModule.getAllCommentSources().keys()), [
+            "class_rtcengineeventhandler", "api_rtcengineeventhandler_onerror"])
+
+    def testResolveMembersLazily(self):
+        store = MemoryCommentSourceStore()
+        store["class_rtcengine_appid"] = CommentSource(id="class_rtcengine_appid", description="Before the class")
+        store.setMembers("class_rtcengine", [{"appId": "The App ID"}, {"areaCode": "The area code"}], False)
+        store.setMembers("class_rtcengine", [{"areaCode": "Shadowed by the latest members"}], True)
+        store.setMembers("class_rtc_engine", [{"areaCode": "The area code of the engine"}], False)
+        store.setMembers("class_rtc", [{"engine_areaCode": "Shadowed by the latest members"}], True)
+        store["class_rtcengine_context"] = CommentSource(id="class_rtcengine_context", description="After the class")
+        store.setMembers("class_rtcengine", [{"context": "The context"}], False)
+
+        self.assertEqual(store["class_rtcengine_appid"].name, "appId")
+        self.assertEqual(store["class_rtcengine_appid"].description, "The App ID")
+        self.assertEqual(store["class_rtcengine_areacode"].description, "Shadowed by the latest members")
+        self.assertTrue(store["class_rtcengine_areacode"].is_hide)
+        self.assertEqual(store["class_rtc_engine_areacode"].name, "engine_areaCode")
+        self.assertEqual(store["class_rtcengine_context"].description, "The context")
+        self.assertNotIn("class_rtcengine_token", store)
+        self.assertIsNone(store.get("class_rtcengine_token"))
+
+        self.assertEqual(sorted(store.keys()), [
+            "class_rtc_engine_areacode",
+            "class_rtcengine_appid",
+            "class_rtcengine_areacode",
+            "class_rtcengine_context",
+        ])
+        self.assertEqual(len(store), 4)
+
+        del store["class_rtcengine_appid"]
+        self.assertNotIn("class_rtcengine_appid", store)
+        self.assertEqual(len(pickle.loads(pickle.dumps(store))), 3)
+        self.assertEqual(store.snapshot()["class_rtcengine_context"].description, "The context")
+
+    def testFindBySignatureIndex(self):
+        store = MemoryCommentSourceStore({
+            "api_rtcengine_joinchannel##token#channelid": CommentSource(name="joinChannel1"),
+            "api_rtcengine_joinchannel##channelid#token": CommentSource(name="joinChannel2"),
+            "api_rtcengine_joinchannel##token#channelid#options": CommentSource(name="joinChannel3"),
+        })
+
+        self.assertEqual(
+            store.findBySortedParameters("api_rtcengine_joinchannel", ["channelid", "token"]).name, "joinChannel1")
+        self.assertEqual(store.findByBaseId("api_rtcengine_joinchannel").name, "joinChannel1")
+        self.assertIsNone(store.findBySortedParameters("api_rtcengine_joinchannel", ["token"]))
+        self.assertIsNone(store.findByBaseId("api_rtcengine_leavechannel"))
+
+        store["api_rtcengine_leavechannel##options"] = CommentSource(name="leaveChannel")
+        self.assertEqual(store.findByBaseId("api_rtcengine_leavechannel").name, "leaveChannel")
+
+        del store["api_rtcengine_joinchannel##token#channelid"]
+        self.assertEqual(
+            store.findBySortedParameters("api_rtcengine_joinchannel", ["channelid", "token"]).name, "joinChannel2")
+        self.assertEqual(store.findByBaseId("api_rtcengine_joinchannel").name, "joinChannel2")
+
+        store["api_rtcengine_joinchannel##token#channelid"] = CommentSource(name="joinChannel4")
+        self.assertEqual(
+            store.findBySortedParameters("api_rtcengine_joinchannel", ["channelid", "token"]).name, "joinChannel2")
+
+    def testTagKey(self):
+        key = TagKey.fromParts("api", "RtcEngine", "joinChannel##token#channelId")
+        self.assertEqual(key.id, "api_rtcengine_joinchannel##token#channelid")
+        self.assertEqual(key.type, "api")
+        self.assertEqual(key.owner, "rtcengine")
+        self.assertEqual(key.member, "joinchannel")
+        self.assertEqual(key.baseId, "api_rtcengine_joinchannel")
+        self.assertEqual(key.parameters, ("token", "channelid"))
+        self.assertEqual(key.sortedParameters, ("channelid", "token"))
+        self.assertEqual(key, TagKey("api_rtcengine_joinchannel##token#channelid"))
+        self.assertNotEqual(key, TagKey("api_rtcengine_joinchannel##channelid#token"))
+
+        key = TagKey.fromParts("enum", "AudioScenario_Type")
+        self.assertEqual(key.id, "enum_audioscenario_type")
+        self.assertEqual(key.baseId, "enum_audioscenario_type")
+        self.assertIsNone(key.parameters)
+        self.assertIsNone(key.sortedParameters)
+
+    def testIndexSnapshot(self):
+        path = "testIndexSnapshot.json"
+        self.__writeCallbackTemplate(path)
+        path2 = "testIndexSnapshot2.json"
+        self.__writeSyntheticTemplate(path2, 1)
+
+        module = LanguageSpecificationModule(
+            self.__fileSystem, LanguageSpecificationConfig(isCallback2class=True, isCallback2api=False, idPatternV2=True))
+        module.addTemplateFilePath(path)
+        module.deserialize()
+
+        snapshot = module.getIndexSnapshot()
+        with self.assertRaises(TypeError):
+            snapshot["class_rtcengine0"] = CommentSource(id="class_rtcengine0")
+        with self.assertRaises(TypeError):
+            del snapshot["class_rtcengineeventhandler"]
+
+        module.addTemplateFilePath(path2)
+        module.deserialize()
+        self.assertIn("class_rtcengine0", module.getAllCommentSources())
+        self.assertNotIn("class_rtcengine0", snapshot)
+
+        results = []
+
+        def lookup():
+            for _ in range(1000):
+                results.append(snapshot["class_rtcengineeventhandler_onerror"].description)
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["Reports an error."] * 4000)
+
 
 if __name__ == '__main__':
     unittest.main()
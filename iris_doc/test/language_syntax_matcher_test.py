@@ -1,7 +1,8 @@
 from typing import List, Optional
 import fs.memoryfs
 import unittest
-from iris_doc.api_tagger import ApiTagger, LanguageSyntaxMatcher, LineScanner, TagBuilder
+from iris_doc.api_tagger import ApiTagger, LanguageSyntaxMatcher, LineScanner, TagBuilder, TYPE_API, TYPE_CLASS, \
+    TYPE_CONSTRUCT, TYPE_ENUM
 from iris_doc.dart.api_tagger_dart import DartLineScanner, DartSyntaxMatcher, DartTagBuilder
 
 
@@ -20,6 +21,11 @@ class FakeSyntaxMatcher(DartSyntaxMatcher):
         return "FixedFakeFuncName"
 
 
+class OverriddenMemberFunctionSyntaxMatcher(DartSyntaxMatcher):
+    def matchMemberFunction(self, line: str) -> str:
+        return "OverriddenFuncName" if "(" in line else None
+
+
 class FakeTagBuilder(TagBuilder):
     fake_syntax_matcher: FakeSyntaxMatcher
 
@@ -136,3 +142,19 @@ class MemberFunction {
       ExternalVideoSourceType sourceType = ExternalVideoSourceType.videoFrame,
       SenderOptions encodedVideoOption = const SenderOptions()});
 """.strip("\n"))
+
+    def test_matchDeclaration(self):
+        syntaxMatcher = DartSyntaxMatcher()
+        self.assertEqual(syntaxMatcher.matchDeclaration("abstract class RtcEngine {"), (TYPE_CLASS, "RtcEngine"))
+        self.assertEqual(syntaxMatcher.matchDeclaration("enum ErrorCodeType {"), (TYPE_ENUM, "ErrorCodeType"))
+        self.assertIsNone(syntaxMatcher.matchDeclaration("}"))
+
+        self.assertEqual(syntaxMatcher.matchMemberDeclaration(
+            "  const RtcEngine({this.appId});", "RtcEngine"), (TYPE_CONSTRUCT, "RtcEngine"))
+        self.assertEqual(syntaxMatcher.matchMemberDeclaration(
+            "  Future<void> joinChannel(int uid);", "RtcEngine"), (TYPE_API, "joinChannel"))
+        self.assertIsNone(syntaxMatcher.matchMemberDeclaration("  }", "RtcEngine"))
+
+        # The overridden match methods are called instead of the alternation
+        self.assertEqual(OverriddenMemberFunctionSyntaxMatcher().matchMemberDeclaration(
+            "  Future<void> joinChannel(int uid);", "RtcEngine"), (TYPE_API, "OverriddenFuncName"))
@@ -0,0 +1,109 @@
+import io
+import json
+import unittest
+from typing import Dict
+
+from iris_doc.language_specification import CommentSource, LanguageFormat
+from iris_doc.miss_reporter import MissReporter
+from iris_doc.tag2doc import Tag2Doc
+
+
+class TestMissReporter(unittest.TestCase):
+    __format: LanguageFormat = LanguageFormat(
+        comment1="",
+        comment2="///",
+        comment3="",
+        summary1="",
+        summary2="",
+        tag1="",
+        tag2="",
+        param1="*[",
+        param2="] ",
+        param3="",
+        return1="",
+        return2="",
+        return3="",
+        link1="",
+        link2="",
+        ignore="@nodoc")
+
+    __code = """
+  /* api_one_method */
+  void method();
+  /* api_one_other */
+  void other();
+  /* api_one_other */
+  void other();
+"""
+
+    def __createCommentSources(self) -> Dict[str, CommentSource]:
+        return {
+            "api_one_method": CommentSource(
+                type_="api",
+                id="api_one_method",
+                name="method",
+                description="This is a method",
+                parameters=["bad parameter"],
+                returns="",
+                is_hide=False)}
+
+    def testSummary(self):
+        output = io.StringIO()
+        missReporter = MissReporter(output=output)
+        commentSources = self.__createCommentSources()
+        Tag2Doc(self.__format, commentSources, missReporter=missReporter, filePath="a.dart").process(self.__code)
+        Tag2Doc(self.__format, commentSources, missReporter=missReporter, filePath="b.dart").process(self.__code)
+
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(json.loads(missReporter.toJson()), {
+            "notFound": [
+                {"tag": "api_one_other", "count": 4, "files": {"a.dart": 2, "b.dart": 2}},
+            ],
+            "parseErrors": [
+                {"id": "api_one_method", "parameters": "['bad parameter']", "count": 2,
+                 "files": {"a.dart": 1, "b.dart": 1}},
+            ],
+        })
+
+        missReporter.writeSummary()
+        self.assertEqual(output.getvalue(), """Tags not found: 1 unique, 4 total
+  [api_one_other] x4 (a.dart: 2, b.dart: 2)
+Parse errors: 1 unique, 2 total
+  [api_one_method] x2 (a.dart: 1, b.dart: 1)
+""")
+
+    def testSummaryWithSharedTag2Doc(self):
+        missReporter = MissReporter(output=io.StringIO())
+        tag2Doc = Tag2Doc(self.__format, self.__createCommentSources(), missReporter=missReporter)
+        tag2Doc.setFilePath("a.dart")
+        tag2Doc.process(self.__code)
+        tag2Doc.setFilePath("b.dart")
+        tag2Doc.process(self.__code)
+
+        self.assertEqual(json.loads(missReporter.toJson()), {
+            "notFound": [
+                {"tag": "api_one_other", "count": 4, "files": {"a.dart": 2, "b.dart": 2}},
+            ],
+            "parseErrors": [
+                {"id": "api_one_method", "parameters": "['bad parameter']", "count": 2,
+                 "files": {"a.dart": 1, "b.dart": 1}},
+            ],
+        })
+
+    def testVerbose(self):
+        output = io.StringIO()
+        missReporter = MissReporter(verbose=True, output=output)
+        Tag2Doc(self.__format, self.__createCommentSources(), missReporter=missReporter).process(self.__code)
+
+        self.assertEqual(output.getvalue(), """[api_one_method] parse error
+—— parameters contains empty object: ['bad parameter']
+
+[api_one_other] not found
+
+[api_one_other] not found
+
+""")
+
+
+if __name__ == '__main__':
+    unittest.main()
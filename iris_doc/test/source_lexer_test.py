@@ -0,0 +1,209 @@
+import unittest
+
+from iris_doc.c_sharp.api_tagger_c_sharp import CSharpTagBuilder
+from iris_doc.dart.api_tagger_dart import DartTagBuilder
+from iris_doc.oc.api_tagger_oc import ObjCTagBuilder
+from iris_doc.ts.api_tagger_ts import TSTagBuilder
+
+
+class TestSourceLexer(unittest.TestCase):
+
+    def test_lexDart(self):
+        lexer = DartTagBuilder(useLexer=True).getLexer()
+        self.assertEqual(lexer.lex([
+            "  final String open = '{';",
+            '  void foo() {} // }',
+            "  final String raw = r'\\';",
+            "  final String doc = '''",
+            "  }",
+            "  ''';",
+            '  /* { */ void bar();',
+            '  final String close = r"}";',
+            '  final String json = """{',
+            '  "id": "${id}" }""";',
+            "  final String rawDoc = r'''\\",
+            "  {''';",
+        ]), [
+            '  final String open =  ;',
+            '  void foo() {}  ',
+            '  final String raw =  ;',
+            '  final String doc =  ',
+            '',
+            ';',
+            '    void bar();',
+            '  final String close =  ;',
+            '  final String json =  ',
+            ';',
+            '  final String rawDoc =  ',
+            ';',
+        ])
+
+    def test_lexTS(self):
+        lexer = TSTagBuilder(useLexer=True).getLexer()
+        self.assertEqual(lexer.lex([
+            '  path = `${a}/{',
+            '  }`;',
+            "  name = \"it's\";",
+            "  open = '{';",
+        ]), [
+            '  path =  ',
+            ';',
+            '  name =  ;',
+            '  open =  ;',
+        ])
+
+    def test_lexCSharp(self):
+        lexer = CSharpTagBuilder(useLexer=True).getLexer()
+        self.assertEqual(lexer.lex([
+            '    public string Path = @"C:\\{";',
+            "    public char Open = '{';",
+            '    public string Quoted = @"{""}";',
+            '    public string Format = $@"{x}{{";',
+            '    public string Close = @$"}}";',
+            '    public string Text = $"{x} }}";',
+            '    public string Json = """',
+            '    { "id": 1 }',
+            '    """;',
+        ]), [
+            '    public string Path =  ;',
+            '    public char Open =  ;',
+            '    public string Quoted =  ;',
+            '    public string Format =  ;',
+            '    public string Close =  ;',
+            # The `$` of the interpolated strings is left in the code lines
+            '    public string Text = $ ;',
+            '    public string Json =  ',
+            '',
+            ';',
+        ])
+
+    def test_lexObjC(self):
+        lexer = ObjCTagBuilder(useLexer=True).getLexer()
+        self.assertEqual(lexer.lex([
+            '  NSString *open = @"{";',
+            '  NSString *close = @"\\"}";',
+            "  char semicolon = ';';",
+        ]), [
+            # The `@` of the `NSString` literals is left in the code lines
+            '  NSString *open = @ ;',
+            '  NSString *close = @ ;',
+            '  char semicolon =  ;',
+        ])
+
+    def test_lexNotHandled(self):
+        # The string literals nested in the interpolations end the outer literal, and the regular expression
+        # literals of TypeScript are not lexed, see the `--lexer` option
+        self.assertEqual(DartTagBuilder(useLexer=True).getLexer().lex([
+            "  final String open = '${isOpen ? '{' : ''}';",
+        ]), [
+            '  final String open =  {  ;',
+        ])
+        self.assertEqual(TSTagBuilder(useLexer=True).getLexer().lex([
+            '  open = `${isOpen ? `{` : ``}`;',
+            '  pattern = /[{]/;',
+        ]), [
+            '  open =  {  ;',
+            '  pattern = /[{]/;',
+        ])
+        self.assertEqual(CSharpTagBuilder(useLexer=True).getLexer().lex([
+            '    public string Open = $"{(isOpen ? "{" : "")}";',
+        ]), [
+            '    public string Open = $ {  ;',
+        ])
+
+    def test_buildWithLexer(self):
+        # The brace at the end of the comment is not a scope start on the code lines
+        source = """
+class Foo {
+  // The options are in the form of {
+  void bar();
+}
+
+class Baz {
+  final String close = '}';
+  void qux();
+}
+"""
+        self.assertEqual('\n'.join(DartTagBuilder(useLexer=True).build(source.splitlines())), """
+/* class_foo */
+class Foo {
+  // The options are in the form of {
+/* api_foo_bar */
+  void bar();
+}
+
+/* class_baz */
+class Baz {
+  final String close = '}';
+/* api_baz_qux */
+  void qux();
+}""")
+
+    def test_buildWithLexerDartLiterals(self):
+        # The brace in the triple quoted string is not a scope end on the code lines
+        source = """
+class Foo {
+  final String path = r'C:\\';
+  final String doc = '''
+}
+''';
+  void bar();
+}
+"""
+        self.assertEqual('\n'.join(DartTagBuilder(useLexer=True).build(source.splitlines())), """
+/* class_foo */
+class Foo {
+  final String path = r'C:\\';
+  final String doc = '''
+}
+''';
+/* api_foo_bar */
+  void bar();
+}""")
+
+    def test_buildWithLexerTS(self):
+        # The brace in the template literal is not a scope end on the code lines
+        source = """
+export class Foo {
+  close = `
+}`;
+  bar(): void;
+}
+"""
+        self.assertEqual('\n'.join(TSTagBuilder(useLexer=True).build(source.splitlines())), """
+/* class_foo */
+export class Foo {
+  close = `
+}`;
+/* api_foo_bar */
+  bar(): void;
+}""")
+
+    def test_buildWithLexerCSharp(self):
+        # The brace in the raw string literal is not a scope end on the code lines
+        source = """
+public class Foo
+{
+    public string Path = @"C:\\}";
+    public string Json = \"\"\"
+}
+\"\"\";
+    public void Bar();
+}
+"""
+        self.assertEqual('\n'.join(CSharpTagBuilder(useLexer=True).build(source.splitlines())), """
+/* class_foo */
+public class Foo
+{
+/* class_foo_path */
+    public string Path = @"C:\\}";
+    public string Json = \"\"\"
+}
+\"\"\";
+/* api_foo_bar## */
+    public void Bar();
+}""")
+
+
+if __name__ == '__main__':
+    unittest.main()
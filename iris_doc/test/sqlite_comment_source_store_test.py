@@ -0,0 +1,232 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import fs.memoryfs
+
+from iris_doc.language_specification import CommentSource, LanguageFormat, LanguageSpecificationConfig, \
+    LanguageSpecificationModule
+from iris_doc.sqlite_comment_source_store import SqliteCommentSourceStore
+from iris_doc.tag2doc import Tag2Doc
+
+
+class TestSqliteCommentSourceStore(unittest.TestCase):
+    __fileSystem: fs.memoryfs.MemoryFS
+    __tempDir: tempfile.TemporaryDirectory
+
+    def setUp(self):
+        self.__fileSystem = fs.memoryfs.MemoryFS()
+        self.__tempDir = tempfile.TemporaryDirectory()
+        self.__fileSystem.writetext("template.json", """
+[
+    {
+        "id": "class_irtcengine",
+        "name": "RtcEngine",
+        "description": "The basic interface of the Agora SDK.",
+        "parameters": [
+            {
+                "appId": "The App ID"
+            }
+        ],
+        "returns": "",
+        "is_hide": false
+    },
+    {
+        "id": "api_irtcengine_joinchannel",
+        "name": "joinChannel",
+        "description": "Joins a channel.",
+        "parameters": [
+            {
+                "token": "The token"
+            },
+            {
+                "channelId": "The channel name"
+            }
+        ],
+        "returns": "",
+        "is_hide": false
+    },
+    {
+        "id": "api_irtcengine_leavechannel",
+        "name": "leaveChannel",
+        "description": "Leaves a channel.",
+        "parameters": [],
+        "returns": "",
+        "is_hide": false
+    }
+]
+""")
+
+    def tearDown(self):
+        self.__fileSystem.close()
+        self.__tempDir.cleanup()
+
+    def __deserialize(self,
+                      store: SqliteCommentSourceStore = None,
+                      isOwned: bool = False) -> LanguageSpecificationModule:
+        languageSpecificationConfig: LanguageSpecificationConfig = LanguageSpecificationConfig(
+            isCallback2class=True,
+            isCallback2api=False,
+            idPatternV2=True)
+        module = LanguageSpecificationModule(
+            self.__fileSystem, languageSpecificationConfig)
+        module.addTemplateFilePath("template.json")
+        if store is not None:
+            module.setCommentSourceStore(store, isOwned=isOwned)
+        module.deserialize()
+        return module
+
+    def testDeserializeToStore(self):
+        store = SqliteCommentSourceStore(
+            os.path.join(self.__tempDir.name, "store.sqlite"))
+        commentSources = self.__deserialize(store).getAllCommentSources()
+
+        self.assertIs(commentSources, store)
+        self.assertEqual(list(commentSources.keys()), [
+            "class_rtcengine",
+            "class_rtcengine_appid",
+            "api_rtcengine_joinchannel##token#channelid",
+            "api_rtcengine_leavechannel",
+        ])
+        self.assertEqual(commentSources["class_rtcengine_appid"].description, "The App ID")
+        self.assertEqual(commentSources["class_rtcengine"].parameters, [])
+        self.assertNotIn("class_rtcengine_token", commentSources)
+
+        self.assertEqual(
+            store.findBySortedParameters("api_rtcengine_joinchannel", ["channelid", "token"]).name,
+            "joinChannel")
+        self.assertIsNone(store.findBySortedParameters("api_rtcengine_joinchannel", ["token"]))
+        self.assertEqual(store.findByBaseId("api_rtcengine_joinchannel").name, "joinChannel")
+        self.assertEqual(store.findByBaseId("api_rtcengine_leavechannel").name, "leaveChannel")
+        self.assertIsNone(store.findByBaseId("api_rtcengine_renewtoken"))
+
+        store.close()
+
+    def testReusePrebuiltStore(self):
+        storePath = os.path.join(self.__tempDir.name, "store.sqlite")
+        store = SqliteCommentSourceStore(storePath)
+        self.__deserialize(store)
+        commentSource = store["api_rtcengine_leavechannel"]
+        commentSource.description = "Loaded from the prebuilt store"
+        store["api_rtcengine_leavechannel"] = commentSource
+        store.commit()
+        store.close()
+
+        store = SqliteCommentSourceStore(storePath)
+        commentSources = self.__deserialize(store).getAllCommentSources()
+
+        self.assertEqual(len(commentSources), 4)
+        self.assertEqual(
+            commentSources["api_rtcengine_leavechannel"].description, "Loaded from the prebuilt store")
+
+        store.close()
+
+    def testRebuildOwnedStoreOnly(self):
+        store = SqliteCommentSourceStore(
+            os.path.join(self.__tempDir.name, "store.sqlite"))
+        store["class_other"] = CommentSource(id="class_other", name="Other")
+        store.setMetadata("cacheKey", "other")
+
+        # The store which is not owned is left unchanged, the templates are parsed in memory
+        commentSources = self.__deserialize(store).getAllCommentSources()
+        self.assertIsNot(commentSources, store)
+        self.assertEqual(len(commentSources), 4)
+        self.assertEqual(list(store.keys()), ["class_other"])
+        self.assertEqual(store.getMetadata("cacheKey"), "other")
+
+        commentSources = self.__deserialize(store, isOwned=True).getAllCommentSources()
+        self.assertIs(commentSources, store)
+        self.assertEqual(len(store), 4)
+        self.assertNotIn("class_other", store)
+
+        store.close()
+
+    def testTag2DocWithStore(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="* [",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        code = """
+  /* api_rtcengine_joinchannel##channelid#token */
+  Future<void> joinChannel({required String channelId, required String token});
+  /* api_rtcengine_leavechannel##options */
+  Future<void> leaveChannel({LeaveChannelOptions? options});
+  /* api_rtcengine_renewtoken##token */
+  Future<void> renewToken(String token);
+"""
+
+        store = SqliteCommentSourceStore(
+            os.path.join(self.__tempDir.name, "store.sqlite"))
+        tag2Doc = Tag2Doc(format, self.__deserialize(store).getAllCommentSources())
+        storeResult = tag2Doc.process(code)
+        # The `CommentSource`s are unpickled on every lookup, which are rendered once
+        self.assertEqual(tag2Doc.process(code), storeResult)
+        self.assertEqual(tag2Doc.getRenderCacheInfo().hits, 2)
+        store.close()
+
+        dictResult = Tag2Doc(format, dict(self.__deserialize().getAllCommentSources())).process(code)
+
+        expectedResult = """
+  /// Joins a channel.
+  ///
+  /// * [channelId] The channel name
+  /// * [token] The token
+  Future<void> joinChannel({required String channelId, required String token});
+  /// Leaves a channel.
+  Future<void> leaveChannel({LeaveChannelOptions? options});
+  /* api_rtcengine_renewtoken##token */
+  Future<void> renewToken(String token);
+"""
+        self.assertEqual(storeResult, expectedResult)
+        self.assertEqual(dictResult, expectedResult)
+
+
+    def testFallbackToFirstBaseId(self):
+        store = SqliteCommentSourceStore(
+            os.path.join(self.__tempDir.name, "store.sqlite"))
+        store["api_rtcengine_joinchannel##token"] = CommentSource(name="joinChannel1")
+        store["api_rtcengine_joinchannel##token#channelid"] = CommentSource(name="joinChannel2")
+        store["api_rtcengine_joinchannel##token"] = CommentSource(name="joinChannel3")
+        self.assertEqual(store.findByBaseId("api_rtcengine_joinchannel").name, "joinChannel3")
+
+        del store["api_rtcengine_joinchannel##token"]
+        self.assertEqual(store.findByBaseId("api_rtcengine_joinchannel").name, "joinChannel2")
+
+        del store["api_rtcengine_joinchannel##token#channelid"]
+        self.assertIsNone(store.findByBaseId("api_rtcengine_joinchannel"))
+
+        store["api_rtcengine_joinchannel"] = CommentSource(name="joinChannel4")
+        self.assertEqual(store.findByBaseId("api_rtcengine_joinchannel").name, "joinChannel4")
+
+        store.close()
+
+    def testStoreFormatVersion(self):
+        storePath = os.path.join(self.__tempDir.name, "store.sqlite")
+        SqliteCommentSourceStore(storePath).close()
+        # Reopen the store of the current format
+        SqliteCommentSourceStore(storePath).close()
+
+        # The file of another format
+        connection = sqlite3.connect(storePath)
+        connection.execute("PRAGMA user_version = 99")
+        connection.close()
+        with self.assertRaises(ValueError):
+            SqliteCommentSourceStore(storePath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,56 @@
+import io
 import unittest
-from typing import Dict
+import iris_doc.tag2doc
+from typing import Dict, List
 
-from iris_doc.language_specification import CommentSource, LanguageFormat
+from iris_doc.api_tagger import LanguageSyntaxMatcher, LineScanner, TagBuilder, Token
+from iris_doc.dart.api_tagger_dart import DartSyntaxMatcher, DartTagBuilder
+from iris_doc.language_specification import CommentSource, LanguageFormat, TagKey
+from iris_doc.miss_reporter import MissReporter
+from iris_doc.render_plan import RenderPlan
 from iris_doc.tag2doc import Tag2Doc
 
 
+def markNoDoc(tag2Doc: Tag2Doc, format: LanguageFormat, code: str) -> str:
+    """
+    Mark the single line block comments of the processed `code` as nodoc, which is done by a post phase after
+    `Tag2Doc.process` before the force nodoc mode of `Tag2Doc`
+    """
+    codeLines: List[str] = []
+    for line in code.splitlines():
+        if line.strip().startswith("/*") and line.strip().endswith("*/"):
+            codeLines.append(tag2Doc._generateComment(format, None))
+            continue
+
+        codeLines.append(line)
+
+    return '\n'.join(codeLines)
+
+
+class FixedLineScanner(LineScanner):
+    __tokens: List[Token]
+
+    def __init__(self, tokens: List[Token]) -> None:
+        self.__tokens = tokens
+
+    def tokenize(self) -> List[Token]:
+        return self.__tokens
+
+
+class FixedTagBuilder(TagBuilder):
+    """
+    Return the fixed `Token`s for any source, e.g., the `Token`s with the keys across multiple lines
+    """
+    __tokens: List[Token]
+
+    def __init__(self, tokens: List[Token]) -> None:
+        super().__init__(DartSyntaxMatcher())
+        self.__tokens = tokens
+
+    def _createLineScanner(self, syntaxMatcher: LanguageSyntaxMatcher, fileLines: List[str]) -> LineScanner:
+        return FixedLineScanner(self.__tokens)
+
+
 class CommentGroup(unittest.TestCase):
 
     def test_commentWithEmptyParameters(self):
@@ -1020,5 +1066,462 @@ class Tag2DocTest(unittest.TestCase):
         self.assertEqual(result, expectedResult.rstrip().lstrip('\n'))
 
 
+    def test_renderCache(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        commentSources: Dict[str, CommentSource] = {
+            "api_one_method##b#a": CommentSource(
+                type_="api",
+                id="api_one_method##b#a",
+                name="method",
+                description="This is a method",
+                parameters=[{"b": "param b"}, {"a": "param a"}],
+                returns="",
+                is_hide=False)}
+        code = """
+  /* api_one_method##b#a */
+  void method(int b, int a);
+  /* api_one_method##a#b */
+  void method(int a, int b);
+  /* api_one_other */
+  void other();
+  /* api_one_other */
+  void other();
+"""
+        tag2Doc = Tag2Doc(format, commentSources, renderCacheSize=1)
+        result = tag2Doc.process(code)
+        expectedResult = """
+  /// This is a method
+  ///
+  /// *[b] param b
+  /// *[a] param a
+  void method(int b, int a);
+  /// This is a method
+  ///
+  /// *[a] param a
+  /// *[b] param b
+  void method(int a, int b);
+  /* api_one_other */
+  void other();
+  /* api_one_other */
+  void other();
+"""
+        self.assertEqual(result, expectedResult)
+        self.assertEqual(tag2Doc._generateComment(format, None), "  /// @nodoc")
+        self.assertEqual(tag2Doc._generateComment(format, None), "  /// @nodoc")
+        self.assertEqual(tag2Doc._generateComment(format, None, 4), "    /// @nodoc")
+
+        renderCacheInfo = tag2Doc.getRenderCacheInfo()
+        self.assertEqual(renderCacheInfo.hits, 1)
+        self.assertEqual(renderCacheInfo.misses, 4)
+        self.assertEqual(renderCacheInfo.currentSize, 1)
+
+        tag2Doc.setRenderCacheSize(0)
+        self.assertEqual(tag2Doc._generateComment(format, None, 4), "    /// @nodoc")
+        self.assertEqual(tag2Doc.getRenderCacheInfo().currentSize, 0)
+
+    def test_renderCacheSharedByFiles(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        commentSources: Dict[str, CommentSource] = {
+            "api_one_method": CommentSource(
+                type_="api",
+                id="api_one_method",
+                name="method",
+                description="This is a method",
+                parameters=[],
+                returns="",
+                is_hide=False)}
+        code = """
+  /* api_one_method */
+  void method();
+"""
+        tag2Doc = Tag2Doc(format, commentSources)
+        tag2Doc.setFilePath("a.dart")
+        result = tag2Doc.process(code)
+        tag2Doc.setFilePath("b.dart")
+        self.assertEqual(tag2Doc.process(code), result)
+
+        renderCacheInfo = tag2Doc.getRenderCacheInfo()
+        self.assertEqual(renderCacheInfo.hits, 1)
+        self.assertEqual(renderCacheInfo.misses, 1)
+
+    def test_tagKeyParsedOncePerTag(self):
+        parsedTags: List[str] = []
+
+        class CountingTagKey(TagKey):
+            def __init__(self, id: str) -> None:
+                parsedTags.append(id)
+                super().__init__(id)
+
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        commentSources: Dict[str, CommentSource] = {
+            "api_one_method": CommentSource(
+                type_="api",
+                id="api_one_method",
+                name="method",
+                description="This is a method",
+                parameters=[],
+                returns="",
+                is_hide=False)}
+        code = """
+  /* api_one_method */
+  void method();
+  /* api_one_method */
+  void method();
+  /* api_one_missing */
+  void missing();
+  /* api_one_missing */
+  void missing();
+"""
+        tag2Doc = Tag2Doc(format, commentSources, missReporter=MissReporter())
+        iris_doc.tag2doc.TagKey = CountingTagKey
+        try:
+            tag2Doc.process(code)
+            tag2Doc.setFilePath("b.dart")
+            tag2Doc.process(code)
+        finally:
+            iris_doc.tag2doc.TagKey = TagKey
+
+        self.assertEqual(parsedTags, ["api_one_method", "api_one_missing"])
+
+    def test_renderPlan(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="/**",
+            comment2=" *",
+            comment3=" */",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="@param ",
+            param2=" ",
+            param3="",
+            return1="",
+            return2="@returns ",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@ignore")
+        commentSource = CommentSource(
+            type_="api",
+            id="api_one_method##a",
+            name="method",
+            description="This is a method\n\nSecond paragraph",
+            parameters=[{"a": "param a"}],
+            returns="The result",
+            is_hide=False)
+        renderPlan = RenderPlan(format)
+        tag2Doc = Tag2Doc(format, {}, renderPlan=renderPlan)
+        expectedResult = """
+    /**
+     * This is a method
+     *
+     * Second paragraph
+     *
+     * @param a param a
+     *
+     * @returns The result
+     */
+"""
+        self.assertEqual(renderPlan.render(commentSource, 4), expectedResult.strip('\n'))
+        self.assertEqual(tag2Doc._generateComment(format, commentSource, 4), expectedResult.strip('\n'))
+        self.assertEqual(renderPlan.renderNoDoc(0), "/**\n * @ignore\n */")
+
+    def test_forceMarkNoDoc(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        commentSources: Dict[str, CommentSource] = {
+            "api_one_method": CommentSource(
+                type_="api",
+                id="api_one_method",
+                name="method",
+                description="This is a method",
+                parameters=[],
+                returns="",
+                is_hide=False)}
+        code = """
+    /* api_one_method */
+    void method();
+    /* api_one_other */
+    void other();
+    /*comment*/
+    int field;
+"""
+        result = Tag2Doc(format, commentSources, isForceMarkNoDoc=True).process(code)
+        expectedResult = """
+    /// This is a method
+    void method();
+  /// @nodoc
+    void other();
+  /// @nodoc
+    int field;"""
+        self.assertEqual(result, expectedResult)
+
+    def test_overloadedTagNotChangeCommentSource(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        parameters = [{"b": "param b"}, {"a": "param a"}]
+        commentSources: Dict[str, CommentSource] = {
+            "api_one_method##b#a": CommentSource(
+                type_="api",
+                id="api_one_method##b#a",
+                name="method",
+                description="This is a method",
+                parameters=parameters,
+                returns="",
+                is_hide=False)}
+        code = """
+  /* api_one_method##a#b */
+  void method(int a, int b);
+  /* api_one_method##b#a */
+  void method(int b, int a);
+"""
+        result = Tag2Doc(format, commentSources).process(code)
+        expectedResult = """
+  /// This is a method
+  ///
+  /// *[a] param a
+  /// *[b] param b
+  void method(int a, int b);
+  /// This is a method
+  ///
+  /// *[b] param b
+  /// *[a] param a
+  void method(int b, int a);
+"""
+        self.assertEqual(result, expectedResult)
+        self.assertIs(commentSources["api_one_method##b#a"].parameters, parameters)
+        self.assertEqual(parameters, [{"b": "param b"}, {"a": "param a"}])
+
+    def test_processTaggedLines(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        commentSources: Dict[str, CommentSource] = {
+            "class_rtcengine": CommentSource(
+                type_="class",
+                id="class_rtcengine",
+                name="RtcEngine",
+                description="The RtcEngine class",
+                parameters=[],
+                returns="",
+                is_hide=False)}
+        code = """
+abstract class RtcEngine {
+  /// The old comment
+  Future<void> release();
+
+  Map<String, dynamic> toJson();
+}
+"""
+        for isForceMarkNoDoc in [False, True]:
+            tagBuilder = DartTagBuilder()
+            expectedResult = Tag2Doc(format, commentSources, isForceMarkNoDoc=isForceMarkNoDoc).process(
+                '\n'.join(tagBuilder.build(code.splitlines())))
+            result = Tag2Doc(format, commentSources, isForceMarkNoDoc=isForceMarkNoDoc).processTaggedLines(
+                tagBuilder.buildTaggedLines(code.splitlines()))
+            self.assertEqual(result, expectedResult)
+
+    def test_processLines(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        commentSources: Dict[str, CommentSource] = {
+            "api_one_method": CommentSource(
+                type_="api",
+                id="api_one_method",
+                name="method",
+                description="This is a method",
+                parameters=[],
+                returns="",
+                is_hide=False)}
+        code = """
+  /* api_one_method */
+  void method();
+  /* api_one_other */
+  void other();
+
+"""
+        for isForceMarkNoDoc in [False, True]:
+            for lines in [io.StringIO(code), code.split('\n')]:
+                tag2Doc = Tag2Doc(format, commentSources, isForceMarkNoDoc=isForceMarkNoDoc)
+                sink = io.StringIO()
+                tag2Doc.processLines(lines, sink)
+                self.assertEqual(sink.getvalue(), tag2Doc.process(code))
+
+    def test_processTaggedLinesMatchesTagFile(self):
+        format: LanguageFormat = LanguageFormat(
+            comment1="",
+            comment2="///",
+            comment3="",
+            summary1="",
+            summary2="",
+            tag1="",
+            tag2="",
+            param1="*[",
+            param2="] ",
+            param3="",
+            return1="",
+            return2="",
+            return3="",
+            link1="",
+            link2="",
+            ignore="@nodoc")
+        commentSources: Dict[str, CommentSource] = {
+            "class_rtcengine": CommentSource(
+                type_="class",
+                id="class_rtcengine",
+                name="RtcEngine",
+                description="The RtcEngine class",
+                parameters=[],
+                returns="",
+                is_hide=False),
+            "api_rtcengine_release": CommentSource(
+                type_="api",
+                id="api_rtcengine_release",
+                name="release",
+                description="Release the RtcEngine",
+                parameters=[],
+                returns="",
+                is_hide=False)}
+        code = """
+abstract class RtcEngine {
+  /// The old comment
+  Future<void> release();
+  /* A block comment */
+  Map<String, dynamic> toJson();
+}
+"""
+        tagBuilders: List[TagBuilder] = [
+            DartTagBuilder(),
+            # The keys across multiple lines are split when the tag file is parsed back
+            FixedTagBuilder([
+                Token(0, "api", "RtcEngine", "toJson\r"),
+                Token(1, "class", "RtcEngine"),
+                Token(2, "api", "RtcEngine", "release\ntoJson"),
+                Token(3, "api", "RtcEngine", "toJson */\n/* release"),
+                Token(4, "api", "RtcEngine", "release"),
+            ]),
+        ]
+        for tagBuilder in tagBuilders:
+            for isForceMarkNoDoc in [False, True]:
+                # The output of the tag file written by the `ApiTagger`, and the nodoc post phase
+                tag2Doc = Tag2Doc(format, commentSources)
+                taggedCode = '\n'.join(tagBuilder.build(code.splitlines()))
+                expectedResult = tag2Doc.process(taggedCode)
+                if isForceMarkNoDoc:
+                    expectedResult = markNoDoc(tag2Doc, format, expectedResult)
+
+                tag2Doc = Tag2Doc(format, commentSources, isForceMarkNoDoc=isForceMarkNoDoc)
+                self.assertEqual(tag2Doc.process(taggedCode), expectedResult)
+                self.assertEqual(
+                    tag2Doc.processTaggedLines(tagBuilder.buildTaggedLines(code.splitlines())), expectedResult)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,31 @@
-from iris_doc.api_tagger import LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
-from typing import List, Tuple
+from iris_doc.api_tagger import DeclarationPattern, LanguageSyntaxMatcher, Token, LineScanner, DefaultLineScanner, TagBuilder
+from iris_doc.source_lexer import BLOCK_COMMENT, DOUBLE_QUOTED_STRING, LINE_COMMENT, SINGLE_QUOTED_STRING, SourceLexer
+from typing import List, Optional, Tuple
 import re
 
+# The patterns are compiled once on module load, the matchers are called for every line of the source files.
+_CLASS_PATTERN = re.compile(r'(export )?(abstract )?(class|interface) ([A-Za-z<>0-9_]+)(.*){?$')
+_MODIFIED_MEMBER_FUNCTION_PATTERN = re.compile(
+    r'(abstract |get |set |public |private )([A-Za-z0-9_]+)\((.*)(\)?( {)?|;?)$')
+_MEMBER_FUNCTION_PATTERN = re.compile(r'([A-Za-z0-9_]+)\??\((.*)(\)?( {)?|;?)$')
+# The `_MEMBER_FUNCTION_PATTERN` is searched in the line, which is the same as matching it after the shortest prefix
+_MEMBER_FUNCTION_SEARCH_PATTERN = re.compile(r'(?s:.*?)' + _MEMBER_FUNCTION_PATTERN.pattern)
+_MEMBER_VARIABLE_PATTERN = re.compile(r'([A-Za-z0-9_]+)(\?)?: (.*);')
+_ENUM_PATTERN = re.compile(r'export enum (.*) {', re.M | re.I)
+_ENUM_VALUE_PATTERN = re.compile(r'([A-Za-z0-9_]+) = (.*),?$')
+_ANNOTATION_PATTERN = re.compile(r'^@(.*)')
+_CONSTANT_PATTERN = re.compile(r'export const (.*)(: )?(.*) = (.*)', re.M | re.I)
+_FUNCTION_PATTERN = re.compile(r'(export )?function ([A-Za-z0-9_]+)\((.*)(\)?( {)?|;?)$', re.M | re.I)
+_PARAMETER_PATTERN = re.compile(r'\s?([A-Za-z0-9_]+)\??: (.*)')
+
 
 class TSSyntaxMatcher(LanguageSyntaxMatcher):
+    def _getDeclarationPattern(self) -> Optional[DeclarationPattern]:
+        return _DECLARATION_PATTERN
+
+    def _getMemberDeclarationPattern(self, className: str) -> Optional[DeclarationPattern]:
+        return _MEMBER_DECLARATION_PATTERN
+
     def matchComment(self, line: str) -> str:
         if line.strip().startswith("/*") or line.strip().startswith("*") or line.strip().startswith("*/"):
             return line
@@ -11,8 +33,7 @@ class TSSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def matchClass(self, line: str) -> str:
-        m = re.match(
-            r'(export )?(abstract )?(class|interface) ([A-Za-z<>0-9_]+)(.*){?$', line.strip())
+        m = _CLASS_PATTERN.match(line.strip())
         if m:
             return m.group(4)
 
@@ -22,40 +43,39 @@ class TSSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def matchMemberFunction(self, line: str) -> str:
-        m = re.match(
-            r'(abstract |get |set |public |private )([A-Za-z0-9_]+)\((.*)(\)?( {)?|;?)$', line.strip())
+        line = line.strip()
+        m = _MODIFIED_MEMBER_FUNCTION_PATTERN.match(line)
         if m:
             return m.group(2)
-        m = re.search(
-            r'([A-Za-z0-9_]+)\??\((.*)(\)?( {)?|;?)$', line.strip())
+        m = _MEMBER_FUNCTION_PATTERN.search(line)
         if m:
             return m.group(1)
 
         return None
 
     def matchMemberVariable(self, line: str) -> str:
-        m = re.match(r'([A-Za-z0-9_]+)(\?)?: (.*);', line.strip())
+        m = _MEMBER_VARIABLE_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchEnum(self, line: str) -> str:
-        m = re.match(r'export enum (.*) {', line.strip(), re.M | re.I)
+        m = _ENUM_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchEnumValue(self, line: str) -> str:
-        m = re.match(r'([A-Za-z0-9_]+) = (.*),?$', line.strip())
+        m = _ENUM_VALUE_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchAnnotation(self, line: str) -> str:
-        m = re.match(r'^@(.*)', line.strip())
+        m = _ANNOTATION_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
@@ -65,16 +85,14 @@ class TSSyntaxMatcher(LanguageSyntaxMatcher):
         return None
 
     def matchConstant(self, line: str) -> str:
-        m = re.match(
-            r'export const (.*)(: )?(.*) = (.*)', line.strip(), re.M | re.I)
+        m = _CONSTANT_PATTERN.match(line.strip())
         if m:
             return m.group(1)
 
         return None
 
     def matchFunction(self, line: str) -> str:
-        m = re.match(
-            r'(export )?function ([A-Za-z0-9_]+)\((.*)(\)?( {)?|;?)$', line.strip(), re.M | re.I)
+        m = _FUNCTION_PATTERN.match(line.strip())
         if m:
             return m.group(2)
 
@@ -102,13 +120,38 @@ class TSSyntaxMatcher(LanguageSyntaxMatcher):
                 if "=" in parameter:
                     parameterList.append(parameter.split(' = ')[0].split(' ')[-1])
                 else:
-                    m = re.match(r'\s?([A-Za-z0-9_]+)\??: (.*)', parameter)
+                    m = _PARAMETER_PATTERN.match(parameter)
                     if m:
                         parameterList.append(m.group(1))
 
         return parameterList
 
 
+_DECLARATION_PATTERN = DeclarationPattern(
+    TSSyntaxMatcher,
+    ('matchClass', 'matchEnum', 'matchExtension', 'matchFunction', 'matchConstant'),
+    [(0, _CLASS_PATTERN, 4),
+     (1, _ENUM_PATTERN, 1),
+     (3, _FUNCTION_PATTERN, 2),
+     (4, _CONSTANT_PATTERN, 1)])
+
+_MEMBER_DECLARATION_PATTERN = DeclarationPattern(
+    TSSyntaxMatcher,
+    ('matchClassConstructor', 'matchMemberVariableScopeStart', 'matchMemberVariable', 'matchMemberFunction'),
+    [(1, _MEMBER_VARIABLE_PATTERN, None),
+     (2, _MODIFIED_MEMBER_FUNCTION_PATTERN, 2),
+     (2, _MEMBER_FUNCTION_SEARCH_PATTERN, 1)])
+
+# The comments and the string literals of TypeScript, the template literals can span multiple lines
+_LEXER = SourceLexer([
+    BLOCK_COMMENT,
+    LINE_COMMENT,
+    r'`(?:[^`\\]|(?s:\\.))*`?',
+    DOUBLE_QUOTED_STRING,
+    SINGLE_QUOTED_STRING,
+])
+
+
 # class DartToken(Token):
 #     def toString(self):
 #         type = self._type
@@ -129,8 +172,8 @@ class TSSyntaxMatcher(LanguageSyntaxMatcher):
 
 
 class TSTagBuilder(TagBuilder):
-    def __init__(self):
-        super().__init__(TSSyntaxMatcher())
+    def __init__(self, useLexer: bool = False):
+        super().__init__(TSSyntaxMatcher(), lexer=_LEXER if useLexer else None)
 
     # def _createLineScanner(self, syntaxMatcher: LanguageSyntaxMatcher, fileLines: List[str]) -> LineScanner:
     #     return DartLineScanner(syntaxMatcher, fileLines)